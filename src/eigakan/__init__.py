@@ -1,2 +1,2 @@
 from eigakan.auth.models import Owner
-from eigakan.theater.models import Accessibility, Theater
+from eigakan.theater.models import Accessibility, Neighbour, Theater
@@ -1,8 +1,12 @@
 from fastapi import APIRouter
 
 from eigakan.auth.router import router as auth_router
+from eigakan.health import router as health_router
+from eigakan.theater.batch import router as batch_router
 from eigakan.theater.router import router as theater_router
 
 router = APIRouter()
 router.include_router(theater_router, prefix="/theaters", tags=["Theatres"])
+router.include_router(batch_router, tags=["Theatres"])
 router.include_router(auth_router, prefix="/auth", tags=["Auth"])
+router.include_router(health_router, prefix="/health", tags=["Health"])
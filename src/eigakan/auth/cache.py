@@ -0,0 +1,105 @@
+"""
+Authenticated owners, and the theaters they own, cached in process.
+
+`owners` holds the owners by id, read once per `ttl` rather than on every
+authenticated request: they are detached from the session that read them
+and shared, read only, by the requests. An owner is dropped once a write of
+its row is committed by the worker, the owners are not tracked by revision
+though: one written by another worker is served until its `ttl` elapses.
+
+`owned` holds the ids of the theaters owned, by siret, for the ownership
+checks of batches to skip reading the theaters known to be owned. Being per
+worker, it may miss the theaters written by the others: a theater missing
+from it is read rather than deemed not owned. The entries of the owners of
+a theater are dropped once a write of the theater is committed, all of them
+once a write of another worker is seen by `owned_ids`, which reads the
+revision of the theaters before the cache.
+
+Both are disabled by a null `CACHE_OWNER_TTL`, their hit rates being those
+of `TTLCache`.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+
+from eigakan.core import revision
+from eigakan.core.cache import TTLCache
+from eigakan.core.events import Write, defer, on_write
+from eigakan.env import CACHE
+from eigakan.theater.models import Theater
+
+from .models import Owner
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from sqlalchemy import Connection
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import Mapper
+
+owners: TTLCache[int, Owner] = TTLCache(
+    maxsize=CACHE.OWNER_SIZE, ttl=CACHE.OWNER_TTL
+)
+owned: TTLCache[int, frozenset[UUID]] = TTLCache(
+    maxsize=CACHE.OWNER_SIZE, ttl=CACHE.OWNER_TTL
+)
+
+
+async def owned_ids(owner: Owner, session: AsyncSession) -> frozenset[UUID]:
+    """
+    Return the ids of the theaters owned by an owner.
+
+    The revision of the theaters is read first, whatever the route: the
+    theaters owned cached are dropped if another worker wrote theaters.
+    """
+    await revision.read(session, Theater)
+    if (ids := owned.get(owner.siret)) is None:
+        ids = frozenset(
+            (
+                await session.scalars(
+                    select(Theater.id).where(Theater.siret == owner.siret)
+                )
+            ).all()
+        )
+        owned.set(owner.siret, ids)
+    return ids
+
+
+@event.listens_for(Owner, "after_update")
+def _owner_updated(mapper: Mapper, connection: Connection, target) -> None:
+    # owners are not written through `CUD`, their hooks are notified alike
+    defer(object_session(target), Write(Owner, "update", (target.id,)))
+
+
+@event.listens_for(Owner, "after_delete")
+def _owner_deleted(mapper: Mapper, connection: Connection, target) -> None:
+    defer(object_session(target), Write(Owner, "delete", (target.id,)))
+
+
+@on_write(Owner)
+def _forget_owner(write: Write) -> None:
+    """Drop the owner written."""
+    (id_,) = write.identity
+    owners.invalidate(lambda key, _: key == id_)
+
+
+@on_write(Theater)
+def _forget_owned(write: Write) -> None:
+    """Drop the theaters owned by the owners of the theater written."""
+    (id_,) = write.identity
+    siret = (write.values or {}).get("siret")
+    owned.invalidate(lambda key, ids: key == siret or id_ in ids)
+
+
+@revision.on_change(Theater)
+def _forget_all_owned() -> None:
+    """
+    Drop the theaters owned after a write of another worker.
+
+    Called once the revision is read, by `owned_ids` among others.
+    """
+    owned.invalidate()
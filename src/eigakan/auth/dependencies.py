@@ -3,12 +3,16 @@ from typing import Annotated
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from eigakan.core.statement import ReadOneBy
 from eigakan.database.core import Session
 from eigakan.logger import logger
 
+from .cache import owners
+from .exc import TokenValidationException
 from .models import Owner
+from .revocation import revocations
 from .token import decode_jwt_token
 
 _oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -20,8 +24,9 @@ async def current_user(
     """
     Inject the current user.
 
-    Try to fetch a user from the database matching
-    the id found in the bearer token.
+    Try to fetch a user from the cache, or the database, matching
+    the id found in the bearer token. A token claiming the siret of the
+    user is trusted without fetching it, unless revoked.
     If the retrieval failed for any reasons
     will raise immediatly.
 
@@ -41,8 +46,7 @@ async def current_user(
 
     """
     try:
-        id = int(decode_jwt_token(token)["sub"])
-        user = await ReadOneBy("id", id, Owner)(session)
+        user = await _authenticate(decode_jwt_token(token), session)
     except Exception:
         logger.exception("Authentication Failed.")
         raise HTTPException(
@@ -51,4 +55,36 @@ async def current_user(
     return user
 
 
+async def _authenticate(claims: dict, session: AsyncSession) -> Owner:
+    """
+    Return the owner the claims of a token are about.
+
+    Raises
+    ------
+    TokenValidationException
+        if the token is revoked.
+
+    """
+    id = int(claims["sub"])
+    accepted = (
+        revocations.accepts(id, claims["ver"]) if "siret" in claims else None
+    )
+    if accepted:
+        # a principal holding the claims, never persisted
+        return Owner(id=id, siret=claims["siret"], token_version=claims["ver"])
+    if accepted is False:
+        raise TokenValidationException()
+    if (user := owners.get(id)) is None:
+        user = await ReadOneBy("id", id, Owner)(session)
+        if owners.enabled:
+            # shared by the requests, out of any session
+            session.expunge(user)
+            owners.set(id, user)
+    if "siret" in claims and (
+        user.disabled or user.token_version != claims["ver"]
+    ):
+        raise TokenValidationException()
+    return user
+
+
 CurrentUser = Annotated[Owner, Depends(current_user)]
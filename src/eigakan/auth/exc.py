@@ -26,3 +26,10 @@ class InvalidPassword(PasswordException):
 
     def __init__(self, msg: str = "Invalid password"):
         super().__init__(msg)
+
+
+class HashingOverloaded(PasswordException):
+    """Too many passwords are being hashed, the request is not queued."""
+
+    def __init__(self, msg: str = "Too many logins, retry later."):
+        super().__init__(msg)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING
 
-from sqlalchemy import BigInteger, Boolean, LargeBinary, Text
+from sqlalchemy import BigInteger, Boolean, Integer, LargeBinary, Text
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -20,6 +20,8 @@ class Owner(Base, AsyncAttrs, SequentialIdMixin, TimeStampMixin):
     email: Mapped[str] = mapped_column(Text, unique=True)
     password: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
     disabled: Mapped[bool] = mapped_column(Boolean)
+    # bumped to revoke the tokens issued so far
+    token_version: Mapped[int] = mapped_column(Integer, server_default="0")
     theaters: Mapped[list[Theater]] = relationship(
         primaryjoin="Owner.siret == foreign(Theater.siret)",
         uselist=True,
@@ -1,21 +1,114 @@
-"""Password hashing."""
+"""
+Password hashing.
+
+Argon2 is memory and CPU hard by design: a hash takes tens of milliseconds
+the event loop must not be blocked for. Hashes are computed by `pool`, a
+bounded pool of threads (argon2 releases the GIL), and are admitted as long
+as `workers + queue` of them at most are running or waiting: a login beyond
+is refused at once rather than queued behind the others.
+"""
 
 from __future__ import annotations
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 from argon2 import PasswordHasher
 
-from .exc import InvalidPassword
+from eigakan.env import PASSWORD
+
+from .exc import HashingOverloaded, InvalidPassword
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from .models import Owner
 
 
 ph = PasswordHasher()
 
 
-def verify(user: Owner, password: str) -> None:
+class HashPool:
+    """Threads computing hashes, with admission control and metrics."""
+
+    def __init__(self, workers: int, queue: int) -> None:
+        """
+        Initialize the pool.
+
+        Parameters
+        ----------
+        workers : int
+            hashes computed concurrently.
+        queue : int
+            hashes waiting for a worker, at most.
+
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="argon2"
+        )
+        self._limit = workers + queue
+        self._lock = Lock()
+        self.depth = 0
+        """hashes running or waiting."""
+        self.rejected = 0
+        """hashes refused, the pool being full."""
+        self.hashes = 0
+        """hashes computed."""
+        self.hash_time = 0.0
+        """time (seconds) spent computing them, waits excluded."""
+
+    @property
+    def mean_hash_time(self) -> float:
+        """Mean time (seconds) of a hash."""
+        return self.hash_time / self.hashes if self.hashes else 0.0
+
+    async def run[T](self, function: Callable[..., T], *args) -> T:
+        """
+        Compute a hash on a worker.
+
+        Raises
+        ------
+        HashingOverloaded
+            if the workers and the queue are full.
+
+        """
+        if self.depth >= self._limit:
+            self.rejected += 1
+            raise HashingOverloaded()
+        self.depth += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, self._timed, function, *args
+            )
+        finally:
+            self.depth -= 1
+
+    def _timed[T](self, function: Callable[..., T], *args) -> T:
+        start = perf_counter()
+        try:
+            return function(*args)
+        finally:
+            elapsed = perf_counter() - start
+            with self._lock:
+                self.hashes += 1
+                self.hash_time += elapsed
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"{self.__class__.__name__}(depth={self.depth}, "
+            f"rejected={self.rejected}, hashes={self.hashes}, "
+            f"mean_hash_time={self.mean_hash_time:.3f})"
+        )
+
+
+pool = HashPool(workers=PASSWORD.HASH_WORKERS, queue=PASSWORD.HASH_QUEUE)
+
+
+async def verify(user: Owner, password: str) -> None:
     """
     Verify the user's password.
 
@@ -32,18 +125,31 @@ def verify(user: Owner, password: str) -> None:
     ------
     InvalidPassword
         provided password does not match the hash stored.
+    HashingOverloaded
+        too many passwords are being hashed.
 
     """
     try:
-        ph.verify(hash=user.password, password=password)
+        await pool.run(ph.verify, user.password, password)
+    except HashingOverloaded:
+        raise
     except Exception as e:
         raise InvalidPassword() from e
 
 
-def rehash_if_needed(user: Owner, password: str) -> str | None:
-    """Rehash the password if needed."""
-    return (
-        ph.hash(password)
-        if ph.check_needs_rehash(user.password.decode())
-        else None
-    )
+def needs_rehash(user: Owner) -> bool:
+    """Whether the user's hash was computed with outdated parameters."""
+    return ph.check_needs_rehash(user.password.decode())
+
+
+async def rehash(password: str) -> str:
+    """
+    Hash the password with the current parameters.
+
+    Raises
+    ------
+    HashingOverloaded
+        too many passwords are being hashed.
+
+    """
+    return await pool.run(ph.hash, password)
@@ -0,0 +1,114 @@
+"""
+Revocation of the self-contained tokens.
+
+Tokens claiming the siret and token version of their owner (`JWT_CLAIMS`)
+are trusted without reading the owner, as long as `revocations`, the token
+versions and disabled flags of the owners held in process, accepts them.
+
+The table is reloaded every `JWT_REVOCATION_REFRESH` seconds, and as soon
+as a write of an owner is notified on the `owners` channel: disabling an
+owner, or bumping its token version, takes effect within that delay at
+most, whoever wrote it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import psycopg
+from sqlalchemy import event, func, select
+
+from eigakan.database.core import AsyncSessionFactory
+from eigakan.env import DATABASE, JWT
+from eigakan.logger import logger
+
+from .models import Owner
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from sqlalchemy import Connection
+    from sqlalchemy.orm import Mapper
+
+CHANNEL = "owners"
+
+
+class Revocations:
+    """Token versions and disabled flags of the owners, by id."""
+
+    def __init__(self) -> None:
+        self._owners: dict[int, tuple[int, bool]] = {}
+        self.reloads = 0
+
+    def accepts(self, id: int, version: int) -> bool | None:
+        """
+        Whether a token of an owner is accepted.
+
+        Returns
+        -------
+        bool | None
+            None if the owner is unknown to the table, created since its
+            last reload.
+
+        """
+        if (owner := self._owners.get(id)) is None:
+            return None
+        current, disabled = owner
+        return version == current and not disabled
+
+    def update(self, owners: Iterable[tuple[int, int, bool]]) -> None:
+        """Replace the table by the id, token version and flag of owners."""
+        self._owners = {
+            id: (version, bool(disabled)) for id, version, disabled in owners
+        }
+        self.reloads += 1
+
+    async def reload(self) -> None:
+        """Read the table again."""
+        async with AsyncSessionFactory() as session:
+            self.update(
+                await session.execute(
+                    select(Owner.id, Owner.token_version, Owner.disabled)
+                )
+            )
+
+    async def watch(self, period: float) -> None:
+        """Reload the table periodically, or once notified, until cancelled."""
+        conninfo = DATABASE.URL.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(
+                    conninfo, autocommit=True
+                ) as connection:
+                    await connection.execute(f"LISTEN {CHANNEL}")
+                    while True:
+                        await self.reload()
+                        await _notified(connection, period)
+            except (OSError, psycopg.Error):
+                logger.exception("Token revocations cannot be reloaded.")
+                await asyncio.sleep(period)
+
+
+async def _notified(connection: psycopg.AsyncConnection, period: float):
+    """Wait for a notification, for `period` seconds at most."""
+    try:
+        async with asyncio.timeout(period):
+            async for _ in connection.notifies():
+                return
+    except TimeoutError:
+        return
+
+
+revocations = Revocations()
+
+
+@event.listens_for(Owner, "after_insert")
+@event.listens_for(Owner, "after_update")
+@event.listens_for(Owner, "after_delete")
+def _notify(mapper: Mapper, connection: Connection, target) -> None:
+    # sent once the transaction is committed
+    if JWT.CLAIMS:
+        connection.execute(select(func.pg_notify(CHANNEL, str(target.id))))
@@ -1,13 +1,17 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from fastapi.security import OAuth2PasswordRequestForm
 
+from eigakan.core.cud import CUD
 from eigakan.core.statement import ReadOneBy
-from eigakan.database.core import Session
+from eigakan.database.core import AsyncSessionFactory, Session
+from eigakan.env import JWT, RATE_LIMIT
 from eigakan.logger import logger
+from eigakan.slow import limiter
 
 from . import password
+from .exc import HashingOverloaded
 from .models import Owner
 from .schemas import Token
 from .token import create_jwt_token
@@ -19,9 +23,12 @@ router = APIRouter()
     "/token",
     response_model=Token,
 )
+@limiter.limit(RATE_LIMIT.LOGIN)
 async def login(
+    request: Request,
     session: Session,
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    background_tasks: BackgroundTasks,
 ) -> dict[str, str | bytes]:
     """
     Generate the bearer token.
@@ -31,11 +38,15 @@ async def login(
 
     Parameters
     ----------
+    request : Request
+        the request, its client being rate limited.
     form_data : fastapi.OAuth2PasswordRequestForm
         payload submited from an html form,
         containing at least `username`and `password` field.
     session : AsyncSession
         SQLAlchemy session tied to the database.
+    background_tasks : BackgroundTasks
+        tasks run once the response is sent, the rehash of the password.
 
     Returns
     -------
@@ -44,11 +55,29 @@ async def login(
 
     """
     owner = await ReadOneBy("email", form_data.username, Owner)(session)
-    password.verify(owner, form_data.password)
-    if new_hash := password.rehash_if_needed(owner, form_data.password):
-        owner.password = bytes(new_hash, "utf-8")
-        await session.commit()
+    await password.verify(owner, form_data.password)
+    if password.needs_rehash(owner):
+        background_tasks.add_task(_rehash, owner.id, form_data.password)
 
-    access_token = create_jwt_token(sub=str(owner.id))
+    access_token = (
+        create_jwt_token(
+            sub=str(owner.id), siret=owner.siret, version=owner.token_version
+        )
+        if JWT.CLAIMS
+        else create_jwt_token(sub=str(owner.id))
+    )
     logger.exception("fuck")
     return {"access_token": access_token, "token_type": "bearer"}
+
+
+async def _rehash(id: int, secret: str) -> None:
+    """Store a hash of the password computed with the current parameters."""
+    try:
+        new_hash = await password.rehash(secret)
+    except HashingOverloaded:
+        # rehashed on a later login
+        return
+    async with AsyncSessionFactory() as session:
+        await CUD(Owner).update_where(
+            {"password": bytes(new_hash, "utf-8")}, {"id": id}, session
+        )
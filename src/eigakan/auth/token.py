@@ -13,14 +13,23 @@ from .exc import TokenValidationException
 __HEADER = {"alg": "HS256"}
 
 
-def create_jwt_token(sub: str) -> str:
-    """Encode a JWT."""
+def create_jwt_token(
+    sub: str, siret: int | None = None, version: int | None = None
+) -> str:
+    """
+    Encode a JWT.
+
+    The siret and token version of the owner are claimed as well if given,
+    for the token to be trusted without reading the owner.
+    """
     now = datetime.now(UTC)
     claims = {
         "sub": sub,
         "iat": now,
         "exp": now + timedelta(hours=JWT.HOURS_TO_EXPIRE),
     }
+    if siret is not None:
+        claims |= {"siret": siret, "ver": version}
     jwt_token = jwt.encode(claims, headers=__HEADER, key=str(JWT.SECRET))
     return jwt_token
 
@@ -0,0 +1,131 @@
+"""
+Benchmarks.
+
+`rows`, run against the seeded database, compares the two ways a page of
+theaters is read and serialized:
++ `orm`: instances hydrated by the ORM, validated by `response_model`,
++ `rows`: plain rows dumped by the prebuilt adapters of `theater.rows`.
+
+`rate_limits` measures the overhead of a rate limit check, by storage.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+import tempfile
+from statistics import median
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from geoalchemy2.elements import WKTElement
+from limits import parse, strategies
+from limits.storage import MemoryStorage
+
+from eigakan.core.shm import SharedMemoryStorage
+from eigakan.core.statement import ReadPage
+from eigakan.core.updaters import Pagination
+from eigakan.database.core import AsyncSessionFactory, engine
+from eigakan.theater import rows as theater_rows
+from eigakan.theater import schemas as sch
+from eigakan.theater.models import Theater
+from eigakan.theater.updaters import ClosestUpdater
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from limits.storage import Storage
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# iterations per case
+ROUNDS = 200
+_PARIS = WKTElement("POINT(2.3522 48.8566)", srid=4326)
+
+
+def _updaters(limit: int) -> tuple:
+    return (
+        ClosestUpdater(Theater, _PARIS, knn=True, geodesic=True),
+        Pagination(page=1, limit=limit),
+    )
+
+
+async def _orm(session: AsyncSession, limit: int) -> bytes:
+    updaters = _updaters(limit)
+    page = await ReadPage(Theater, *updaters)(session)
+    return sch.Theaters.model_validate(
+        {
+            "content": page.content,
+            "pagination": {"current": 1, "total": page.total},
+        },
+        from_attributes=True,
+    ).model_dump_json()
+
+
+async def _rows(session: AsyncSession, limit: int) -> bytes:
+    updaters = _updaters(limit)
+    page = await ReadPage(Theater, *updaters, columns=theater_rows.COLUMNS)(
+        session
+    )
+    return theater_rows.page(
+        page.content, {"current": 1, "total": page.total}
+    ).body
+
+
+async def _time(
+    read: Callable[[AsyncSession, int], Awaitable[bytes]], limit: int
+) -> float:
+    """Return the median time (ms) of a read, its own session included."""
+    timings = []
+    for _ in range(ROUNDS):
+        start = perf_counter()
+        async with AsyncSessionFactory() as session:
+            await read(session, limit)
+        timings.append((perf_counter() - start) * 1000)
+    return median(timings)
+
+
+async def _rows_benchmark() -> None:
+    try:
+        for limit in (20, 100):
+            # warm up the pool and the statement caches
+            async with AsyncSessionFactory() as session:
+                await _orm(session, limit)
+                await _rows(session, limit)
+            orm, rows = await _time(_orm, limit), await _time(_rows, limit)
+            sys.stdout.write(
+                f"page of {limit}: orm {orm:.2f} ms, rows {rows:.2f} ms, "
+                f"x{orm / rows:.1f}\n"
+            )
+    finally:
+        await engine.dispose()
+
+
+def rows() -> None:
+    """Compare the ORM and the rows reads of a page of theaters."""
+    asyncio.run(_rows_benchmark())
+
+
+# checks per storage, spread over `_CLIENTS` keys
+CHECKS = 100_000
+_CLIENTS = 1000
+
+
+def _check_time(storage: Storage) -> float:
+    """Return the mean time (µs) of a sliding window check."""
+    limiter = strategies.SlidingWindowCounterRateLimiter(storage)
+    item = parse("100/minute")
+    keys = [f"client-{client}" for client in range(_CLIENTS)]
+    start = perf_counter()
+    for check in range(CHECKS):
+        limiter.hit(item, keys[check % _CLIENTS])
+    return (perf_counter() - start) / CHECKS * 1e6
+
+
+def rate_limits() -> None:
+    """Measure a rate limit check, in process and in shared memory."""
+    with tempfile.TemporaryDirectory() as directory:
+        for name, storage in (
+            ("memory", MemoryStorage()),
+            ("shm", SharedMemoryStorage(f"shm://{directory}/limits")),
+        ):
+            sys.stdout.write(f"{name}: {_check_time(storage):.2f} µs\n")
@@ -1 +1,16 @@
 from eigakan.database.manage import drop, seed  # noqa: F401
+
+
+# the benches are only imported when run, along with their dependencies
+def bench_rows() -> None:
+    """Compare the ORM and the rows reads of a page of theaters."""
+    from eigakan.bench import rows  # noqa: PLC0415
+
+    rows()
+
+
+def bench_rate_limits() -> None:
+    """Measure a rate limit check, in process and in shared memory."""
+    from eigakan.bench import rate_limits  # noqa: PLC0415
+
+    rate_limits()
@@ -0,0 +1,93 @@
+"""In-process caches."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable
+
+
+class TTLCache[Key: Hashable, Value]:
+    """
+    Bounded LRU mapping whose entries expire after `ttl` seconds.
+
+    A non positive `ttl` disables the cache: nothing is ever stored.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        maxsize : int
+            maximum number of entries, least recently used are evicted first.
+        ttl : float
+            time to live of the entries (seconds).
+
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries: OrderedDict[Key, tuple[float, Value]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything."""
+        return self._ttl > 0 and self._maxsize > 0
+
+    def get(self, key: Key) -> Value | None:
+        """Return the value stored for key if any and not expired."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Key, value: Value) -> None:
+        """Store value for key, evicting the least recently used entries."""
+        if not self.enabled:
+            return
+        self._entries[key] = (monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(
+        self, predicate: Callable[[Key, Value], bool] | None = None
+    ) -> None:
+        """Drop the entries matching the predicate (all by default)."""
+        if predicate is None:
+            self._entries.clear()
+            return
+        for key in [
+            key
+            for key, (_, value) in self._entries.items()
+            if predicate(key, value)
+        ]:
+            del self._entries[key]
+
+    @property
+    def hit_rate(self) -> float:
+        """Ratio of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        """Return the number of entries (expired ones included)."""
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"{self.__class__.__name__}(maxsize={self._maxsize}, "
+            f"ttl={self._ttl}, hits={self.hits}, misses={self.misses})"
+        )
@@ -0,0 +1,97 @@
+"""
+Conditional requests: validators of the representations read.
+
+A representation is sent with its `ETag` and, if known, its
+`Last-Modified` date, along with the `Cache-Control` of the app. A request
+holding a matching `If-None-Match` (or, without one, an `If-Modified-Since`
+not older than the representation) is answered `304 Not Modified`: the
+endpoints compute the validators first, from a version or a revision,
+and read the representation only if it changed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+
+from fastapi import Response
+
+from eigakan.env import APP
+
+CACHE_CONTROL = (
+    f"public, max-age={APP.HTTP_MAX_AGE}" if APP.HTTP_MAX_AGE else "no-cache"
+)
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an `If-None-Match` header matches an ETag (weakly)."""
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+@dataclass(frozen=True, slots=True)
+class Conditions:
+    """Validators sent by the client, from its cached representation."""
+
+    if_none_match: str | None = None
+    if_modified_since: str | None = None
+
+    @property
+    def sent(self) -> bool:
+        """Whether the request is conditional."""
+        return (
+            self.if_none_match is not None
+            or self.if_modified_since is not None
+        )
+
+    def fresh(self, etag: str, last_modified: datetime | None = None) -> bool:
+        """
+        Whether the representation cached by the client is still current.
+
+        `If-Modified-Since` is ignored when `If-None-Match` is sent, as well
+        as when malformed.
+        """
+        if self.if_none_match is not None:
+            return matches(self.if_none_match, etag)
+        if self.if_modified_since is None or last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(self.if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=UTC)
+        return _utc(last_modified).replace(microsecond=0) <= since
+
+
+def headers(
+    etag: str, last_modified: datetime | None = None
+) -> dict[str, str]:
+    """Return the validators and caching headers of a representation."""
+    validators = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        validators["Last-Modified"] = format_datetime(
+            _utc(last_modified), usegmt=True
+        )
+    return validators
+
+
+def not_modified(etag: str, last_modified: datetime | None = None) -> Response:
+    """Return the `304 Not Modified` response of a representation."""
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED,
+        headers=headers(etag, last_modified),
+    )
+
+
+def _utc(moment: datetime) -> datetime:
+    # naive timestamps are read as UTC, the time zone of the database
+    return (
+        moment.replace(tzinfo=UTC)
+        if moment.tzinfo is None
+        else moment.astimezone(UTC)
+    )
@@ -0,0 +1,111 @@
+"""Strategies used to count the lines matched by a statement."""
+
+from __future__ import annotations
+
+from enum import StrEnum, auto
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Table, text
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+
+from eigakan.env import CACHE
+
+from .cache import TTLCache
+from .events import on_write
+from .revision import on_change
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable
+
+    from sqlalchemy import Select
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.sql.compiler import SQLCompiler
+
+    from .events import Write
+
+
+class Count(StrEnum):
+    """How the total number of lines is obtained."""
+
+    NONE = auto()
+    """lines are not counted."""
+    ESTIMATE = auto()
+    """rows estimated by the planner, cheap but approximate."""
+    EXACT = auto()
+    """lines are counted on each call."""
+    CACHED = auto()
+    """exact count, cached until a write or its expiration."""
+
+
+counts: TTLCache[Hashable, int] = TTLCache(
+    maxsize=CACHE.COUNT_SIZE, ttl=CACHE.COUNT_TTL
+)
+"""Exact counts keyed by the SQL of the (filtered) statement counted."""
+
+
+@on_write()
+def _invalidate_counts(write: Write) -> None:
+    """Any committed write may change any count."""
+    counts.invalidate()
+
+
+@on_change()
+def _forget_counts() -> None:
+    """Any table may have been written by another worker."""
+    counts.invalidate()
+
+
+class Explain(Executable, ClauseElement):
+    """`EXPLAIN (FORMAT JSON)` a statement without executing it."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select) -> None:
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler: SQLCompiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate(session: AsyncSession, statement: Select) -> int:
+    """
+    Estimate the number of lines matched by a statement.
+
+    Unfiltered statements are estimated from `pg_class.reltuples`, others
+    from the rows the planner expects.
+
+    Parameters
+    ----------
+    session : AsyncSession
+        SQLAlchemy session.
+    statement : Select
+        unsliced statement whose lines are counted.
+
+    Returns
+    -------
+    int
+        the estimated number of lines.
+
+    """
+    froms = statement.get_final_froms()
+    if (
+        statement.whereclause is None
+        and len(froms) == 1
+        and isinstance(froms[0], Table)
+    ):
+        # reltuples is -1 until the relation has been vacuumed or analyzed.
+        estimated = await session.scalar(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = CAST(:relation AS regclass)"
+            ),
+            {"relation": froms[0].fullname},
+        )
+        if estimated is not None and estimated >= 0:
+            return estimated
+    plan = await session.scalar(Explain(statement))
+    return int(plan[0]["Plan"]["Plan Rows"])
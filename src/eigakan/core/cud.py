@@ -2,18 +2,31 @@
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple
 
 from psycopg.errors import ForeignKeyViolation, UniqueViolation
+from sqlalchemy import (
+    Boolean,
+    and_,
+    delete,
+    literal_column,
+    select,
+    true,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
+from .events import Write, defer, dispatch
 from .exc import (
     DuplicatedResource,
     ResourceNotFound,
 )
+from .registry import describe
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Mapping, Sequence
     from typing import Any, Type
 
     from sqlalchemy.ext.asyncio import AsyncSession
@@ -21,6 +34,25 @@ if TYPE_CHECKING:
     from eigakan.types import M
 
 
+class Created[Resource: M](NamedTuple):
+    """Resources created by a batch, and the errors of the others by index."""
+
+    content: list[Resource]
+    errors: dict[int, ResourceNotFound | DuplicatedResource]
+
+
+class Upserted(NamedTuple):
+    """Number of resources inserted, updated and left unchanged."""
+
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+# bound parameters of a statement, at most
+_PARAMETERS = 65535
+
+
 class CUD[Resource: M]:
     """Basic CUD operations for a given sqlalchemy model."""
 
@@ -40,6 +72,8 @@ class CUD[Resource: M]:
         self,
         resource: Mapping[str, Any],
         session: AsyncSession,
+        *,
+        commit: bool = True,
     ) -> Resource:
         """
         Create a new resource.
@@ -50,6 +84,10 @@ class CUD[Resource: M]:
             flat representation of the resource to create.
         session : AsyncSession
             SQLAlchemy session.
+        commit : bool, optional
+            whether the transaction is committed, True by default. Otherwise
+            the write is only flushed, the hooks being notified once the
+            caller commits it.
 
         Returns
         -------
@@ -78,11 +116,223 @@ class CUD[Resource: M]:
         transient_resource = self._model(**resource)
         session.add(transient_resource)
         try:
-            await session.commit()
+            await session.flush()
+            defer(
+                session,
+                Write(
+                    self._model,
+                    "create",
+                    describe(self._model).identity(transient_resource),
+                    resource,
+                ),
+            )
+            if commit:
+                await session.commit()
         except IntegrityError as exc:
             raise _handle_integrity_error(exc) from exc
         return transient_resource
 
+    async def create_many(
+        self,
+        resources: Sequence[Mapping[str, Any]],
+        session: AsyncSession,
+    ) -> Created[Resource]:
+        """
+        Create many resources, in a single transaction.
+
+        The resources are flushed together, as multi-row `INSERT ...
+        RETURNING` statements. If one of them violates a constraint, each
+        one is then flushed in a savepoint of its own so that the others are
+        still created and the faulty ones reported.
+
+        Parameters
+        ----------
+        resources : Sequence[Mapping[str, Any]]
+            flat representations of the resources to create.
+        session : AsyncSession
+            SQLAlchemy session.
+
+        Returns
+        -------
+        Created[Resource]
+            the resources created, in order, and the errors of the others
+            by index: `DuplicatedResource` if the resource already exists,
+            `ResourceNotFound` if it contains a foreign key that does not
+            exist.
+
+        Raises
+        ------
+        IntegrityError
+            if a resource violates any other constraint, nothing is created.
+
+        Examples
+        --------
+        >>> from eigakan.theater.models import Theater
+        >>> from eigakan.core.cud import CUD
+        >>> from eigakan.database.core import AsyncSessionFactory
+        >>> cud = CUD(Theater)
+        >>> async with AsyncSessionFactory() as session:
+        ...     await cud.create_many([{"name": "Cinecool", ...}], session)
+        Created(content=[Theater(id=1, name="Cinecool", ...)], errors={})
+
+        """
+        created: dict[int, Resource] = {}
+        errors: dict[int, ResourceNotFound | DuplicatedResource] = {}
+        try:
+            async with session.begin_nested():
+                created = {
+                    index: self._model(**resource)
+                    for index, resource in enumerate(resources)
+                }
+                session.add_all(created.values())
+        except IntegrityError:
+            created = {}
+            for index, resource in enumerate(resources):
+                transient_resource = self._model(**resource)
+                try:
+                    async with session.begin_nested():
+                        session.add(transient_resource)
+                except IntegrityError as exc:
+                    error = _handle_integrity_error(exc)
+                    if error is exc:
+                        await session.rollback()
+                        raise
+                    errors[index] = error
+                else:
+                    created[index] = transient_resource
+        try:
+            await session.commit()
+        except IntegrityError as exc:
+            raise _handle_integrity_error(exc) from exc
+        metadata = describe(self._model)
+        for index, transient_resource in created.items():
+            dispatch(
+                Write(
+                    self._model,
+                    "create",
+                    metadata.identity(transient_resource),
+                    resources[index],
+                )
+            )
+        return Created(list(created.values()), errors)
+
+    async def upsert_many(
+        self,
+        resources: Sequence[Mapping[str, Any]],
+        session: AsyncSession,
+        *,
+        key: str,
+        where: Mapping[str, Any] | None = None,
+    ) -> Upserted:
+        """
+        Insert the new resources and update the changed ones, in bulk.
+
+        The resources are sent as multi-row `INSERT ... ON CONFLICT (key) DO
+        UPDATE ... WHERE` statements: an existing resource is only written
+        if one of its values differs, an unchanged one costs no write.
+
+        Parameters
+        ----------
+        resources : Sequence[Mapping[str, Any]]
+            flat representations of the resources, holding the same
+            attributes. The last one wins if some share a key.
+        session : AsyncSession
+            SQLAlchemy session.
+        key : str
+            unique attribute identifying the resources.
+        where : Mapping[str, Any] | None, optional
+            values of the attributes existing resources must match to be
+            updated, others are left unchanged.
+
+        Returns
+        -------
+        Upserted
+            number of resources inserted, updated and left unchanged.
+
+        Raises
+        ------
+        ResourceNotFound
+            if a resource contains a foreign key that does not exist, nothing
+            is written.
+
+        Examples
+        --------
+        >>> from eigakan.theater.models import Theater
+        >>> from eigakan.core.cud import CUD
+        >>> from eigakan.database.core import AsyncSessionFactory
+        >>> cud = CUD(Theater)
+        >>> async with AsyncSessionFactory() as session:
+        ...     await cud.upsert_many(
+        ...         [{"osm_id": "node/1", "name": "Cinecool", ...}],
+        ...         session,
+        ...         key="osm_id",
+        ...     )
+        Upserted(inserted=1, updated=0, unchanged=0)
+
+        """
+        metadata = describe(self._model)
+        by_key = {resource[key]: resource for resource in resources}
+        resources = list(by_key.values())
+        if not resources:
+            return Upserted(0, 0, 0)
+        names = [name for name in resources[0] if name != key]
+        columns = [metadata.columns[name] for name in names]
+        statement = insert(self._model)
+        excluded = [
+            statement.excluded[column.expression.key] for column in columns
+        ]
+        set_ = dict(zip(columns, excluded, strict=True))
+        # `ON CONFLICT` ignores the update defaults: versions, timestamps
+        assigned = {column.expression.key for column in columns}
+        set_.update(
+            (column, column.onupdate.arg)
+            for column in self._model.__table__.columns
+            if column.onupdate is not None
+            and column.onupdate.is_clause_element
+            and column.key not in assigned
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[metadata.columns[key]],
+            set_=set_,
+            where=and_(
+                tuple_(*columns).is_distinct_from(tuple_(*excluded)),
+                self._matching(where) if where else true(),
+            ),
+        ).returning(
+            *metadata.primary_key,
+            metadata.columns[key],
+            # the line has no previous version
+            literal_column("xmax = 0", Boolean).label("inserted"),
+        )
+        written = []
+        # the primary key may be generated, as a parameter
+        size = _PARAMETERS // (len(resources[0]) + 1)
+        try:
+            for start in range(0, len(resources), size):
+                result = await session.execute(
+                    statement.values(resources[start : start + size])
+                )
+                written.extend(result.all())
+            await session.commit()
+        except IntegrityError as exc:
+            raise _handle_integrity_error(exc) from exc
+        inserted = 0
+        for *identity, value, created in written:
+            inserted += created
+            dispatch(
+                Write(
+                    self._model,
+                    "create" if created else "update",
+                    tuple(identity),
+                    by_key[value],
+                )
+            )
+        return Upserted(
+            inserted,
+            len(written) - inserted,
+            len(resources) - len(written),
+        )
+
     async def update(
         self,
         body: Mapping,
@@ -132,6 +382,100 @@ class CUD[Resource: M]:
             await session.commit()
         except IntegrityError as exc:
             raise _handle_integrity_error(exc) from exc
+        dispatch(
+            Write(
+                self._model,
+                "update",
+                describe(self._model).identity(resource),
+                body,
+            )
+        )
+
+    async def update_where(
+        self,
+        body: Mapping[str, Any],
+        where: Mapping[str, Any],
+        session: AsyncSession,
+        *,
+        commit: bool = True,
+    ) -> bool:
+        """
+        Update the resource matching some values, without loading it.
+
+        A single `UPDATE ... WHERE ... RETURNING` statement is sent, the
+        primary key returned telling whether a resource matched.
+
+        Parameters
+        ----------
+        body : Mapping[str, Any]
+            mapping of attributes to update, the resource is only looked up
+            if empty.
+        where : Mapping[str, Any]
+            values of the attributes the resource is matched by, its primary
+            key among them.
+        session : AsyncSession
+            SQLAlchemy session.
+        commit : bool, optional
+            whether the transaction is committed, True by default. Otherwise
+            the write is only flushed, the hooks being notified once the
+            caller commits it.
+
+        Returns
+        -------
+        bool
+            whether a resource matched, and was updated. If none did, the
+            transaction is rolled back rather than committed.
+
+        Raises
+        ------
+        DuplicatedResource
+            if one of the new values violates a unicity constraint.
+        ResourceNotFound
+            if one foreign key of the resource is updated to a value that does
+            not exist.
+
+        Examples
+        --------
+        Update a theater owned by a given siret:
+        >>> from eigakan.theater.models import Theater
+        >>> from eigakan.core.cud import CUD
+        >>> from eigakan.database.core import AsyncSessionFactory
+        >>> cud = CUD(Theater)
+        >>> async with AsyncSessionFactory() as session:
+        ...     await cud.update_where(
+        ...         {"name": "Cinecool 2.0"},
+        ...         {"id": theater_id, "siret": siret},
+        ...         session,
+        ...     )
+        True
+
+        """
+        primary_key = describe(self._model).primary_key
+        statement = (
+            update(self._model)
+            .where(self._matching(where))
+            .values(body)
+            .returning(*primary_key)
+            if body
+            else select(*primary_key).where(self._matching(where))
+        )
+        try:
+            identity = (await session.execute(statement)).first()
+            if identity is None:
+                # nothing written, nothing to commit
+                if commit:
+                    await session.rollback()
+                return False
+            if body:
+                defer(
+                    session,
+                    Write(self._model, "update", tuple(identity), body),
+                )
+            if commit:
+                await session.commit()
+        except IntegrityError as exc:
+            raise _handle_integrity_error(exc) from exc
+        return True
 
     async def delete(
         self,
@@ -160,8 +504,74 @@ class CUD[Resource: M]:
         ...         session,
         ...     )
         """
+        identity = describe(self._model).identity(resource)
         await session.delete(resource)
         await session.commit()
+        dispatch(Write(self._model, "delete", identity))
+
+    async def delete_where(
+        self,
+        where: Mapping[str, Any],
+        session: AsyncSession,
+        *,
+        commit: bool = True,
+    ) -> bool:
+        """
+        Delete the resource matching some values, without loading it.
+
+        A single `DELETE ... WHERE ... RETURNING` statement is sent, the
+        primary key returned telling whether a resource matched.
+
+        Parameters
+        ----------
+        where : Mapping[str, Any]
+            values of the attributes the resource is matched by, its primary
+            key among them.
+        session : AsyncSession
+            SQLAlchemy session.
+        commit : bool, optional
+            whether the transaction is committed, True by default. Otherwise
+            the write is only flushed, the hooks being notified once the
+            caller commits it.
+
+        Returns
+        -------
+        bool
+            whether a resource matched, and was deleted. If none did, the
+            transaction is rolled back rather than committed.
+
+        Examples
+        --------
+        >>> from eigakan.theater.models import Theater
+        >>> from eigakan.core.cud import CUD
+        >>> from eigakan.database.core import AsyncSessionFactory
+        >>> cud = CUD(Theater)
+        >>> async with AsyncSessionFactory() as session:
+        ...     await cud.delete_where({"id": theater_id}, session)
+        True
+
+        """
+        identity = (
+            await session.execute(
+                delete(self._model)
+                .where(self._matching(where))
+                .returning(*describe(self._model).primary_key)
+            )
+        ).first()
+        if identity is None:
+            # nothing written, nothing to commit
+            if commit:
+                await session.rollback()
+            return False
+        defer(session, Write(self._model, "delete", tuple(identity)))
+        if commit:
+            await session.commit()
+        return True
+
+    def _matching(self, where: Mapping[str, Any]):
+        """Return the clause matching the values of some attributes."""
+        columns = describe(self._model).columns
+        return and_(*(columns[name] == value for name, value in where.items()))
 
 
 def _handle_integrity_error(exc: IntegrityError) -> Exception:
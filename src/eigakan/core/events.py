@@ -0,0 +1,112 @@
+"""Hooks notified of the writes committed through `CUD`."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from eigakan.logger import logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from typing import Any
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.orm import SessionTransaction
+
+    from eigakan.types import M
+
+    type Hook = Callable[[Write], None]
+
+
+@dataclass(frozen=True, slots=True)
+class Write:
+    """A write committed to the database."""
+
+    model: type[M]
+    operation: Literal["create", "update", "delete"]
+    identity: tuple[Any, ...]
+    values: Mapping[str, Any] | None = None
+
+
+_HOOKS: defaultdict[type[M] | None, list[Hook]] = defaultdict(list)
+
+
+def on_write(*models: type[M]) -> Callable[[Hook], Hook]:
+    """
+    Register the decorated function as a write hook.
+
+    Parameters
+    ----------
+    *models : type[M]
+        models whose writes are notified, all models if omitted.
+
+    Examples
+    --------
+    >>> @on_write(Theater)
+    ... def forget(write: Write) -> None:
+    ...     cache.invalidate()
+
+    """
+
+    def decorator(hook: Hook) -> Hook:
+        for model in models or (None,):
+            _HOOKS[model].append(hook)
+        return hook
+
+    return decorator
+
+
+def dispatch(write: Write) -> None:
+    """
+    Notify the hooks of a committed write.
+
+    Hooks run once the transaction is committed, a failing hook is logged and
+    does not prevent the others from running.
+    """
+    for hook in (*_HOOKS[None], *_HOOKS[write.model]):
+        try:
+            hook(write)
+        except Exception:
+            logger.exception("Write hook %s failed.", hook.__qualname__)
+
+
+# writes of a session awaiting its commit, by (sub)transaction
+_PENDING = "pending_writes"
+
+
+def defer(session: AsyncSession | Session, write: Write) -> None:
+    """
+    Notify the hooks of a write once the transaction writing it is committed.
+
+    The write is dropped if the transaction, or the savepoint it was written
+    in, is rolled back.
+    """
+    session = getattr(session, "sync_session", session)
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault(_PENDING, defaultdict(list))[transaction].append(
+        write
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session: Session) -> None:
+    if not (pending := session.info.get(_PENDING)):
+        return
+    transaction = session.get_nested_transaction()
+    if transaction is not None:
+        # released, the writes of the savepoint now await its parent
+        pending[transaction.parent].extend(pending.pop(transaction, ()))
+        return
+    for write in pending.pop(session.get_transaction(), ()):
+        dispatch(write)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _ended(session: Session, transaction: SessionTransaction) -> None:
+    # the writes neither committed nor released are rolled back
+    session.info.get(_PENDING, {}).pop(transaction, None)
@@ -0,0 +1,138 @@
+"""
+Coalesce concurrent reads of single resources into a single statement.
+
+Reads by a unique column requested within `window` seconds of each other
+are gathered and answered by a single `ReadManyBy`, in a session of the
+loader's own: concurrent requests for single resources then take a single
+pooled connection instead of one each.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from operator import attrgetter, itemgetter
+from typing import TYPE_CHECKING
+
+from .exc import ResourceNotFound
+from .statement import ReadManyBy
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Hashable, Sequence
+    from contextlib import AbstractAsyncContextManager
+    from typing import Type
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.sql.elements import ColumnElement
+
+    from eigakan.types import M
+
+
+class Loader[Model: M]:
+    """Dataloader reading resources by a unique column, in batches."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        model: Type[Model],
+        sessions: Callable[[], AbstractAsyncContextManager[AsyncSession]],
+        *,
+        column: str = "id",
+        window: float,
+        size: int,
+        columns: Sequence[ColumnElement] | None = None,
+    ) -> None:
+        """
+        Initialize the loader.
+
+        Parameters
+        ----------
+        model : Type[Model]
+            SQLAlchemy model read.
+        sessions : Callable[[], AbstractAsyncContextManager[AsyncSession]]
+            factory of the sessions the batches are read with.
+        column : str, optional
+            unique column the resources are read by, "id" by default.
+        window : float
+            time (seconds) reads are gathered for, a null one disables the
+            loader.
+        size : int
+            maximum number of values read at once, a full batch is read
+            without waiting for the window to elapse.
+        columns : Sequence[ColumnElement] | None, optional
+            columns read as plain rows, instances are read by default.
+
+        """
+        self._model = model
+        self._sessions = sessions
+        self._column = column
+        self._window = window
+        self._size = size
+        self._columns = columns
+        self._pending: dict[Hashable, asyncio.Future[Model]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether reads are coalesced."""
+        return self._window > 0
+
+    async def load(self, value: Hashable) -> Model:
+        """
+        Read a resource, along with the other resources requested meanwhile.
+
+        Raises
+        ------
+        ResourceNotFound
+            if no resource matches the value.
+
+        """
+        if (future := self._pending.get(value)) is None:
+            loop = asyncio.get_running_loop()
+            future = self._pending[value] = loop.create_future()
+            if len(self._pending) >= self._size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = loop.call_later(self._window, self._dispatch)
+        # a cancelled request must not cancel the others awaiting the value
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        """Read the pending values in a task of their own."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        task = asyncio.create_task(self._read(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _read(self, pending: dict[Hashable, asyncio.Future[Model]]):
+        """
+        Resolve the futures of a batch.
+
+        Every future is resolved whatever happens, the read being cancelled
+        included, so that no request awaits its value forever.
+        """
+        self.batches += 1
+        error: BaseException | None = None
+        try:
+            async with self._sessions() as session:
+                many = await ReadManyBy(
+                    self._column, pending, self._model, columns=self._columns
+                )(session)
+            key = attrgetter if self._columns is None else itemgetter
+            for resource in many.content:
+                pending[key(self._column)(resource)].set_result(resource)
+        except Exception as exc:
+            error = exc
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            for value, future in pending.items():
+                if not future.done():
+                    # the values read and found missing alike
+                    future.set_exception(
+                        error or ResourceNotFound(self._column, value)
+                    )
@@ -0,0 +1,162 @@
+"""
+Metadata of the mapped models, gathered once per model.
+
+Statements, updaters and CUD operations need the primary key, the unique
+columns, the relationships and the sortable columns of the model they
+handle. These are gathered when SQLAlchemy configures the mapper of the
+model, rather than inspected again on every request.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Column, Index, UniqueConstraint, event, inspect
+from sqlalchemy.orm import configure_mappers
+
+from eigakan.database.core import Base
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from typing import Any, Type
+
+    from sqlalchemy.orm import InstrumentedAttribute, Mapper
+
+    from eigakan.types import M
+
+
+@dataclass(frozen=True, slots=True)
+class Metadata:
+    """Primary key, unique, related and sortable attributes of a model."""
+
+    model: Type[M]
+    primary_key: tuple[InstrumentedAttribute, ...]
+    """attributes of the primary key, composite or not."""
+    unique: frozenset[str]
+    """attributes identifying a single resource on their own."""
+    columns: Mapping[str, InstrumentedAttribute]
+    """attributes mapped to a column, by name."""
+    relationships: Mapping[str, Type[M]]
+    """models targeted by the relationships, by name."""
+    sortable: Mapping[str, InstrumentedAttribute]
+    """attributes mapped to a column whose values can be ordered."""
+
+    def identity(self, resource: M) -> tuple[Any, ...]:
+        """Return the primary key values of a resource."""
+        return tuple(getattr(resource, pk.key) for pk in self.primary_key)
+
+    def target(self, key: str) -> tuple[Type[M], str]:
+        """
+        Resolve a key, dotted if it goes through a relationship.
+
+        Parameters
+        ----------
+        key : str
+            attribute of the model, or `relationship.attribute`.
+
+        Returns
+        -------
+        tuple[Type[M], str]
+            the model holding the attribute and the attribute name.
+
+        """
+        if "." not in key:
+            return self.model, key
+        relationship, attribute = key.split(".", 1)
+        return self.relationships[relationship], attribute
+
+    @classmethod
+    def of(cls, mapper: Mapper) -> Metadata:
+        """Gather the metadata of a mapper."""
+        attributes = {
+            prop.columns[0]: getattr(mapper.class_, prop.key)
+            for prop in mapper.column_attrs
+            if isinstance(prop.columns[0], Column)
+        }
+        primary_key = tuple(
+            attributes[column] for column in mapper.primary_key
+        )
+        # single columns constraining the uniqueness of the lines
+        unique = {
+            constraint.columns[0]
+            for constraint in (
+                *mapper.local_table.constraints,
+                *mapper.local_table.indexes,
+            )
+            if (
+                isinstance(constraint, UniqueConstraint)
+                or (isinstance(constraint, Index) and constraint.unique)
+            )
+            and len(constraint.columns) == 1
+        }
+        unique.update(column for column in attributes if column.unique)
+        if len(primary_key) == 1:
+            unique.add(mapper.primary_key[0])
+        return cls(
+            model=mapper.class_,
+            primary_key=primary_key,
+            unique=frozenset(
+                attributes[column].key
+                for column in unique
+                if column in attributes
+            ),
+            columns={
+                attribute.key: attribute for attribute in attributes.values()
+            },
+            relationships={
+                name: relationship.mapper.class_
+                for name, relationship in mapper.relationships.items()
+            },
+            sortable={
+                attribute.key: attribute
+                for column, attribute in attributes.items()
+                if _orderable(column)
+            },
+        )
+
+
+_registry: dict[type, Metadata] = {}
+
+
+def describe(model: Type[M]) -> Metadata:
+    """
+    Return the metadata of a model.
+
+    Mappers are configured, hence their metadata gathered, if they have not
+    been yet.
+
+    Parameters
+    ----------
+    model : Type[M]
+        mapped class.
+
+    Returns
+    -------
+    Metadata
+        the metadata of the model.
+
+    """
+    if (metadata := _registry.get(model)) is None:
+        configure_mappers()
+        metadata = _registry.get(model) or _register(inspect(model))
+    return metadata
+
+
+def _register(mapper: Mapper) -> Metadata:
+    _registry[mapper.class_] = metadata = Metadata.of(mapper)
+    return metadata
+
+
+@event.listens_for(Base, "mapper_configured", propagate=True)
+def _mapper_configured(mapper: Mapper, class_: type) -> None:
+    _register(mapper)
+
+
+def _orderable(column: Column) -> bool:
+    """Whether the values of a column have a python (ordered) type."""
+    try:
+        column.type.python_type  # noqa: B018
+    except NotImplementedError:
+        return False
+    return True
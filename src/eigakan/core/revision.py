@@ -0,0 +1,161 @@
+"""
+Table level change counters, bumped by the database.
+
+The revision of a tracked table is bumped by statement level triggers on
+the inserts, updates, deletes and truncates writing at least one row,
+whichever path wrote them: the ORM, bulk statements or the seed. A
+statement matching no row, such as an update of a theater owned by someone
+else or a synchronization changing nothing, leaves it as is. Reading it is
+a single primary key lookup, cheap enough to validate the lists read from
+the table before reading them.
+
+The revisions also tell a worker about the writes committed by the others:
+the hooks registered with `on_change` are called whenever a revision read
+differs from the previous one read by the worker, so that the in-process
+caches of the table are dropped.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, NamedTuple
+
+from sqlalchemy import DDL, BigInteger, DateTime, Text, event, select
+from sqlalchemy.orm import Mapped, mapped_column
+
+from eigakan.database.core import Base
+from eigakan.database.enums import CORE_SCHEMA
+from eigakan.logger import logger
+from eigakan.models import CoreMixin
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.types import M
+
+    type Hook = Callable[[], None]
+
+
+class Revision(Base, CoreMixin):
+    """Mapped class counting the writes of a table."""
+
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger)
+    modified_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class Stamp(NamedTuple):
+    """Revision of a table and the time of its last write."""
+
+    value: int
+    modified_at: datetime | None
+
+
+event.listen(
+    Base.metadata,
+    "after_create",
+    DDL(
+        f"""
+        CREATE OR REPLACE FUNCTION {CORE_SCHEMA}.bump_revision()
+        RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- `written`: transition table of the rows written, if any
+            IF TG_OP <> 'TRUNCATE' THEN
+                IF NOT EXISTS (SELECT 1 FROM written) THEN
+                    RETURN NULL;
+                END IF;
+            END IF;
+            INSERT INTO {CORE_SCHEMA}.revision AS revision
+                (name, value, modified_at)
+            VALUES (TG_TABLE_NAME, 1, now())
+            ON CONFLICT (name) DO UPDATE
+            SET value = revision.value + 1, modified_at = now();
+            RETURN NULL;
+        END
+        $$
+        """,  # noqa: S608
+    ),
+)
+
+_HOOKS: defaultdict[str | None, list[Hook]] = defaultdict(list)
+# last revision read by the worker, by table
+_seen: dict[str, int] = {}
+
+
+# transition table of the rows written, by event
+_EVENTS = {
+    "insert": "REFERENCING NEW TABLE AS written",
+    "update": "REFERENCING NEW TABLE AS written",
+    "delete": "REFERENCING OLD TABLE AS written",
+    "truncate": "",
+}
+
+
+def track(model: type[M]) -> None:
+    """Bump the revision of the table of a model on each row written."""
+    table = model.__table__
+    for operation, referencing in _EVENTS.items():
+        # a trigger with transition tables only fires on a single event
+        event.listen(
+            Base.metadata,
+            "after_create",
+            DDL(
+                f"""
+                CREATE OR REPLACE TRIGGER {table.name}_{operation}_revision
+                AFTER {operation.upper()} ON {table.schema}.{table.name}
+                {referencing}
+                FOR EACH STATEMENT
+                EXECUTE FUNCTION {CORE_SCHEMA}.bump_revision()
+                """
+            ),
+        )
+
+
+def on_change(*models: type[M]) -> Callable[[Hook], Hook]:
+    """
+    Register the decorated function as a change hook.
+
+    Parameters
+    ----------
+    *models : type[M]
+        models whose revision changes are notified, all models if omitted.
+
+    """
+
+    def decorator(hook: Hook) -> Hook:
+        for model in models or (None,):
+            _HOOKS[None if model is None else model.__table__.name].append(
+                hook
+            )
+        return hook
+
+    return decorator
+
+
+async def read(session: AsyncSession, model: type[M]) -> Stamp:
+    """
+    Return the revision of the table of a model, 0 if never written.
+
+    The change hooks are called first if it differs from the previous
+    revision read by the worker, or if none was.
+    """
+    name = model.__table__.name
+    row = (
+        await session.execute(
+            select(Revision.value, Revision.modified_at).where(
+                Revision.name == name
+            )
+        )
+    ).one_or_none()
+    stamp = Stamp(0, None) if row is None else Stamp(*row)
+    if _seen.get(name) != stamp.value:
+        _seen[name] = stamp.value
+        for hook in (*_HOOKS[None], *_HOOKS[name]):
+            try:
+                hook()
+            except Exception:
+                logger.exception("Change hook %s failed.", hook.__qualname__)
+    return stamp
@@ -0,0 +1,336 @@
+"""
+Rate limits counted in a memory mapped file, shared by the workers.
+
+`SharedMemoryStorage` is a `limits` storage registered as `shm://<path>`:
+the counters live in fixed size slots of a file mapped by every worker,
+under `/dev/shm` to keep it in memory where available (the temporary
+directory otherwise), so that a limit is enforced across the processes
+serving the app rather than by each of them.
+
+A key is hashed to a bucket of `WAYS` slots, each slot holding the counts
+of the current and previous windows of a key, the sliding window counter
+being weighted from both. A bucket is updated under a lock of its own: a
+thread lock within a process, a record lock on the bytes of the bucket
+across processes, so that unrelated keys are never contended for.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import struct
+import threading
+from hashlib import blake2b
+from math import floor
+from time import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+from limits.errors import ConfigurationError
+from limits.storage import SlidingWindowCounterSupport, Storage
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# slots a key may be stored in
+WAYS = 8
+# thread locks of a process, buckets sharing them past that
+STRIPES = 64
+_MAGIC = b"eigakan1"
+# magic, number of slots
+_HEADER = struct.Struct("<8sQ")
+# key hash, window, window length, current count, previous count
+_SLOT = struct.Struct("<QqIII4x")
+
+
+class SharedMemoryStorage(Storage, SlidingWindowCounterSupport):
+    """Fixed and sliding window counters, in a file mapped in memory."""
+
+    STORAGE_SCHEME = ["shm"]  # noqa: RUF012
+
+    def __init__(
+        self,
+        uri: str | None = None,
+        wrap_exceptions: bool = False,
+        slots: int | str = 65536,
+        **options: float | str | bool,
+    ) -> None:
+        """
+        Map the file of the counters, created if need be.
+
+        Parameters
+        ----------
+        uri : str | None
+            `shm://` followed by the path of the file, shared by the
+            storages counting the same limits.
+        wrap_exceptions : bool, optional
+            whether errors are raised as `limits.errors.StorageError`.
+        slots : int | str, optional
+            number of keys counted at most, rounded up to `WAYS`: the
+            least recently used key of a full bucket is evicted.
+
+        """
+        super().__init__(uri, wrap_exceptions, **options)
+        path = urlparse(uri or "").path
+        if not path:
+            raise ConfigurationError(f"No file to map in '{uri}'.")  # noqa: TRY003
+        self._buckets = -(-int(slots) // WAYS)
+        self._size = _HEADER.size + self._buckets * WAYS * _SLOT.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._locks = [threading.Lock() for _ in range(STRIPES)]
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, _HEADER.size, 0)
+        try:
+            if os.fstat(self._fd).st_size != self._size:
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, self._size)
+            self._map = mmap.mmap(self._fd, self._size)
+            magic, count = _HEADER.unpack_from(self._map)
+            if (magic, count) != (_MAGIC, self._buckets * WAYS):
+                self._map[: self._size] = bytes(self._size)
+                _HEADER.pack_into(self._map, 0, _MAGIC, self._buckets * WAYS)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, _HEADER.size, 0)
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return OSError
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        """Count hits of the current window of `expiry` seconds."""
+        with self._slot(key, int(expiry)) as slot:
+            slot.current += amount
+            return slot.current
+
+    def get(self, key: str) -> int:
+        """Return the hits of the current window of a key."""
+        with self._slot(key) as slot:
+            return slot.current
+
+    def get_expiry(self, key: str) -> float:
+        """Return the end of the current window of a key."""
+        with self._slot(key) as slot:
+            return (slot.window + 1) * slot.period if slot.period else time()
+
+    def clear(self, key: str) -> None:
+        with self._slot(key) as slot:
+            slot.clear()
+
+    def check(self) -> bool:
+        return not self._map.closed
+
+    def reset(self) -> int | None:
+        """Clear every counter, returning the number of keys cleared."""
+        cleared = 0
+        for bucket in range(self._buckets):
+            with self._bucket(bucket):
+                offset = self._offset(bucket)
+                for way in range(WAYS):
+                    tag, *_ = _SLOT.unpack_from(
+                        self._map, offset + way * _SLOT.size
+                    )
+                    cleared += tag != 0
+                self._map[offset : offset + WAYS * _SLOT.size] = bytes(
+                    WAYS * _SLOT.size
+                )
+        return cleared
+
+    def acquire_sliding_window_entry(
+        self, key: str, limit: int, expiry: int, amount: int = 1
+    ) -> bool:
+        """
+        Count hits if the weighted count of the windows allows them.
+
+        The count is read and written under the lock of the bucket: a hit
+        accepted is never reverted, as it is by storages racing for it.
+        """
+        with self._slot(key, expiry) as slot:
+            weighted = slot.previous * slot.remaining + slot.current
+            if floor(weighted) + amount > limit:
+                return False
+            slot.current += amount
+            return True
+
+    def get_sliding_window(
+        self, key: str, expiry: int
+    ) -> tuple[int, float, int, float]:
+        with self._slot(key, expiry) as slot:
+            remaining = slot.remaining * expiry
+            return (
+                slot.previous,
+                remaining if slot.previous else 0.0,
+                slot.current,
+                remaining + expiry,
+            )
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        self.clear(key)
+
+    def _offset(self, bucket: int) -> int:
+        return _HEADER.size + bucket * WAYS * _SLOT.size
+
+    def _bucket(self, bucket: int) -> _BucketLock:
+        return _BucketLock(
+            self._locks[bucket % STRIPES],
+            self._fd,
+            self._offset(bucket),
+            WAYS * _SLOT.size,
+        )
+
+    def _slot(self, key: str, period: int = 0) -> _Locked:
+        tag = (
+            int.from_bytes(
+                blake2b(key.encode(), digest_size=8).digest(), "little"
+            )
+            or 1
+        )
+        bucket = tag % self._buckets
+        return _Locked(
+            self, self._bucket(bucket), self._offset(bucket), tag, period
+        )
+
+
+class _BucketLock:
+    """Lock of a bucket, within the process then across processes."""
+
+    __slots__ = ("_fd", "_length", "_lock", "_offset")
+
+    def __init__(
+        self, lock: threading.Lock, fd: int, offset: int, length: int
+    ) -> None:
+        self._lock = lock
+        self._fd = fd
+        self._offset = offset
+        self._length = length
+
+    def __enter__(self) -> None:
+        self._lock.acquire()
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._length, self._offset)
+        except BaseException:
+            self._lock.release()
+            raise
+
+    def __exit__(self, *_: object) -> None:
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, self._length, self._offset)
+        finally:
+            self._lock.release()
+
+
+class _Slot:
+    """Counters of a key, rotated to the current window when read."""
+
+    __slots__ = ("current", "period", "previous", "remaining", "tag", "window")
+
+    def __init__(
+        self, tag: int, window: int, period: int, current: int, previous: int
+    ) -> None:
+        self.tag = tag
+        self.window = window
+        self.period = period
+        self.current = current
+        self.previous = previous
+        self.remaining = 0.0
+
+    def rotate(self, period: int, now: float) -> None:
+        """Move the counts to the window of `now`, of `period` seconds."""
+        window, elapsed = divmod(now, period)
+        window = int(window)
+        if self.period != period or window - self.window > 1:
+            self.current = self.previous = 0
+        elif window - self.window == 1:
+            self.current, self.previous = 0, self.current
+        self.window, self.period = window, period
+        # share of the previous window still sliding within the current one
+        self.remaining = 1 - elapsed / period
+
+    def clear(self) -> None:
+        self.tag = self.window = self.period = self.current = self.previous = 0
+
+
+class _Locked:
+    """Slot of a key, read then written back under the lock of its bucket."""
+
+    __slots__ = (
+        "_lock",
+        "_offset",
+        "_period",
+        "_slot",
+        "_storage",
+        "_tag",
+        "_way",
+    )
+
+    def __init__(
+        self,
+        storage: SharedMemoryStorage,
+        lock: _BucketLock,
+        offset: int,
+        tag: int,
+        period: int,
+    ) -> None:
+        self._storage = storage
+        self._lock = lock
+        self._offset = offset
+        self._tag = tag
+        self._period = period
+        self._way: int | None = None
+
+    def __enter__(self) -> _Slot:
+        self._lock.__enter__()
+        try:
+            now = time()
+            self._way, slot = self._find(now)
+            if self._period:
+                slot.rotate(self._period, now)
+            elif slot.period:
+                # read only: the counts of an elapsed window are stale
+                slot.rotate(slot.period, now)
+            self._slot = slot
+        except BaseException:
+            self._lock.__exit__()
+            raise
+        return slot
+
+    def __exit__(self, *_: object) -> None:
+        try:
+            slot = self._slot
+            if self._way is not None and (slot.period or not slot.tag):
+                _SLOT.pack_into(
+                    self._storage._map,
+                    self._offset + self._way * _SLOT.size,
+                    slot.tag,
+                    slot.window,
+                    slot.period,
+                    slot.current,
+                    slot.previous,
+                )
+        finally:
+            self._lock.__exit__()
+
+    def _find(self, now: float) -> tuple[int | None, _Slot]:
+        """
+        Return the slot of the key, or the one it replaces.
+
+        A slot is replaced if empty or elapsed, else the one of the oldest
+        window is evicted. A key only read is not stored.
+        """
+        victim, oldest = None, None
+        for way, slot in enumerate(self._slots()):
+            if slot.tag == self._tag:
+                return way, slot
+            end = (slot.window + 2) * slot.period
+            if slot.tag == 0 or end <= now:
+                end = float("-inf")
+            if oldest is None or end < oldest:
+                victim, oldest = way, end
+        return victim if self._period else None, _Slot(self._tag, 0, 0, 0, 0)
+
+    def _slots(self) -> Iterator[_Slot]:
+        for way in range(WAYS):
+            yield _Slot(
+                *_SLOT.unpack_from(
+                    self._storage._map, self._offset + way * _SLOT.size
+                )
+            )
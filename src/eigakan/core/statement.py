@@ -1,37 +1,80 @@
+"""
+Statements reading resources, built from updaters.
+
+Statements read ORM instances, or plain rows (dicts keyed by column label)
+when given `columns`: rows skip the identity map and the hydration of the
+instances, for endpoints serializing them straight away.
+
+Updaters binding their values rather than embedding them (`Cacheable`)
+make a statement depend on their shape only: such statements are built
+once per shape, kept in `statements`, then executed with the `params` of
+the updaters at hand. This spares the construction of the statement and
+lets SQLAlchemy reuse its compiled form, whatever the values requested.
+"""
+
 from __future__ import annotations
 
+import math
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Type, final
+from operator import attrgetter, itemgetter
+from typing import TYPE_CHECKING, NamedTuple, Type, final
 
-from sqlalchemy import func, inspect, select
+from sqlalchemy import func, select
 from sqlalchemy.dialects import postgresql
 
+from eigakan.env import CACHE
 from eigakan.logger import logger
 from eigakan.types import M
 
+from .cache import TTLCache
+from .count import Count, counts, estimate
 from .exc import (
     ColumnCannotbeUsedToReadOne,
     ResourceNotFound,
 )
-from .updaters.commons import ScalarUpdater
+from .registry import describe
+from .updaters.commons import AnyUpdater, ScalarUpdater
+from .updaters.pagination import Pagination
+from .updaters.sort import Sorter
+from .updaters.updater import Cacheable, Consumer
 
 if TYPE_CHECKING:
-    from collections.abc import Sequence
-    from typing import Type
+    from collections.abc import (
+        AsyncIterator,
+        Callable,
+        Hashable,
+        Iterable,
+        Sequence,
+    )
+    from typing import Any, Type
 
-    from sqlalchemy import Select
+    from sqlalchemy import Row, Select
     from sqlalchemy.ext.asyncio import AsyncSession
     from sqlalchemy.sql.base import ExecutableOption
+    from sqlalchemy.sql.elements import ColumnElement
 
     from .updaters import Updater
 
+statements: TTLCache[Hashable, Select] = TTLCache(
+    maxsize=CACHE.STATEMENT_SIZE, ttl=math.inf
+)
+"""Statements built, keyed by their shape."""
+# label of the window counting the lines of a page
+_TOTAL = "total"
+
 
 class Statement(ABC):
-    def __init__(self, model, *updaters: Updater | None) -> None:
+    def __init__(
+        self,
+        model,
+        *updaters: Updater | None,
+        columns: Sequence[ColumnElement] | None = None,
+    ) -> None:
         self._model = model
         self._updaters = [
             updater for updater in updaters if updater is not None
         ]
+        self._columns = None if columns is None else tuple(columns)
 
     @abstractmethod
     async def __call__(self, session: AsyncSession): ...
@@ -39,36 +82,107 @@ class Statement(ABC):
     @abstractmethod
     def _base_statement(self) -> Select: ...
 
+    def _base_shape(self) -> Hashable | None:
+        """Return what the base statement depends on, None if not cached."""
+        return None
+
+    def _selection(self) -> Select:
+        """Return the selection of the model, of its columns in row mode."""
+        if self._columns is None:
+            return select(self._model)
+        return select(*self._columns).select_from(self._model)
+
+    def _resources(self, rows: Sequence[Row]) -> list:
+        """Return the instances read, the rows as dicts in row mode."""
+        if self._columns is None:
+            return [row[0] for row in rows]
+        return [row._asdict() for row in rows]
+
+    @property
+    def shape(self) -> Hashable | None:
+        """Return what the statement depends on, None if not cacheable."""
+        if (base := self._base_shape()) is None:
+            return None
+        shapes = []
+        for updater in self._updaters:
+            if not isinstance(updater, Cacheable) or updater.shape is None:
+                return None
+            shapes.append(updater.shape)
+        return self.__class__, self._model, base, *shapes
+
+    @property
+    def params(self) -> dict[str, Any]:
+        """Return the values bound by the updaters."""
+        params: dict[str, Any] = {}
+        for updater in self._updaters:
+            if isinstance(updater, Cacheable):
+                params.update(updater.params)
+        return params
+
     @property
     def statement(self) -> Select:
         """Return the final statement that will be executed."""
+        return self._derived("statement", self._build)
+
+    def _build(self) -> Select:
+        """Build the statement, applying the updaters in order."""
         statement = self._base_statement()
         for updater in self._updaters:
             statement = updater.update(statement)
         return statement
 
+    def _derived(self, name: str, build: Callable[[], Select]) -> Select:
+        """Return a statement derived from the shape, built once per shape."""
+        if (shape := self.shape) is None:
+            return build()
+        key = name, shape
+        if (statement := statements.get(key)) is None:
+            statement = build()
+            statements.set(key, statement)
+        return statement
+
     @final
     def __str__(self) -> str:
         """Return a user-friendly representation of the statement."""
-        return str(
-            self.statement.compile(
-                dialect=postgresql.dialect(),
-                compile_kwargs={"literal_binds": True},
-            )
-        )
+        return _literal_sql(self.statement.params(self.params))
+
+    def _consume(self, rows: Sequence[Row]) -> Sequence[Row]:
+        """Hand the fetched lines over to the updaters consuming them."""
+        for updater in self._updaters:
+            if isinstance(updater, Consumer):
+                rows = updater.consume(rows)
+        return rows
 
     def _log_statement(self) -> None:
         """Log the SQL emitted by the statement."""
         logger.debug("SQL emitted by %s\n%s", self.__class__.__name__, self)
 
-    def _get_pk(self):
-        """
-        Model's primary key.
+    def _unsliced(self) -> Select[tuple]:
+        """Return the primary keys matched by the statement, unsliced."""
+        return self._derived(
+            "unsliced",
+            lambda: (
+                self.statement.with_only_columns(
+                    *describe(self._model).primary_key,
+                    maintain_column_froms=True,
+                )
+                .order_by(None)
+                .limit(None)
+                .offset(None)
+            ),
+        )
 
-        Currently unsafe for multi-pk models.
-        """
-        columns = inspect(self._model).columns
-        return next(c for c in columns if c.primary_key)
+    def _count_key(self) -> Hashable:
+        """Return the key of the count cache, sorting and slicing aside."""
+        if self.shape is None:
+            return self._model, _literal_sql(
+                self._unsliced().params(self.params)
+            )
+        return self._model, *(
+            (updater.shape, *sorted(updater.params.items()))
+            for updater in self._updaters
+            if not isinstance(updater, Pagination | Sorter)
+        )
 
 
 class ReadAll[Model: M](Statement):
@@ -76,32 +190,159 @@ class ReadAll[Model: M](Statement):
         self,
         model: Type[Model],
         *updaters: Updater | None,
+        columns: Sequence[ColumnElement] | None = None,
     ) -> None:
-        super().__init__(model, *updaters)
+        super().__init__(model, *updaters, columns=columns)
 
     def _base_statement(self) -> Select[tuple[Model]]:
         """Return the base statement."""
-        return select(self._model)
+        return self._selection()
+
+    def _base_shape(self) -> Hashable:
+        return self._columns or ()
 
     async def __call__(self, session: AsyncSession) -> Sequence[Model]:
         self._log_statement()
-        result = await session.scalars(self.statement)
-        return result.all()
+        result = await session.execute(self.statement, self.params)
+        return self._resources(self._consume(result.all()))
+
+    async def partitions(
+        self, session: AsyncSession, size: int
+    ) -> AsyncIterator[list[Model]]:
+        """
+        Yield the resources by partitions, fetched from a server side cursor.
+
+        At most `size` lines are held in memory, whatever the number of
+        lines matched.
+        """
+        self._log_statement()
+        result = await session.stream(
+            self.statement, self.params, execution_options={"yield_per": size}
+        )
+        async for rows in result.partitions(size):
+            yield self._resources(self._consume(rows))
+
+
+class Page[Model: M](NamedTuple):
+    """Page of resources along with the total number of matching lines."""
+
+    content: Sequence[Model]
+    total: int | None
+
+
+class ReadPage[Model: M](Statement):
+    """
+    Read a page of resources and the total number of lines at once.
+
+    With an exact count, the total is computed with a `count(*) OVER ()`
+    window evaluated before `LIMIT` / `OFFSET`, hence a single round trip
+    and a single filter scan whatever the updaters are. The window reads
+    every line matched though, an index scan ordered by distance included:
+    a cached count is rather read from the cache, or counted apart and
+    cached, for the page to stop at its `LIMIT`.
+    """
+
+    def __init__(
+        self,
+        model: Type[Model],
+        *updaters: Updater | None,
+        count: Count = Count.EXACT,
+        columns: Sequence[ColumnElement] | None = None,
+    ) -> None:
+        super().__init__(model, *updaters, columns=columns)
+        self._count_strategy = count
+        self._windowed = count is Count.EXACT
+
+    def _base_statement(self) -> Select[tuple[Model, int]]:
+        """Return the base statement."""
+        if self._windowed:
+            return self._selection().add_columns(
+                func.count().over().label(_TOTAL)
+            )
+        return self._selection()
+
+    def _base_shape(self) -> Hashable:
+        return self._windowed, self._columns
+
+    async def __call__(self, session: AsyncSession) -> Page[Model]:
+        total = None
+        match self._count_strategy:
+            case Count.ESTIMATE:
+                total = await estimate(
+                    session, self._unsliced().params(self.params)
+                )
+            case Count.CACHED:
+                key = self._count_key()
+                if (total := counts.get(key)) is None:
+                    total = await self._count(session)
+                    counts.set(key, total)
+        self._log_statement()
+        result = await session.execute(self.statement, self.params)
+        rows = self._consume(result.all())
+        if self._windowed:
+            # the window cannot be evaluated over an empty page, either
+            # nothing matches or the page is out of range: count apart.
+            total = rows[0].total if rows else await self._count(session)
+        content = self._resources(rows)
+        if self._windowed and self._columns is not None:
+            for row in content:
+                del row[_TOTAL]
+        return Page(content, total)
+
+    async def _count(self, session: AsyncSession) -> int:
+        """Count the lines matched by the statement, regardless of slicing."""
+        result = await session.scalar(
+            self._derived(
+                "count",
+                lambda: select(func.count()).select_from(
+                    self._unsliced().subquery()
+                ),
+            ),
+            self.params,
+        )
+        return result or 0
 
 
 class ReadAllLines[Model: M](Statement):
-    """TODO Cache system ?"""
+    """Count the lines matched by the updaters."""
 
-    def __init__(self, model: Type[Model], *updaters: Updater | None) -> None:
+    def __init__(
+        self,
+        model: Type[Model],
+        *updaters: Updater | None,
+        count: Count = Count.EXACT,
+    ) -> None:
         super().__init__(model, *updaters)
+        self._count_strategy = count
 
     def _base_statement(self) -> Select[tuple[int]]:
         """Return the base statement."""
-        return select(func.count(self._get_pk()))
+        # primary keys are not null, counting the first one counts the lines
+        return select(func.count(describe(self._model).primary_key[0]))
 
-    async def __call__(self, session: AsyncSession) -> int:
+    def _base_shape(self) -> Hashable:
+        return ()
+
+    async def __call__(self, session: AsyncSession) -> int | None:
+        match self._count_strategy:
+            case Count.NONE:
+                return None
+            case Count.ESTIMATE:
+                return await estimate(
+                    session, self._unsliced().params(self.params)
+                )
+            case Count.CACHED:
+                key = self._count_key()
+                if (total := counts.get(key)) is None:
+                    total = await self._count(session)
+                    counts.set(key, total)
+                return total
+        return await self._count(session)
+
+    async def _count(self, session: AsyncSession) -> int:
+        """Count the lines."""
         self._log_statement()
-        result = await session.scalar(self.statement)
+        result = await session.scalar(self.statement, self.params)
         return result or 0
 
 
@@ -113,30 +354,100 @@ class ReadOneBy[Model: M](Statement):
         model: Type[Model],
         *updaters: Updater | None,
         strategy: ExecutableOption | None = None,
+        columns: Sequence[ColumnElement] | None = None,
     ) -> None:
-        if not self._is_unique_column(model, column):
+        if column not in describe(model).unique:
             raise ColumnCannotbeUsedToReadOne(column, model.__name__)
-        super().__init__(model, *updaters, ScalarUpdater(model, column, value))
+        super().__init__(
+            model,
+            *updaters,
+            ScalarUpdater(model, column, value),
+            columns=columns,
+        )
         self._strategy = strategy
         self._rec = column, value
 
     def _base_statement(self) -> Select[tuple[Model]]:
         return (
-            select(self._model).options(self._strategy)
+            self._selection().options(self._strategy)
             if self._strategy is not None
-            else select(self._model)
+            else self._selection()
         )
 
+    def _base_shape(self) -> Hashable | None:
+        # loader options are not hashable, such statements are not cached
+        return (self._columns or ()) if self._strategy is None else None
+
     async def __call__(self, session: AsyncSession) -> Model:
         self._log_statement()
-        if (resource := await session.scalar(self.statement)) is None:
+        result = await session.execute(self.statement, self.params)
+        if (row := result.first()) is None:
             raise ResourceNotFound(*self._rec)
-        return resource
-
-    @staticmethod
-    def _is_unique_column(model: Type[Model], column: str) -> bool:
-        """Check if column with this name is a pk or unique."""
-        columns = inspect(model).columns
-        return column in tuple(
-            c.name for c in columns if c.unique or c.primary_key
+        return self._resources([row])[0]
+
+
+class Many[Model: M](NamedTuple):
+    """Resources read by value, in the order requested, and values missing."""
+
+    content: Sequence[Model]
+    missing: Sequence[Any]
+
+
+class ReadManyBy[Model: M](Statement):
+    """
+    Read the resources matching any of the values of a unique column.
+
+    The values are bound as a single array (`column = ANY(:values)`), hence
+    a single statement whatever their number. Resources are returned in the
+    order of the values, duplicates aside.
+    """
+
+    def __init__(
+        self,
+        column: str,
+        values: Iterable,
+        model: Type[Model],
+        *updaters: Updater | None,
+        columns: Sequence[ColumnElement] | None = None,
+    ) -> None:
+        if column not in describe(model).unique:
+            raise ColumnCannotbeUsedToReadOne(column, model.__name__)
+        self._values = tuple(dict.fromkeys(values))
+        super().__init__(
+            model,
+            *updaters,
+            AnyUpdater(model, column, self._values),
+            columns=columns,
+        )
+        self._column = column
+
+    def _base_statement(self) -> Select[tuple[Model]]:
+        return self._selection()
+
+    def _base_shape(self) -> Hashable:
+        return self._columns or ()
+
+    async def __call__(self, session: AsyncSession) -> Many[Model]:
+        if not self._values:
+            return Many([], [])
+        self._log_statement()
+        result = await session.execute(self.statement, self.params)
+        key = attrgetter if self._columns is None else itemgetter
+        found = {
+            key(self._column)(resource): resource
+            for resource in self._resources(result.all())
+        }
+        return Many(
+            [found[value] for value in self._values if value in found],
+            [value for value in self._values if value not in found],
+        )
+
+
+def _literal_sql(statement: Select) -> str:
+    """Compile a statement, parameters rendered inline."""
+    return str(
+        statement.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={"literal_binds": True},
         )
+    )
@@ -1,2 +1,4 @@
+from .keyset import Keyset
 from .pagination import Pagination
-from .updater import Updater
+from .projection import Projection
+from .updater import Cacheable, Updater
@@ -2,11 +2,18 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Type
 
+from sqlalchemy import ARRAY, any_, bindparam
+
 from eigakan.types import M
 
+from ..registry import describe
 from .updater import Updater
 
 if TYPE_CHECKING:
+    from collections.abc import Hashable, Mapping
+    from typing import Any
+
+    from sqlalchemy.sql.elements import BindParameter
     from sqlalchemy.sql.expression import Select
 
 
@@ -15,7 +22,7 @@ class _JoinSupport[Model: M]:
         self,
         model: Type[Model],
         key: str,
-        value: str | float | bool,
+        value: str | float | bool | tuple,
     ) -> None:
         self._key = key
         self._value = value
@@ -23,19 +30,40 @@ class _JoinSupport[Model: M]:
 
     @property
     def model(self):
-        if self._is_joined():
-            relationship_name = self._key.split(".", 1)[0]
-            return getattr(
-                self._model, relationship_name
-            ).property.mapper.class_
-        return self._model
+        return describe(self._model).target(self._key)[0]
 
     @property
-    def key(self):
-        if self._is_joined():
-            return self._key.split(".", 1)[1]
+    def path(self) -> str:
+        """Return the filtered attribute, relationship included."""
         return self._key
 
+    @property
+    def value(self) -> str | float | bool | tuple:
+        """Return the value filtered on."""
+        return self._value
+
+    @property
+    def key(self):
+        return describe(self._model).target(self._key)[1]
+
+    @property
+    def shape(self) -> Hashable:
+        """Return the class and attribute filtered, values aside."""
+        return self.__class__, self._model, self._key
+
+    @property
+    def params(self) -> Mapping[str, Any]:
+        """Return the value bound to the filter."""
+        return {self._bind_name: self._value}
+
+    @property
+    def _bind_name(self) -> str:
+        return f"{self.__class__.__name__}_{self._key.replace('.', '_')}"
+
+    def _bind(self, column) -> BindParameter:
+        """Return the value as a parameter typed as the filtered column."""
+        return bindparam(self._bind_name, self._value, type_=column.type)
+
     def _is_joined(self) -> bool:
         return "." in self._key
 
@@ -47,7 +75,8 @@ class ScalarUpdater[Model: M](Updater, _JoinSupport[Model]):
     def update(self, statement: Select) -> Select:
         if self._is_joined():
             statement = statement.join(self.model)
-        return statement.where(getattr(self.model, self.key) == self._value)
+        column = getattr(self.model, self.key)
+        return statement.where(column == self._bind(column))
 
     def __str__(self) -> str:
         return (
@@ -58,9 +87,8 @@ class ScalarUpdater[Model: M](Updater, _JoinSupport[Model]):
 
 class StartsWithUpdater[Model: M](Updater, _JoinSupport[Model]):
     def update(self, statement: Select) -> Select:
-        return statement.where(
-            getattr(self._model, self._key).startswith(self._value)
-        )
+        column = getattr(self._model, self._key)
+        return statement.where(column.startswith(self._bind(column)))
 
     def __str__(self) -> str:
         return (
@@ -68,3 +96,25 @@ class StartsWithUpdater[Model: M](Updater, _JoinSupport[Model]):
             f"WHERE {self._model.__name__}.{self._key}"
             f" LIKE '{self._value}' || '%%')"
         )
+
+
+class AnyUpdater[Model: M](Updater, _JoinSupport[Model]):
+    """Filter on a tuple of values, bound as a single array."""
+
+    def update(self, statement: Select) -> Select:
+        if self._is_joined():
+            statement = statement.join(self.model)
+        column = getattr(self.model, self.key)
+        return statement.where(column == any_(self._bind(column)))
+
+    def _bind(self, column) -> BindParameter:
+        """Return the values as an array of the filtered column type."""
+        return bindparam(
+            self._bind_name, list(self._value), type_=ARRAY(column.type)
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"・{self.__class__.__name__} ⇢ "
+            f"WHERE {self._model.__name__}.{self._key} = ANY({self._value})"
+        )
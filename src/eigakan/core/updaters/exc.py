@@ -10,8 +10,29 @@ class UpdaterNotLoaded(__UpdaterException):
 
     def __init__(self, updater_name: str, method_name: str) -> None:
         msg = (
-            f"{updater_name} must be called "
-            f"with a model before accessing '{method_name}'."
+            f"{updater_name} must be called before accessing '{method_name}'."
+        )
+        super().__init__(msg)
+
+
+class ColumnCannotBeSorted(__UpdaterException):
+    """Column cannot be used to sort."""
+
+    def __init__(self, column: str, model_name: str) -> None:
+        msg = (
+            f"'{model_name}.{column}' cannot be used to sort resources, "
+            "either because it does not exist or is not ordered."
+        )
+        super().__init__(msg)
+
+
+class AttributeCannotBeLoaded(__UpdaterException):
+    """Attribute cannot be loaded."""
+
+    def __init__(self, attribute: str, model_name: str) -> None:
+        msg = (
+            f"'{model_name}.{attribute}' cannot be loaded, it is not a mapped "
+            "attribute."
         )
         super().__init__(msg)
 
@@ -26,3 +47,10 @@ class PaginationInvalidArgument(__PaginationException):
     def __init__(self, parameter: str) -> None:
         msg = f"{parameter} should be greater or equal to 1."
         super().__init__(msg)
+
+
+class InvalidCursor(__PaginationException):
+    """Cursor cannot be decoded."""
+
+    def __init__(self) -> None:
+        super().__init__("Invalid pagination cursor.")
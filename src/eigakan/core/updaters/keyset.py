@@ -0,0 +1,175 @@
+"""Keyset Updater."""
+
+from __future__ import annotations
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from functools import cache
+from typing import TYPE_CHECKING
+
+from pydantic import TypeAdapter, ValidationError
+from pydantic_core import from_json, to_json
+from sqlalchemy import literal, tuple_
+from sqlalchemy.types import NullType
+
+from .exc import InvalidCursor, UpdaterNotLoaded
+from .pagination import Pagination
+from .updater import Updater
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+    from typing import Any, Self
+
+    from sqlalchemy import Row
+    from sqlalchemy.sql.elements import ColumnElement
+    from sqlalchemy.sql.expression import Select
+
+
+class Keyset(Updater):
+    """
+    Update a SQLAlchemy statement with a keyset (a.k.a. cursor) clause.
+
+    Instead of skipping `OFFSET` lines, the statement resumes right after the
+    sort key of the last line previously served, which is carried by an
+    opaque cursor. Pages cost the same whatever their depth as long as the
+    keys are walked by a B-tree index, the cursor seeking into it.
+
+    Sorted by a distance, the lines are walked by a GiST index in order of
+    distance: the index cannot seek past the cursor, the lines nearer than
+    it being read then filtered out. A deep page then costs about as much
+    as with `OFFSET`, without the sort of the lines skipped though.
+    """
+
+    def __init__(self, limit: int, cursor: str = "") -> None:
+        """
+        Initialize the updater.
+
+        Parameters
+        ----------
+        limit : int
+            The number of items per page.
+        cursor : str, optional
+            The cursor of the previous page, empty for the first page.
+
+        Raises
+        ------
+        PaginationInvalidArgument
+            If the limit is invalid.
+        InvalidCursor
+            If the cursor cannot be decoded.
+
+        """
+        self._limit = Pagination._validated_argument(limit)
+        self._after = self._decode(cursor) if cursor else None
+        self._keys: tuple[ColumnElement, ...] = ()
+        self._next: str | None = None
+
+    def __call__(self, *keys: ColumnElement) -> Self:
+        """
+        Register the sort keys.
+
+        Keys are sorted in ascending order, the last one must be unique
+        (usually the primary key) to break ties.
+
+        Raises
+        ------
+        InvalidCursor
+            If the cursor was not emitted for these keys.
+
+        """
+        if self._after is not None and len(self._after) != len(keys):
+            raise InvalidCursor()
+        self._keys = keys
+        return self
+
+    @property
+    def next(self) -> str | None:
+        """Return the cursor of the next page, if any."""
+        return self._next
+
+    def update(self, statement: Select) -> Select:
+        """Update the statement with the proper clauses."""
+        if not self._keys:
+            raise UpdaterNotLoaded(self.__class__.__name__, "update")
+        statement = (
+            statement.add_columns(
+                *(key.label(f"keyset_{i}") for i, key in enumerate(self._keys))
+            )
+            .order_by(None)
+            .order_by(*(key.asc() for key in self._keys))
+            .limit(self._limit + 1)
+        )
+        if self._after is not None:
+            statement = statement.where(
+                tuple_(*self._keys)
+                > tuple_(
+                    *(
+                        _literal(key, value)
+                        for key, value in zip(
+                            self._keys, self._after, strict=True
+                        )
+                    )
+                )
+            )
+        return statement
+
+    def consume(self, rows: Sequence[Row]) -> Sequence[Row]:
+        """Drop the look-ahead line and remember where the next page starts."""
+        if len(rows) > self._limit:
+            rows = rows[: self._limit]
+            self._next = self._encode(tuple(rows[-1])[-len(self._keys) :])
+        return rows
+
+    @staticmethod
+    def _encode(values: Sequence[Any]) -> str:
+        """Encode the sort key values into an opaque cursor."""
+        return urlsafe_b64encode(to_json(list(values))).rstrip(b"=").decode()
+
+    @staticmethod
+    def _decode(cursor: str) -> list[Any]:
+        """Decode an opaque cursor into sort key values."""
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            values = from_json(urlsafe_b64decode(cursor + padding))
+        except (Base64Error, ValueError) as e:
+            raise InvalidCursor() from e
+        if not isinstance(values, list) or not values:
+            raise InvalidCursor()
+        return values
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"{self.__class__.__name__}"
+            f"(limit={self._limit}, after={self._after!r})"
+        )
+
+    def __str__(self) -> str:
+        """Return a human-friendly string representation of the object."""
+        return "\n".join(
+            (
+                "Updater[Keyset] will update a sqlalchemy select.",
+                f"WHERE ({', '.join(map(str, self._keys))}) > {self._after}",
+                f"LIMIT {self._limit + 1}",
+            )
+        )
+
+
+@cache
+def _adapter(python_type: type) -> TypeAdapter:
+    """Return a (cached) validator for the given python type."""
+    return TypeAdapter(python_type)
+
+
+def _literal(key: ColumnElement, value: Any) -> ColumnElement:
+    """Bind a decoded value, coerced back to the python type of its key."""
+    if isinstance(key.type, NullType):
+        return literal(value)
+    try:
+        python_type = key.type.python_type
+    except NotImplementedError:
+        return literal(value, key.type)
+    try:
+        return literal(_adapter(python_type).validate_python(value), key.type)
+    except ValidationError as e:
+        raise InvalidCursor() from e
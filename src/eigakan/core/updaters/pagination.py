@@ -5,10 +5,14 @@ from __future__ import annotations
 from math import ceil
 from typing import TYPE_CHECKING
 
+from sqlalchemy import Integer, bindparam
+
 from .exc import PaginationInvalidArgument
 from .updater import Updater
 
 if TYPE_CHECKING:
+    from collections.abc import Hashable, Mapping
+
     from sqlalchemy.sql.expression import Select
 
 
@@ -49,13 +53,38 @@ class Pagination(Updater):
         """Return the page number."""
         return self._page
 
-    def get_total_number_of_pages(self, total_lines: int) -> int:
-        """Compute the total number of pages."""
-        return ceil(total_lines / self._limit)
+    @property
+    def limit(self) -> int:
+        """Return the number of items per page."""
+        return self._limit
+
+    @property
+    def offset(self) -> int:
+        """Return the number of items skipped."""
+        return self._offset
+
+    def get_total_number_of_pages(self, total_lines: int | None) -> int | None:
+        """Compute the total number of pages, unknown if lines are unknown."""
+        return None if total_lines is None else ceil(total_lines / self._limit)
+
+    @property
+    def shape(self) -> Hashable:
+        """Return the class, the clauses only depend on bound values."""
+        return self.__class__
+
+    @property
+    def params(self) -> Mapping[str, int]:
+        """Return the values bound to the clauses."""
+        return {
+            "pagination_offset": self._offset,
+            "pagination_limit": self._limit,
+        }
 
     def update(self, statement: Select) -> Select:
         """Update the statement with the proper clauses."""
-        return statement.offset(self._offset).limit(self._limit)
+        return statement.offset(
+            bindparam("pagination_offset", self._offset, type_=Integer)
+        ).limit(bindparam("pagination_limit", self._limit, type_=Integer))
 
     @staticmethod
     def _validated_argument(arg):
@@ -0,0 +1,105 @@
+"""Projection Updater."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, raiseload, selectinload
+
+from eigakan.types import M
+
+from ..registry import describe
+from .exc import AttributeCannotBeLoaded
+from .updater import Updater
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Mapping
+    from typing import Type
+
+    from sqlalchemy.sql.expression import Select
+
+
+class Projection[Model: M](Updater):
+    """
+    Load only some attributes of the model.
+
+    Other columns are not fetched and other relationships are not loaded,
+    accessing them raises. The primary key is always loaded; names that are
+    neither a column nor a relationship (query expressions) are left to the
+    options populating them.
+    """
+
+    def __init__(self, model: Type[Model], fields: Iterable[str]) -> None:
+        """
+        Initialize the updater.
+
+        Parameters
+        ----------
+        model : Type[Model]
+            SQLAlchemy model read.
+        fields : Iterable[str]
+            names of the attributes loaded, in any order.
+
+        Raises
+        ------
+        AttributeCannotBeLoaded
+            if a name is not a mapped attribute of the model.
+
+        """
+        self._model = model
+        requested = set(fields)
+        attributes = inspect(model).attrs
+        if unknown := requested.difference(attributes.keys()):
+            raise AttributeCannotBeLoaded(min(unknown), model.__name__)
+        # in the order of the mapper: one shape per set of attributes
+        self._fields = tuple(
+            name for name in attributes.keys() if name in requested
+        )
+
+    @property
+    def fields(self) -> tuple[str, ...]:
+        """Return the names of the attributes loaded."""
+        return self._fields
+
+    @property
+    def shape(self) -> Hashable:
+        """Return the attributes loaded, the options hold no value."""
+        return self.__class__, self._model, self._fields
+
+    @property
+    def params(self) -> Mapping[str, str]:
+        """Return the values bound to the clauses, none."""
+        return {}
+
+    def update(self, statement: Select) -> Select:
+        """Update the statement with the loader options of the projection."""
+        metadata = describe(self._model)
+        return statement.options(
+            # never empty, even if only query expressions are loaded
+            load_only(
+                *metadata.primary_key,
+                *(
+                    column
+                    for name, column in metadata.columns.items()
+                    if name in self._fields
+                ),
+            ),
+            *(
+                (selectinload if name in self._fields else raiseload)(
+                    getattr(self._model, name)
+                )
+                for name in metadata.relationships
+            ),
+        )
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return f"{self.__class__.__name__}({self._fields!r})"
+
+    def __str__(self) -> str:
+        """Return a human-friendly string representation of the object."""
+        return (
+            f"・{self.__class__.__name__} ⇢ "
+            f"LOAD {self._model.__name__}({', '.join(self._fields)})"
+        )
@@ -6,12 +6,15 @@ from typing import TYPE_CHECKING
 
 from eigakan.types import M
 
+from ..registry import describe
+from .exc import ColumnCannotBeSorted, UpdaterNotLoaded
 from .updater import Updater
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Hashable, Iterable, Mapping
     from typing import Self, Type
 
+    from sqlalchemy.orm import InstrumentedAttribute
     from sqlalchemy.sql.elements import UnaryExpression
     from sqlalchemy.sql.expression import Select
 
@@ -33,22 +36,50 @@ class Sorter[Model: M](Updater):
         """
         self._asc = asc
         self._desc = desc
+        self._model: Type[Model] | None = None
 
     def __call__(self, model: Type[Model]) -> Self:
         """Register the model."""
-        return super().__call__(model)
+        self._model = model
+        return self
 
     @property
     def ascending(self) -> tuple[UnaryExpression, ...]:
         """Return a tuple of `model.column.asc()` expressions."""
         self._raise_if_no_model_registered(method_name="@ascending")
-        return tuple(getattr(self._model, col).asc() for col in self._asc)
+        return tuple(self._column(col).asc() for col in self._asc)
 
     @property
     def descending(self) -> tuple[UnaryExpression, ...]:
         """Return tuple of `model.column.desc()` expressions."""
         self._raise_if_no_model_registered(method_name="@descending")
-        return tuple(getattr(self._model, col).desc() for col in self._desc)
+        return tuple(self._column(col).desc() for col in self._desc)
+
+    def _column(self, name: str) -> InstrumentedAttribute:
+        """Return the sortable column of the model with this name."""
+        if (column := describe(self._model).sortable.get(name)) is None:
+            raise ColumnCannotBeSorted(name, self._model.__name__)
+        return column
+
+    @property
+    def shape(self) -> Hashable:
+        """Return the columns sorted, the clauses hold no value."""
+        return (
+            self.__class__,
+            self._model,
+            tuple(self._asc),
+            tuple(self._desc),
+        )
+
+    @property
+    def params(self) -> Mapping[str, str]:
+        """Return the values bound to the clauses, none."""
+        return {}
+
+    def _raise_if_no_model_registered(self, method_name: str) -> None:
+        """Raise an error if the model has not been registered."""
+        if self._model is None:
+            raise UpdaterNotLoaded(self.__class__.__name__, method_name)
 
     def update(self, statement: Select) -> Select:
         """Update the statement with the proper `order_by` clauses."""
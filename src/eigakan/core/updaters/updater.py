@@ -1,9 +1,38 @@
 from __future__ import annotations
 
-from typing import Protocol
+from collections.abc import Hashable, Mapping, Sequence
+from typing import Any, Protocol, runtime_checkable
 
+from sqlalchemy import Row
 from sqlalchemy.sql.expression import Select
 
 
 class Updater(Protocol):
     def update(self, statement: Select) -> Select: ...
+
+
+@runtime_checkable
+class Consumer(Protocol):
+    """Updater that needs to post-process the lines it helped to fetch."""
+
+    def consume(self, rows: Sequence[Row]) -> Sequence[Row]: ...
+
+
+@runtime_checkable
+class Cacheable(Protocol):
+    """
+    Updater whose clauses only depend on its shape, values being bound.
+
+    Statements made of such updaters are built once per shape, then executed
+    with the `params` of the updaters.
+    """
+
+    @property
+    def shape(self) -> Hashable | None:
+        """Return what the clauses depend on, None if they embed values."""
+        ...
+
+    @property
+    def params(self) -> Mapping[str, Any]:
+        """Return the values bound to the clauses."""
+        ...
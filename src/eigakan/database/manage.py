@@ -16,6 +16,7 @@ from sqlalchemy.pool import NullPool
 from sqlalchemy.schema import CreateSchema, DropSchema
 
 from eigakan.env import DATABASE
+from eigakan.theater import neighbours
 
 from .core import Base
 from .enums import CORE_SCHEMA
@@ -75,6 +76,14 @@ def seed():
             },
         )
 
+        # planner statistics, without them spatial indexes are ignored.
+        for table in get_core_tables():
+            conn.execute(text(f"ANALYZE {CORE_SCHEMA}.{table.name}"))
+
+        # derived from the theaters, walking the spatial indexes.
+        neighbours.build(conn)
+        conn.execute(text(f"ANALYZE {CORE_SCHEMA}.neighbour"))
+
         elapsed_time = int(1000 * (time() - start))
         print(
             "Tables created and seeded to",
@@ -1,9 +1,13 @@
-from typing import Annotated, Type
+from typing import Annotated, Literal, Type
 from uuid import UUID
 
-from fastapi import Depends, Query
+from fastapi import Depends, Header, Query
 
+from eigakan.core.conditional import Conditions as _Conditions
+from eigakan.core.count import Count as _Count
+from eigakan.core.count import counts
 from eigakan.core.statement import ReadOneBy
+from eigakan.core.updaters import Keyset as _Keyset
 from eigakan.core.updaters import Pagination as _Pagination
 from eigakan.types import M
 
@@ -13,7 +17,15 @@ def _parse_pagination(
     limit: int = Query(
         20, ge=1, le=100, description="*number of items per page.*"
     ),
-) -> _Pagination:
+    cursor: str | None = Query(
+        None,
+        description=(
+            "*opt-in keyset pagination: the `next` cursor of the previous "
+            "page, empty for the first one (`page` is then ignored). Pages "
+            "sorted by distance still read the lines before them.*"
+        ),
+    ),
+) -> _Pagination | _Keyset:
     """
     Dependency for parsing optional query parameters associated to pagination.
 
@@ -23,17 +35,84 @@ def _parse_pagination(
         requested page's number (1 indexed).
     limit: int, optional
         page's length.
+    cursor: str, optional
+        cursor of the previous page, switches to keyset pagination.
 
     Returns
     -------
-    Pagination
-        A pagination updater initialized with the parsed parameters.
+    Pagination | Keyset
+        A pagination updater initialized with the parsed parameters,
+        a keyset one if a cursor (even empty) has been provided.
+
+    Raises
+    ------
+    InvalidCursor
+        If the cursor cannot be decoded.
 
     """
+    if cursor is not None:
+        return _Keyset(limit=limit, cursor=cursor)
     return _Pagination(page=page, limit=limit)
 
 
-Pagination = Annotated[_Pagination, Depends(_parse_pagination)]
+Pagination = Annotated[_Pagination | _Keyset, Depends(_parse_pagination)]
+
+
+def _parse_count(
+    count: Literal["none", "estimate", "exact"] = Query(
+        "exact",
+        description=(
+            "*how the total number of pages is computed: `none` skips it, "
+            "`estimate` relies on the database planner.*"
+        ),
+    ),
+) -> _Count:
+    """
+    Dependency for parsing the optional count strategy.
+
+    Parameters
+    ----------
+    count: str, optional
+        requested count strategy.
+
+    Returns
+    -------
+    Count
+        the strategy, exact counts being served from cache when enabled.
+
+    """
+    if count == "exact":
+        return _Count.CACHED if counts.enabled else _Count.EXACT
+    return _Count(count)
+
+
+Count = Annotated[_Count, Depends(_parse_count)]
+
+
+def _parse_conditions(
+    if_none_match: str | None = Header(None),
+    if_modified_since: str | None = Header(None),
+) -> _Conditions:
+    """
+    Dependency for parsing the validators of a conditional request.
+
+    Parameters
+    ----------
+    if_none_match: str, optional
+        ETags of the representations cached by the client.
+    if_modified_since: str, optional
+        date of the representation cached, ignored along an ETag.
+
+    Returns
+    -------
+    Conditions
+        the validators sent, if any.
+
+    """
+    return _Conditions(if_none_match, if_modified_since)
+
+
+Conditions = Annotated[_Conditions, Depends(_parse_conditions)]
 
 
 class ResourceInjecter:
@@ -1,6 +1,8 @@
 """Environment parser."""
 
 # ruff: noqa: RUF009
+import sys
+import tempfile
 import warnings
 from dataclasses import dataclass
 from pathlib import Path
@@ -39,6 +41,12 @@ class APP:
 
     LOG_LEVEL: str = config("LOG_LEVEL", cast=str, default="INFO")
     STATIC_DIR: Path = config("STATIC_DIR", cast=Path)
+    COALESCE_WINDOW: float = config(
+        "COALESCE_WINDOW", cast=float, default=0.002
+    )
+    COALESCE_SIZE: int = config("COALESCE_SIZE", cast=int, default=100)
+    # seconds theaters are served from HTTP caches, revalidated if null
+    HTTP_MAX_AGE: int = config("HTTP_MAX_AGE", cast=int, default=60)
 
 
 @dataclass(repr=False, eq=False, frozen=True)
@@ -47,3 +55,63 @@ class JWT:
 
     SECRET: Secret = config("JWT_SECRET", cast=Secret)
     HOURS_TO_EXPIRE: int = config("JWT_HOURS_TO_EXPIRE", cast=int, default=24)
+    CLAIMS: bool = config("JWT_CLAIMS", cast=bool, default=False)
+    REVOCATION_REFRESH: float = config(
+        "JWT_REVOCATION_REFRESH", cast=float, default=30
+    )
+
+
+@dataclass(repr=False, eq=False, frozen=True)
+class PASSWORD:
+    """Password hashing configuration."""
+
+    HASH_WORKERS: int = config("PASSWORD_HASH_WORKERS", cast=int, default=2)
+    HASH_QUEUE: int = config("PASSWORD_HASH_QUEUE", cast=int, default=16)
+
+
+def _rate_limit_storage() -> str:
+    """Return the default storage of the rate limits, shared if possible."""
+    if sys.platform == "win32":
+        # no record locks: each worker counts on its own
+        return "memory://"
+    directory = Path("/dev/shm")  # noqa: S108
+    if not directory.is_dir():
+        # macOS: a regular file, mostly held in the page cache anyway
+        directory = Path(tempfile.gettempdir())
+    return f"shm://{directory / 'eigakan-ratelimit'}"
+
+
+@dataclass(repr=False, eq=False, frozen=True)
+class RATE_LIMIT:
+    """Rate limiting configuration, limits being `limits` strings."""
+
+    ENABLED: bool = config("RATE_LIMIT_ENABLED", cast=bool, default=True)
+    STORAGE_URI: str = config(
+        "RATE_LIMIT_STORAGE_URI",
+        cast=str,
+        default=_rate_limit_storage(),
+    )
+    SLOTS: int = config("RATE_LIMIT_SLOTS", cast=int, default=65536)
+    LOGIN: str = config("RATE_LIMIT_LOGIN", cast=str, default="10/minute")
+    THEATERS: str = config(
+        "RATE_LIMIT_THEATERS", cast=str, default="300/minute"
+    )
+
+
+@dataclass(repr=False, eq=False, frozen=True)
+class CACHE:
+    """In-process caches configuration, a null ttl disables a cache."""
+
+    COUNT_TTL: int = config("CACHE_COUNT_TTL", cast=int, default=60)
+    COUNT_SIZE: int = config("CACHE_COUNT_SIZE", cast=int, default=1024)
+    THEATER_INDEX: bool = config(
+        "CACHE_THEATER_INDEX", cast=bool, default=False
+    )
+    THEATER_INDEX_TTL: int = config(
+        "CACHE_THEATER_INDEX_TTL", cast=int, default=300
+    )
+    TILE_TTL: int = config("CACHE_TILE_TTL", cast=int, default=300)
+    TILE_SIZE: int = config("CACHE_TILE_SIZE", cast=int, default=4096)
+    STATEMENT_SIZE: int = config("CACHE_STATEMENT_SIZE", cast=int, default=512)
+    OWNER_TTL: int = config("CACHE_OWNER_TTL", cast=int, default=60)
+    OWNER_SIZE: int = config("CACHE_OWNER_SIZE", cast=int, default=1024)
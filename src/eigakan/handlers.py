@@ -6,7 +6,9 @@ from fastapi.responses import JSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
+from eigakan.auth.exc import HashingOverloaded
 from eigakan.core.exc import DuplicatedResource, ResourceNotFound
+from eigakan.core.updaters.exc import InvalidCursor
 
 
 async def _resource_not_found(request: Request, exc: ResourceNotFound):
@@ -55,6 +57,53 @@ async def _duplicated_resource(request: Request, exc: DuplicatedResource):
     )
 
 
+async def _invalid_cursor(request: Request, exc: InvalidCursor):
+    """
+    Return a 400 response when an `InvalidCursor` is raised by the app.
+
+    Parameters
+    ----------
+    request : Request
+        the request object.
+    exc : InvalidCursor
+        the exception raised.
+
+    Returns
+    -------
+    JSONResponse
+        A JSON response with a 400 status code
+
+    """
+    return JSONResponse(
+        status_code=HTTPStatus.BAD_REQUEST,
+        content=exc.args[0],
+    )
+
+
+async def _hashing_overloaded(request: Request, exc: HashingOverloaded):
+    """
+    Return a 503 response when a password cannot be hashed right away.
+
+    Parameters
+    ----------
+    request : Request
+        the request object.
+    exc : HashingOverloaded
+        the exception raised.
+
+    Returns
+    -------
+    JSONResponse
+        A JSON response with a 503 status code
+
+    """
+    return JSONResponse(
+        status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+        content=exc.args[0],
+        headers={"Retry-After": "1"},
+    )
+
+
 APP_EXC_HANDLERS = {
     RateLimitExceeded: _rate_limit_exceeded_handler,
 }
@@ -62,6 +111,8 @@ APP_EXC_HANDLERS = {
 API_EXC_HANDLERS = {
     ResourceNotFound: _resource_not_found,
     DuplicatedResource: _duplicated_resource,
+    InvalidCursor: _invalid_cursor,
+    HashingOverloaded: _hashing_overloaded,
 }
 
 EXC_HANDLERS = MappingProxyType(
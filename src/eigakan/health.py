@@ -0,0 +1,49 @@
+"""
+Counters of the worker answering, to tune the in-process caches by.
+
+The caches and the password hashing pool are per worker: each request is
+answered by one of them, the counters of the others being left out.
+"""
+
+from http import HTTPStatus
+
+from fastapi import APIRouter
+
+from .auth.cache import owned, owners
+from .auth.password import pool
+from .core.count import counts
+from .core.statement import statements
+from .schemas import Health
+from .theater.tiles import tiles
+
+router = APIRouter()
+
+_CACHES = {
+    "statements": statements,
+    "counts": counts,
+    "tiles": tiles,
+    "owners": owners,
+    "owned": owned,
+}
+
+
+@router.get("", response_model=Health, status_code=HTTPStatus.OK)
+async def read_health():
+    """Read the hit rates of the caches and the load of the hashing pool."""
+    return {
+        "caches": {
+            name: {
+                "entries": len(cache),
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "hit_rate": cache.hit_rate,
+            }
+            for name, cache in _CACHES.items()
+        },
+        "hash_pool": {
+            "depth": pool.depth,
+            "rejected": pool.rejected,
+            "hashes": pool.hashes,
+            "mean_hash_time": pool.mean_hash_time,
+        },
+    }
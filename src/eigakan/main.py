@@ -1,13 +1,38 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from starlette.staticfiles import StaticFiles
 
 from .api import router as api_router
-from .env import APP
+from .auth.revocation import revocations
+from .database.core import AsyncSessionFactory
+from .env import APP, JWT
 from .handlers import EXC_HANDLERS
 from .middleware import MIDDLEWARES
 from .slow import limiter
+from .theater.memory import index
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Warm the in-process caches up before serving."""
+    if index.enabled:
+        async with AsyncSessionFactory() as session:
+            await index.load(session)
+    if not JWT.CLAIMS:
+        yield
+        return
+    await revocations.reload()
+    watch = asyncio.create_task(revocations.watch(JWT.REVOCATION_REFRESH))
+    try:
+        yield
+    finally:
+        watch.cancel()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     exception_handlers=EXC_HANDLERS["app"],  # type: ignore
     openapi_url=None,
     middleware=MIDDLEWARES["app"],
@@ -22,6 +47,8 @@ api = FastAPI(
     exception_handlers=EXC_HANDLERS["api"],  # type: ignore
 )
 api.include_router(api_router)
+# the routes limited are served, and exceeded, by the api
+api.state.limiter = limiter
 # we mount the frontend and app
 if APP.STATIC_DIR and APP.STATIC_DIR.is_dir():
     frontend.mount("/", StaticFiles(directory=APP.STATIC_DIR), name="app")
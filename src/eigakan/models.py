@@ -47,6 +47,8 @@ class TimeStampMixin:
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         server_default=func.now(),
+        # bulk updates bypass the event below
+        onupdate=func.now(),
         nullable=True,
     )
 
@@ -12,12 +12,60 @@ class Page(BaseModel):
         ge=1,
         description="current page's number.",
     )
-    total: int = Field(
-        ..., examples=[4], description="total number of pages available."
+    total: int | None = Field(
+        ...,
+        examples=[4],
+        description=(
+            "total number of pages available, null if lines are not counted."
+        ),
+    )
+
+
+class Cursor(BaseModel):
+    """Keyset pagination schema."""
+
+    next: str | None = Field(
+        ...,
+        description="cursor of the next page, null on the last one.",
     )
 
 
 class _Paginated(BaseModel):
     """Paginated base pydantic model."""
 
-    pagination: Page
+    pagination: Page | Cursor
+
+
+class ItemError(BaseModel):
+    """Error of an item of a batch, the others being processed."""
+
+    index: int = Field(..., description="position of the item in the batch.")
+    status: int = Field(..., examples=[409], description="HTTP status.")
+    detail: str
+
+
+class CacheStats(BaseModel):
+    """Counters of an in-process cache, since the worker started."""
+
+    entries: int = Field(..., description="entries held, expired included.")
+    hits: int
+    misses: int
+    hit_rate: float = Field(..., ge=0, le=1)
+
+
+class HashPoolStats(BaseModel):
+    """Counters of the password hashing pool, since the worker started."""
+
+    depth: int = Field(..., description="hashes running or waiting.")
+    rejected: int = Field(..., description="hashes refused, the pool full.")
+    hashes: int = Field(..., description="hashes computed.")
+    mean_hash_time: float = Field(
+        ..., description="mean time (seconds) of a hash."
+    )
+
+
+class Health(BaseModel):
+    """Counters of the worker answering."""
+
+    caches: dict[str, CacheStats]
+    hash_pool: HashPoolStats
@@ -1,4 +1,20 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-limiter = Limiter(key_func=get_remote_address)
+from .env import RATE_LIMIT
+
+if RATE_LIMIT.STORAGE_URI.startswith("shm://"):
+    # registers the `shm://` storage, POSIX only
+    from .core.shm import SharedMemoryStorage  # noqa: F401
+
+limiter = Limiter(
+    key_func=get_remote_address,
+    strategy="sliding-window-counter",
+    storage_uri=RATE_LIMIT.STORAGE_URI,
+    storage_options=(
+        {"slots": RATE_LIMIT.SLOTS}
+        if RATE_LIMIT.STORAGE_URI.startswith("shm://")
+        else {}
+    ),
+    enabled=RATE_LIMIT.ENABLED,
+)
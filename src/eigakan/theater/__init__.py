@@ -1 +1,2 @@
+from . import neighbours  # registers the neighbours maintenance
 from .router import router
@@ -0,0 +1,157 @@
+"""
+Operations on theaters, applied as a batch.
+
+The owner is authenticated once and the owners of the theaters targeted
+are read by a single statement, unless cached as owned, then the
+operations are applied in order within a single transaction. Each
+operation runs in a savepoint of its own: a failing operation is rolled
+back alone, the others being committed, unless the batch is atomic in
+which case nothing is.
+"""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from fastapi import APIRouter
+from sqlalchemy import select
+
+from eigakan.auth.cache import owned, owned_ids
+from eigakan.auth.dependencies import CurrentUser
+from eigakan.core.cud import CUD
+from eigakan.core.exc import DuplicatedResource, ResourceNotFound
+from eigakan.database.core import Session
+
+from . import schemas as sch
+from .models import Theater
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from uuid import UUID
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.auth.models import Owner
+
+router = APIRouter()
+cud = CUD(Theater)
+
+
+class NotOwned(Exception):
+    """Raised when an operation targets a theater of another owner."""
+
+    def __init__(self, id: UUID) -> None:
+        super().__init__(f"Theater '{id}' is not owned.")
+
+
+_STATUSES = {
+    ResourceNotFound: HTTPStatus.NOT_FOUND,
+    DuplicatedResource: HTTPStatus.CONFLICT,
+    NotOwned: HTTPStatus.FORBIDDEN,
+}
+
+
+@router.post(
+    "/batch", response_model=sch.BatchResult, status_code=HTTPStatus.OK
+)
+async def apply_batch(body: sch.Batch, session: Session, owner: CurrentUser):
+    """Create, update or delete many theaters, at once."""
+    return {"content": await apply(body, owner, session)}
+
+
+async def apply(
+    batch: sch.Batch, owner: Owner, session: AsyncSession
+) -> list[dict[str, Any]]:
+    """
+    Apply the operations of a batch, then commit them.
+
+    Returns
+    -------
+    list[dict[str, Any]]
+        result of each operation, in order: the operations not applied
+        because an atomic batch failed are `424 Failed Dependency`.
+
+    """
+    targets = {
+        operation.id
+        for operation in batch.operations
+        if not isinstance(operation, sch.CreateOperation)
+    }
+    owners: dict[UUID, int | None] = {}
+    if owned.enabled:
+        mine = targets & await owned_ids(owner, session)
+        owners = dict.fromkeys(mine, owner.siret)
+        targets -= mine
+    if targets:
+        owners.update(
+            (
+                await session.execute(
+                    select(Theater.id, Theater.siret).where(
+                        Theater.id.in_(targets)
+                    )
+                )
+            ).all()
+        )
+    results = []
+    applied = await session.begin_nested()
+    for operation in batch.operations:
+        try:
+            async with session.begin_nested():
+                results.append(await _apply(operation, owner, owners, session))
+        except (NotOwned, ResourceNotFound, DuplicatedResource) as exc:
+            failure = {
+                "status": _STATUSES[type(exc)],
+                "detail": exc.args[0],
+            }
+            if batch.atomic:
+                await applied.rollback()
+                cancelled = {"status": HTTPStatus.FAILED_DEPENDENCY}
+                return [
+                    failure if other is operation else cancelled
+                    for other in batch.operations
+                ]
+            results.append(failure)
+    await session.commit()
+    return results
+
+
+async def _apply(
+    operation: sch.CreateOperation | sch.UpdateOperation | sch.DeleteOperation,
+    owner: Owner,
+    owners: Mapping[UUID, int | None],
+    session: AsyncSession,
+) -> dict[str, Any]:
+    """Apply an operation, uncommitted."""
+    if isinstance(operation, sch.CreateOperation):
+        theater = await cud.create(
+            {
+                **operation.body.model_dump(exclude={"latitude", "longitude"}),
+                "siret": owner.siret,
+            },
+            session,
+            commit=False,
+        )
+        return {"status": HTTPStatus.CREATED, "id": theater.id}
+    if operation.id not in owners:
+        raise ResourceNotFound("id", operation.id)
+    if owners[operation.id] != owner.siret:
+        raise NotOwned(operation.id)
+    where = {"id": operation.id, "siret": owner.siret}
+    if isinstance(operation, sch.UpdateOperation):
+        written = await cud.update_where(
+            operation.body.model_dump(
+                exclude={"latitude", "longitude"},
+                exclude_unset=True,
+                exclude_none=True,
+            ),
+            where,
+            session,
+            commit=False,
+        )
+    else:
+        written = await cud.delete_where(where, session, commit=False)
+    if not written:
+        # deleted by a previous operation
+        raise ResourceNotFound("id", operation.id)
+    return {"status": HTTPStatus.NO_CONTENT}
@@ -0,0 +1,93 @@
+"""
+Theaters clustered on a grid, for the low zoom levels of a map.
+
+The grid is aligned on the web mercator tiles: each tile of the requested
+zoom level is split in `GRID` x `GRID` cells, so that clusters keep the
+same size on screen whatever the zoom level. Theaters are grouped by cell
+and accessibility in a single statement, the groups of a cell are then
+merged into a cluster.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+
+from eigakan.core.statement import Statement
+
+from .models import Accessibility, Theater
+
+if TYPE_CHECKING:
+    from sqlalchemy import Select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.core.updaters import Updater
+
+# cells per tile side
+GRID = 8
+# web mercator extent (meters)
+_WORLD = 2 * 20037508.342789244
+
+
+@dataclass(slots=True)
+class Cluster:
+    """Theaters of a grid cell."""
+
+    count: int = 0
+    longitude: float = 0.0
+    latitude: float = 0.0
+    accessibility: dict[str, int] = field(default_factory=dict)
+
+    def add(
+        self, wheelchair: str, count: int, longitude: float, latitude: float
+    ) -> None:
+        """Merge a group of theaters, moving the centroid accordingly."""
+        total = self.count + count
+        self.longitude += (longitude - self.longitude) * count / total
+        self.latitude += (latitude - self.latitude) * count / total
+        self.count = total
+        self.accessibility[wheelchair] = (
+            self.accessibility.get(wheelchair, 0) + count
+        )
+
+
+class ReadClusters(Statement):
+    """Cluster the theaters on a grid fitted to a zoom level."""
+
+    def __init__(self, zoom: int, *updaters: Updater | None) -> None:
+        super().__init__(Theater, *updaters)
+        self._size = _WORLD / (2**zoom * GRID)
+
+    def _base_statement(self) -> Select:
+        """Return the theaters grouped by cell and accessibility."""
+        projected = func.ST_Transform(Theater.geometry, 3857)
+        cell_x = func.floor(func.ST_X(projected) / self._size)
+        cell_y = func.floor(func.ST_Y(projected) / self._size)
+        wheelchair = (
+            select(Accessibility.name)
+            .where(Accessibility.id == Theater.accessibility_id)
+            .correlate(Theater)
+            .scalar_subquery()
+        )
+        return select(
+            cell_x.label("cell_x"),
+            cell_y.label("cell_y"),
+            wheelchair.label("wheelchair"),
+            func.count().label("count"),
+            func.avg(func.ST_X(Theater.geometry)).label("longitude"),
+            func.avg(func.ST_Y(Theater.geometry)).label("latitude"),
+        ).group_by(cell_x, cell_y, Theater.accessibility_id)
+
+    async def __call__(self, session: AsyncSession) -> list[Cluster]:
+        self._log_statement()
+        result = await session.execute(self.statement)
+        clusters: dict[tuple[float, float], Cluster] = {}
+        for cell_x, cell_y, wheelchair, *group in result.all():
+            clusters.setdefault((cell_x, cell_y), Cluster()).add(
+                wheelchair, *group
+            )
+        return sorted(
+            clusters.values(), key=lambda cluster: cluster.count, reverse=True
+        )
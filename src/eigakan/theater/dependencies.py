@@ -1,22 +1,28 @@
+from http import HTTPStatus
 from typing import Annotated
+from uuid import UUID
 
-from fastapi import Depends, Query
+from fastapi import Depends, HTTPException, Path, Query
 from geoalchemy2.elements import WKTElement
 from pydantic.json_schema import SkipJsonSchema
 
+from eigakan.core.updaters import Projection
 from eigakan.core.updaters.commons import (
     ScalarUpdater,
     StartsWithUpdater,
 )
 
 from .models import Theater
+from .schemas import TheaterRead
 from .schemas import Wheelchair as WheelchairEnum
-from .updaters import ClosestUpdater
+from .tiles import MAX_ZOOM
+from .tiles import Tile as _Tile
+from .updaters import BoundingBoxUpdater, ClosestUpdater, WithinUpdater
 
 LongParameter = Annotated[
-    float,
+    float | SkipJsonSchema[None],
     Query(
-        description="position longitude *WGS84*",
+        description="position longitude *WGS84*, required without ids",
         examples=[2.2646354, 4.2838956],
         openapi_examples={
             "Paris": {
@@ -31,9 +37,9 @@ LongParameter = Annotated[
     ),
 ]
 LatParameter = Annotated[
-    float,
+    float | SkipJsonSchema[None],
     Query(
-        description="position latitude *WGS84*",
+        description="position latitude *WGS84*, required without ids",
         examples=[48.8589384, 45.4240741],
         openapi_examples={
             "Paris": {
@@ -49,12 +55,53 @@ LatParameter = Annotated[
 ]
 
 
-async def _parse_coordinates(longitude: LongParameter, latitude: LatParameter):
+async def _parse_coordinates(
+    longitude: LongParameter = None,
+    latitude: LatParameter = None,
+    geodesic: Annotated[
+        bool,
+        Query(
+            description=(
+                "*sort by distance on the WGS84 spheroid and return it "
+                "(meters).*"
+            ),
+        ),
+    ] = False,
+):
+    if longitude is None or latitude is None:
+        # only the theaters of the ids requested are read without them
+        return None
     _ = f"POINT({longitude} {latitude})"
-    return ClosestUpdater(Theater, WKTElement(_, srid=4326))
+    return ClosestUpdater(
+        Theater, WKTElement(_, srid=4326), knn=True, geodesic=geodesic
+    )
+
+
+Position = Annotated[ClosestUpdater | None, Depends(_parse_coordinates)]
+
+
+def _parse_radius(
+    longitude: LongParameter = None,
+    latitude: LatParameter = None,
+    meters: Annotated[
+        float | SkipJsonSchema[None],
+        Query(
+            alias="withinMeters",
+            description="*only theaters within this radius (meters).*",
+            examples=[10_000],
+            gt=0,
+            le=1_000_000,
+        ),
+    ] = None,
+):
+    return (
+        WithinUpdater(Theater, longitude, latitude, meters)
+        if meters and longitude is not None and latitude is not None
+        else None
+    )
 
 
-Position = Annotated[ClosestUpdater, Depends(_parse_coordinates)]
+Radius = Annotated[WithinUpdater | None, Depends(_parse_radius)]
 
 
 def _parse_accessibility(
@@ -109,3 +156,131 @@ def _parse_zip(
 
 
 DepartmentCode = Annotated[StartsWithUpdater | None, Depends(_parse_zip)]
+
+
+def filters(
+    accessibility: WheelchairEnum | None = None,
+    nb_screens: int | None = None,
+    zip: str | None = None,
+) -> tuple[
+    ScalarUpdater | None, ScalarUpdater | None, StartsWithUpdater | None
+]:
+    """Return the filter updaters of values that are not query parameters."""
+    return (
+        _parse_accessibility(accessibility),
+        _parse_screen(nb_screens),
+        _parse_zip(zip),
+    )
+
+
+def _parse_tile(
+    z: Annotated[int, Path(description="zoom level", ge=0, le=MAX_ZOOM)],
+    x: Annotated[int, Path(description="tile column", ge=0)],
+    y: Annotated[int, Path(description="tile row", ge=0)],
+):
+    tile = _Tile(z, x, y)
+    if not tile.exists:
+        raise HTTPException(HTTPStatus.NOT_FOUND, "Tile does not exist.")
+    return tile
+
+
+Tile = Annotated[_Tile, Depends(_parse_tile)]
+
+
+_MAX_LONGITUDE = 180
+_MAX_LATITUDE = 90
+
+
+def _parse_bbox(
+    bbox: Annotated[
+        str,
+        Query(
+            description="viewport *WGS84* bounds: west,south,east,north",
+            examples=["2.22,48.81,2.47,48.91"],
+            pattern=r"^[^,]+(,[^,]+){3}$",
+        ),
+    ],
+):
+    try:
+        west, south, east, north = map(float, bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY, "bbox bounds must be numbers."
+        ) from None
+    if not (
+        -_MAX_LONGITUDE <= west < east <= _MAX_LONGITUDE
+        and -_MAX_LATITUDE <= south < north <= _MAX_LATITUDE
+    ):
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY, "bbox bounds are out of order."
+        )
+    return BoundingBoxUpdater(Theater, west, south, east, north)
+
+
+BoundingBox = Annotated[BoundingBoxUpdater, Depends(_parse_bbox)]
+Zoom = Annotated[
+    int, Query(description="map zoom level.", examples=[6], ge=0, le=MAX_ZOOM)
+]
+
+
+# ids read at once
+MAX_IDS = 100
+
+
+def _parse_ids(
+    ids: Annotated[
+        str | None,
+        Query(
+            description=(
+                "*comma separated ids of the theaters to read, in this "
+                f"order (at most {MAX_IDS}); other parameters are ignored.*"
+            ),
+        ),
+    ] = None,
+) -> list[UUID] | None:
+    if ids is None:
+        return None
+    try:
+        parsed = [UUID(id_) for id_ in ids.split(",")]
+    except ValueError:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY, "ids must be UUIDs."
+        ) from None
+    if len(parsed) > MAX_IDS:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY,
+            f"at most {MAX_IDS} ids can be read at once.",
+        )
+    return parsed
+
+
+Ids = Annotated[list[UUID] | None, Depends(_parse_ids)]
+
+
+def _parse_fields(
+    fields: Annotated[
+        str | None,
+        Query(
+            description=(
+                "*comma separated fields of the theaters returned, all of "
+                "them by default.*"
+            ),
+            examples=["name,city_name,distance"],
+        ),
+    ] = None,
+) -> Projection | None:
+    if fields is None:
+        return None
+    names = set(fields.split(","))
+    if unknown := names - TheaterRead.model_fields.keys():
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY,
+            f"unknown fields: {', '.join(sorted(unknown))}.",
+        )
+    # in the order of the schema, whatever the order requested
+    return Projection(
+        Theater, [name for name in TheaterRead.model_fields if name in names]
+    )
+
+
+Fields = Annotated[Projection | None, Depends(_parse_fields)]
@@ -0,0 +1,171 @@
+"""
+Export of the theaters, streamed.
+
+The theaters matching the filters are read from a server side cursor,
+`CHUNK` lines at a time, and written to the response as they are read:
+memory use does not depend on the number of theaters exported.
+
+The snapshot is identified by an ETag computed from the revision of the
+theaters, the filters and the format, the revision being read in the same
+repeatable read transaction as the lines themselves: an unchanged dataset
+is answered `304 Not Modified` after a primary key lookup, without being
+read.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from enum import StrEnum, auto
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from pydantic import TypeAdapter
+from sqlalchemy import func
+
+from eigakan.core import revision
+from eigakan.core.statement import ReadAll
+from eigakan.core.updaters.sort import Sorter
+
+from . import rows
+from .models import Theater
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Mapping, Sequence
+    from datetime import datetime
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.core.updaters import Updater
+
+# lines read at once
+CHUNK = 1000
+
+
+class Format(StrEnum):
+    NDJSON = auto()
+    GEOJSON = auto()
+    CSV = auto()
+
+    @property
+    def media_type(self) -> str:
+        """Return the media type of the export."""
+        return _MEDIA_TYPES[self]
+
+
+_MEDIA_TYPES = {
+    Format.NDJSON: "application/x-ndjson",
+    Format.GEOJSON: "application/geo+json",
+    Format.CSV: "text/csv; charset=utf-8",
+}
+
+COLUMNS = (
+    *(column for column in rows.COLUMNS if column.key != "distance"),
+    func.ST_X(Theater.geometry).label("longitude"),
+    func.ST_Y(Theater.geometry).label("latitude"),
+)
+
+_Point = TypedDict("_Point", {"type": str, "coordinates": tuple[float, float]})
+_features = TypeAdapter(
+    list[
+        TypedDict(
+            "_Feature",
+            {"type": str, "geometry": _Point, "properties": rows.TheaterRow},
+        )
+    ]
+)
+# flat fields of the csv export, accessibility being its name
+_CSV_FIELDS = (
+    *(
+        name
+        for name in rows.TheaterRow.__annotations__
+        if name not in {"accessibility", "distance"}
+    ),
+    "accessibility",
+    "longitude",
+    "latitude",
+)
+
+
+class ReadExport(ReadAll[Theater]):
+    """Read the theaters exported, as plain rows ordered by id."""
+
+    def __init__(self, *updaters: Updater | None) -> None:
+        super().__init__(
+            Theater,
+            *updaters,
+            Sorter(asc=("id",))(Theater),
+            columns=COLUMNS,
+        )
+
+    async def validators(
+        self, session: AsyncSession, format: Format
+    ) -> tuple[str, datetime | None]:
+        """Return the ETag and the last modification date of the export."""
+        stamp = await revision.read(session, Theater)
+        digest = blake2b(
+            f"{stamp.value}:{format}:{self._count_key()!r}".encode(),
+            digest_size=16,
+        ).hexdigest()
+        return f'"{digest}"', stamp.modified_at
+
+
+async def stream(
+    session: AsyncSession, export: ReadExport, format: Format
+) -> AsyncIterator[bytes]:
+    """
+    Yield the export, chunk by chunk, then close the session.
+
+    The session is handed over by the endpoint: it must outlive the
+    request dependencies, closed before the response is streamed.
+    """
+    try:
+        first = True
+        match format:
+            case Format.GEOJSON:
+                yield b'{"type":"FeatureCollection","features":['
+            case Format.CSV:
+                yield ",".join(_CSV_FIELDS).encode() + b"\r\n"
+        async for chunk in export.partitions(session, CHUNK):
+            match format:
+                case Format.NDJSON:
+                    yield b"".join(rows.dump(row) + b"\n" for row in chunk)
+                case Format.GEOJSON:
+                    # features of a chunk, brackets aside
+                    features = _geojson(chunk)[1:-1]
+                    yield features if first else b"," + features
+                case Format.CSV:
+                    yield _csv(chunk)
+            first = False
+        if format is Format.GEOJSON:
+            yield b"]}"
+    finally:
+        await session.close()
+
+
+def _geojson(chunk: Sequence[Mapping[str, Any]]) -> bytes:
+    return _features.dump_json(
+        [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Point",
+                    "coordinates": (row["longitude"], row["latitude"]),
+                },
+                "properties": row,
+            }
+            for row in chunk
+        ]
+    )
+
+
+def _csv(chunk: Sequence[Mapping[str, Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, _CSV_FIELDS, extrasaction="ignore")
+    writer.writerows(
+        {**row, "accessibility": row["accessibility"]["name"]}
+        if isinstance(row["accessibility"], dict)
+        else row
+        for row in chunk
+    )
+    return buffer.getvalue().encode()
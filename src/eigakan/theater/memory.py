@@ -0,0 +1,270 @@
+"""
+In-process engine answering the nearest theaters query.
+
+The theater relation is small (a few thousand rows) and seldom written:
+its coordinates and filtered attributes are kept in NumPy arrays so that
+`read_resource` (nearest, filters, offset pagination and count) is
+answered without a round trip to Postgres.
+
+Distances are computed for every candidate in a single vectorised pass
+rather than walking a KD-tree: the total number of matching lines has to
+be counted anyway, which already visits each row, and a sort over a few
+thousand floats costs a few microseconds.
+
+The ordering matches `ClosestUpdater(knn=True)`: planar distance in
+degrees (`hypot`, as computed by PostGIS for points), ties broken by id.
+
+The engine is refreshed lazily: the writes committed through `CUD`
+invalidate it, and it expires after `CACHE.THEATER_INDEX_TTL` seconds so
+that the writes committed by other workers are eventually seen.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from typing import TYPE_CHECKING
+
+from sqlalchemy import func, select
+
+from eigakan.core.count import Count
+from eigakan.core.events import on_write
+from eigakan.core.revision import on_change
+from eigakan.core.statement import Page
+from eigakan.core.updaters import Pagination, Projection
+from eigakan.core.updaters.commons import ScalarUpdater, StartsWithUpdater
+from eigakan.env import CACHE
+from eigakan.logger import logger
+
+from .models import Theater
+from .updaters import ClosestUpdater
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.core.events import Write
+    from eigakan.core.updaters import Updater
+
+# `LIKE` wildcards, a prefix containing one is left to Postgres
+_WILDCARDS = re.compile(r"[%_\\]")
+
+
+class TheaterIndex:
+    """Theaters, their coordinates and filtered attributes in memory."""
+
+    _SCALARS = ("accessibility.name", "nb_screens")
+    _PREFIXES = ("city_insee",)
+
+    def __init__(self, *, enabled: bool, ttl: int) -> None:
+        """
+        Initialize the engine, empty until its first use.
+
+        Parameters
+        ----------
+        enabled : bool
+            whether the engine answers queries, ignored without NumPy.
+        ttl : int
+            seconds after which the theaters are reloaded.
+
+        """
+        if enabled and np is None:
+            logger.warning("NumPy is not installed, theater index disabled.")
+        self._enabled = enabled and np is not None
+        self._ttl = ttl
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        self._loaded_at: float | None = None
+        self._theaters: list[Theater] = []
+        self._columns: dict[str, np.ndarray] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """Return whether the engine answers queries."""
+        return self._enabled
+
+    @property
+    def fresh(self) -> bool:
+        """Return whether the theaters loaded are up to date."""
+        return (
+            self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self._ttl
+        )
+
+    def invalidate(self) -> None:
+        """Reload the theaters on the next query."""
+        self._generation += 1
+        self._loaded_at = None
+
+    def supports(self, *updaters: Updater | None) -> bool:
+        """
+        Check whether a query can be answered from memory.
+
+        Only a planar nearest sort filtered by equality on the accessibility
+        or the number of screens, or by a department prefix, is supported.
+        """
+        if not self._enabled:
+            return False
+        sorted_ = False
+        for updater in updaters:
+            match updater:
+                case None | Pagination() | Projection():
+                    continue
+                case ClosestUpdater() if (
+                    not updater.geodesic and updater.coordinates
+                ):
+                    sorted_ = True
+                case ScalarUpdater() if updater.path in self._SCALARS:
+                    continue
+                case StartsWithUpdater() if (
+                    updater.path in self._PREFIXES
+                    and not _WILDCARDS.search(str(updater.value))
+                ):
+                    continue
+                case _:
+                    return False
+        return sorted_
+
+    async def load(self, session: AsyncSession) -> None:
+        """Load the theaters and their coordinates."""
+        generation = self._generation
+        loaded_at = time.monotonic()
+        result = await session.execute(
+            select(
+                Theater,
+                func.ST_X(Theater.geometry),
+                func.ST_Y(Theater.geometry),
+            )
+        )
+        rows = result.all()
+        self._build(
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [row[2] for row in rows],
+        )
+        # a write committed meanwhile may be missing from the rows
+        if generation == self._generation:
+            self._loaded_at = loaded_at
+        logger.info(f"Theater index loaded, {len(rows)} theaters.")
+
+    async def read_page(
+        self,
+        session: AsyncSession,
+        *updaters: Updater | None,
+        count: Count = Count.EXACT,
+    ) -> Page[Theater]:
+        """
+        Read a page of theaters, as `ReadPage` would.
+
+        The theaters are reloaded with `session` if they are not fresh.
+        Whatever the strategy, lines are counted exactly unless
+        `Count.NONE` is requested.
+        """
+        if not self.fresh:
+            async with self._lock:
+                if not self.fresh:
+                    await self.load(session)
+        mask = np.ones(len(self._theaters), dtype=bool)
+        position, pagination = None, None
+        for updater in updaters:
+            match updater:
+                case ClosestUpdater():
+                    position = updater
+                case Pagination():
+                    pagination = updater
+                case StartsWithUpdater():
+                    mask &= np.char.startswith(
+                        self._columns[updater.path], updater.value
+                    )
+                case ScalarUpdater():
+                    mask &= self._columns[updater.path] == updater.value
+        candidates = np.flatnonzero(mask)
+        ranked = candidates[
+            np.lexsort(
+                (
+                    self._columns["rank"][candidates],
+                    self._distances(position, candidates),
+                )
+            )
+        ]
+        if pagination is not None:
+            ranked = ranked[
+                pagination.offset : pagination.offset + pagination.limit
+            ]
+        return Page(
+            [self._theaters[i] for i in ranked],
+            None if count is Count.NONE else int(candidates.size),
+        )
+
+    def _distances(
+        self, position: ClosestUpdater, candidates: np.ndarray
+    ) -> np.ndarray:
+        """Compute the planar distance of the candidates to a position."""
+        longitude, latitude = position.coordinates
+        return np.hypot(
+            self._columns["x"][candidates] - longitude,
+            self._columns["y"][candidates] - latitude,
+        )
+
+    def _build(
+        self,
+        theaters: Sequence[Theater],
+        longitudes: Sequence[float],
+        latitudes: Sequence[float],
+    ) -> None:
+        """Build the columns queried from the theaters loaded."""
+        ranks = np.empty(len(theaters), dtype=np.intp)
+        ranks[sorted(range(len(theaters)), key=lambda i: theaters[i].id)] = (
+            np.arange(len(theaters))
+        )
+        self._columns = {
+            "x": np.asarray(longitudes, dtype=np.float64),
+            "y": np.asarray(latitudes, dtype=np.float64),
+            "rank": ranks,
+            "accessibility.name": np.asarray(
+                [theater.accessibility.name for theater in theaters],
+                dtype=str,
+            ),
+            # a missing number of screens never matches
+            "nb_screens": np.asarray(
+                [
+                    np.nan
+                    if theater.nb_screens is None
+                    else theater.nb_screens
+                    for theater in theaters
+                ],
+                dtype=np.float64,
+            ),
+            "city_insee": np.asarray(
+                [theater.city_insee for theater in theaters], dtype=str
+            ),
+        }
+        self._theaters = list(theaters)
+
+    def __repr__(self) -> str:
+        return (
+            f"{self.__class__.__name__}(enabled={self._enabled}, "
+            f"theaters={len(self._theaters)}, fresh={self.fresh})"
+        )
+
+
+index = TheaterIndex(enabled=CACHE.THEATER_INDEX, ttl=CACHE.THEATER_INDEX_TTL)
+
+
+@on_write(Theater)
+def _invalidate_index(write: Write) -> None:
+    """Reload the theaters after a write."""
+    index.invalidate()
+
+
+@on_change(Theater)
+def _reload_index() -> None:
+    """Reload the theaters after a write of another worker."""
+    index.invalidate()
@@ -2,23 +2,38 @@
 
 from __future__ import annotations
 
-from geoalchemy2 import Geometry
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from geoalchemy2 import Geography, Geometry
 from geoalchemy2.elements import WKBElement
 from sqlalchemy import (
     BigInteger,
     Boolean,
+    Float,
     ForeignKey,
     Index,
     Integer,
     SmallInteger,
     Text,
+    cast,
+    literal_column,
 )
 from sqlalchemy.ext.asyncio import AsyncAttrs
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import (
+    Mapped,
+    mapped_column,
+    query_expression,
+    relationship,
+)
 
+from eigakan.core import revision
 from eigakan.database.core import Base
 from eigakan.database.enums import CORE_SCHEMA
-from eigakan.models import CoreMixin, RandomIdMixin
+from eigakan.models import CoreMixin, RandomIdMixin, TimeStampMixin
+
+if TYPE_CHECKING:
+    from sqlalchemy.sql.elements import ColumnElement
 
 
 class Accessibility(Base, CoreMixin):
@@ -29,7 +44,7 @@ class Accessibility(Base, CoreMixin):
     name: Mapped[str] = mapped_column(Text)
 
 
-class Theater(Base, AsyncAttrs, RandomIdMixin):
+class Theater(Base, AsyncAttrs, RandomIdMixin, TimeStampMixin):
     """Mapped class representing a theater."""
 
     osm_id: Mapped[str] = mapped_column(Text, unique=True, index=False)
@@ -53,10 +68,53 @@ class Theater(Base, AsyncAttrs, RandomIdMixin):
     siret: Mapped[int] = mapped_column(BigInteger, nullable=True)
     city_insee: Mapped[str] = mapped_column("com_insee", Text)
     city_name: Mapped[str] = mapped_column("com_nom", Text, nullable=True)
+    # bumped by every update, the ETag of the theater
+    version: Mapped[int] = mapped_column(
+        Integer,
+        server_default="1",
+        onupdate=literal_column("theater.version", Integer) + 1,
+    )
+    # never serialized, only loaded on access
     geometry: Mapped[WKBElement] = mapped_column(
-        Geometry(srid=4326, spatial_index=False), index=False
+        Geometry(srid=4326, spatial_index=True), index=False, deferred=True
     )
     accessibility: Mapped[Accessibility] = relationship(lazy="selectin")
+    # distance (meters) to a location, populated by spatial updaters.
+    distance: Mapped[float | None] = query_expression()
+
+
+class Neighbour(Base, CoreMixin):
+    """
+    Mapped class representing the k nearest neighbours of a theater.
+
+    Derived from `Theater.geometry`: built at seed and maintained on
+    theater writes, see `theater.neighbours`.
+    """
+
+    theater_id: Mapped[UUID] = mapped_column(
+        ForeignKey(f"{CORE_SCHEMA}.theater.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    neighbour_id: Mapped[UUID] = mapped_column(
+        ForeignKey(f"{CORE_SCHEMA}.theater.id", ondelete="CASCADE"),
+        index=True,
+    )
+    distance: Mapped[float] = mapped_column(Float)
+    neighbour: Mapped[Theater] = relationship(
+        foreign_keys=[neighbour_id], lazy="joined", innerjoin=True
+    )
 
 
+def as_geography(expression) -> ColumnElement:
+    """Cast a WGS84 geometry to a geography (distances in meters)."""
+    return cast(expression, Geography(srid=4326))
+
+
+revision.track(Theater)
 Index("idx_wheel_screen", Theater.accessibility_id, Theater.nb_screens)
+Index(
+    "idx_theater_geography",
+    as_geography(Theater.__table__.c.geometry),
+    postgresql_using="gist",
+)
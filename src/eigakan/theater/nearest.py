@@ -0,0 +1,129 @@
+"""
+Nearest theaters of many origins at once.
+
+The origins sharing the same filters are sent in chunks, each chunk as a
+single statement: a `VALUES` list of origins joined `LATERAL` to the KNN
+search of `ClosestUpdater`, so that each origin walks the GiST index for
+its own `k` theaters. Results are streamed back, one line per origin, as
+soon as their chunk is read.
+"""
+
+from __future__ import annotations
+
+from itertools import batched, groupby
+from typing import TYPE_CHECKING
+
+from sqlalchemy import Float, Integer, column, func, select, true, values
+from sqlalchemy.orm import aliased
+
+from eigakan.core.statement import Statement
+from eigakan.database.core import AsyncSessionFactory
+
+from . import schemas as sch
+from .dependencies import filters
+from .models import Theater
+from .updaters import ClosestUpdater
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Sequence
+
+    from sqlalchemy import Select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.core.updaters import Updater
+
+MEDIA_TYPE = "application/x-ndjson"
+# origins per statement
+CHUNK = 100
+
+
+class ReadNearest(Statement):
+    """Read the `k` nearest theaters of each origin."""
+
+    def __init__(
+        self,
+        origins: Sequence[tuple[int, float, float, int]],
+        *updaters: Updater | None,
+    ) -> None:
+        """
+        Initialize the statement.
+
+        Parameters
+        ----------
+        origins : Sequence[tuple[int, float, float, int]]
+            index, longitude, latitude and number of theaters of the origins.
+        *updaters : Updater | None
+            filters applied to the theaters of every origin.
+
+        """
+        super().__init__(Theater, *updaters)
+        self._origins = values(
+            column("origin", Integer),
+            column("longitude", Float),
+            column("latitude", Float),
+            column("k", Integer),
+            name="origins",
+        ).data(origins)
+
+    def _base_statement(self) -> Select:
+        """Return the search of a single origin, correlated to the origins."""
+        location = func.ST_SetSRID(
+            func.ST_MakePoint(
+                self._origins.c.longitude, self._origins.c.latitude
+            ),
+            4326,
+        )
+        position = ClosestUpdater(Theater, location, knn=True, geodesic=True)
+        return position.update(
+            select(Theater, position.meters.label("distance"))
+        ).limit(self._origins.c.k)
+
+    async def __call__(
+        self, session: AsyncSession
+    ) -> dict[int, list[sch.TheaterRead]]:
+        self._log_statement()
+        nearest = self.statement.subquery().lateral("nearest")
+        theater = aliased(Theater, nearest)
+        result = await session.execute(
+            select(self._origins.c.origin, theater, nearest.c.distance)
+            .select_from(self._origins)
+            .join(nearest, true())
+            .order_by(self._origins.c.origin, nearest.c.distance, nearest.c.id)
+        )
+        # a theater near several origins is a single instance, its distance
+        # is therefore set on its serialized copies
+        return {
+            origin: [
+                sch.TheaterRead.model_validate(
+                    row[1], from_attributes=True
+                ).model_copy(update={"distance": row[2]})
+                for row in rows
+            ]
+            for origin, rows in groupby(result.all(), key=lambda row: row[0])
+        }
+
+
+async def stream(origins: Sequence[sch.Origin]) -> AsyncIterator[str]:
+    """
+    Yield the nearest theaters of the origins, one JSON line per origin.
+
+    A session of its own is opened: the response is streamed once the
+    endpoint dependencies, request session included, are closed.
+    """
+    groups: dict[tuple, list[tuple[int, float, float, int]]] = {}
+    for i, origin in enumerate(origins):
+        key = (
+            origin.wheelchair_friendly,
+            origin.number_of_rooms,
+            origin.department_code,
+        )
+        groups.setdefault(key, []).append(
+            (i, origin.longitude, origin.latitude, origin.k)
+        )
+    async with AsyncSessionFactory() as session:
+        for key, group in groups.items():
+            for chunk in batched(group, CHUNK):
+                found = await ReadNearest(chunk, *filters(*key))(session)
+                for i, *_ in chunk:
+                    line = sch.Nearest(origin=i, content=found.get(i, []))
+                    yield line.model_dump_json() + "\n"
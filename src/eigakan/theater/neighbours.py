@@ -0,0 +1,230 @@
+"""
+Precomputed nearest neighbours of each theater.
+
+The `K` nearest theaters of every theater are stored in `Neighbour`, so
+that "theaters near this one" is a primary key lookup. The table is built
+in bulk at seed, then maintained within the transaction writing theaters,
+once per flush or per statement whatever the number of theaters written:
+only the theaters whose neighbours may have changed are recomputed, that is
++ the theaters written,
++ the theaters they were a neighbour of,
++ the theaters nearer to a new location than their `K`-th neighbour,
++ the theaters with less than `K` neighbours.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    ARRAY,
+    and_,
+    any_,
+    bindparam,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    or_,
+    select,
+    true,
+    union,
+)
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session, aliased
+
+from .models import Neighbour, Theater, as_geography
+from .updaters import ClosestUpdater
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+    from uuid import UUID
+
+    from sqlalchemy import Connection, Result, Select
+    from sqlalchemy.orm import ORMExecuteState
+
+# neighbours stored per theater
+K = 10
+
+
+def nearest(ids: Collection[UUID] | None = None) -> Select:
+    """
+    Return the `K` nearest neighbours of theaters, as `Neighbour` rows.
+
+    Parameters
+    ----------
+    ids : Collection[UUID] | None, optional
+        theaters whose neighbours are returned, all of them by default.
+
+    """
+    origin = aliased(Theater, name="origin")
+    position = ClosestUpdater(
+        Theater, origin.geometry, knn=True, geodesic=True
+    )
+    candidates = (
+        select(
+            Theater.id,
+            position.distance.label("knn"),
+            position.meters.label("distance"),
+        )
+        .where(Theater.id != origin.id)
+        .order_by(position.distance, Theater.id)
+        .limit(K)
+        .lateral("candidates")
+    )
+    statement = select(
+        origin.id,
+        func.row_number().over(
+            partition_by=origin.id,
+            order_by=(candidates.c.knn, candidates.c.id),
+        ),
+        candidates.c.id,
+        candidates.c.distance,
+    ).join(candidates, true())
+    if ids is not None:
+        statement = statement.where(origin.id == _any(ids))
+    return statement
+
+
+def build(connection: Connection) -> None:
+    """(Re)build the neighbours of every theater."""
+    connection.execute(delete(Neighbour))
+    connection.execute(_insert(nearest()))
+
+
+def refresh(
+    connection: Connection,
+    *,
+    moved: Collection[UUID] = (),
+    deleted: Collection[UUID] = (),
+) -> None:
+    """
+    Recompute the neighbours altered by writes of theaters, at once.
+
+    The theaters to recompute are selected by a single statement whatever
+    the number of theaters written, then their neighbours are deleted and
+    inserted by one statement each.
+
+    Parameters
+    ----------
+    connection : Connection
+        connection of the transaction writing the theaters.
+    moved : Collection[UUID], optional
+        the theaters created or moved.
+    deleted : Collection[UUID], optional
+        the theaters deleted.
+
+    """
+    if not moved and not deleted:
+        return
+    written = _any([*moved, *deleted])
+    stale = (
+        select(Theater.id)
+        .outerjoin(Neighbour, Neighbour.theater_id == Theater.id)
+        .group_by(Theater.id)
+        .having(
+            or_(
+                func.count(Neighbour.rank) < K,
+                func.bool_or(Neighbour.neighbour_id == written),
+            )
+        )
+    )
+    if moved:
+        # theaters nearer to a new location than their `K`-th neighbour
+        origin = aliased(Theater, name="origin")
+        radius = (
+            select(
+                Neighbour.theater_id,
+                func.max(Neighbour.distance).label("radius"),
+            )
+            .group_by(Neighbour.theater_id)
+            .subquery("radius")
+        )
+        stale = union(
+            stale,
+            select(Theater.id)
+            .join(radius, radius.c.theater_id == Theater.id)
+            .join(
+                origin,
+                and_(
+                    origin.id == _any(moved),
+                    origin.id != Theater.id,
+                    func.ST_DWithin(
+                        as_geography(Theater.geometry),
+                        as_geography(origin.geometry),
+                        radius.c.radius,
+                    ),
+                ),
+            ),
+        )
+    ids = {*connection.execute(stale).scalars(), *moved}
+    if ids:
+        connection.execute(
+            delete(Neighbour).where(Neighbour.theater_id == _any(ids))
+        )
+        connection.execute(_insert(nearest(ids)))
+
+
+def _any(ids: Collection[UUID]):
+    """Return `ANY` of the ids, bound as a single array parameter."""
+    return any_(bindparam(None, list(ids), type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+def _insert(statement: Select):
+    """Return the insertion of the neighbours selected."""
+    return insert(Neighbour).from_select(
+        ("theater_id", "rank", "neighbour_id", "distance"), statement
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _theaters_flushed(session: Session, flush_context) -> None:
+    """Maintain the neighbours of the theaters flushed, at once."""
+    moved = [
+        theater.id
+        for theater in (*session.new, *session.dirty)
+        if isinstance(theater, Theater)
+        and (
+            theater in session.new
+            or inspect(theater).attrs.geometry.history.has_changes()
+        )
+    ]
+    # their rows are dropped by the foreign keys cascades
+    deleted = [
+        theater.id
+        for theater in session.deleted
+        if isinstance(theater, Theater)
+    ]
+    if moved or deleted:
+        refresh(session.connection(), moved=moved, deleted=deleted)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _theaters_written(state: ORMExecuteState) -> Result | None:
+    """
+    Maintain the neighbours of the theaters written by a statement.
+
+    Mapper events are not emitted for `INSERT`, `UPDATE` and `DELETE`
+    statements: the theaters written are the ids they return, refreshed at
+    once. A statement returning none of them is left alone, as are the
+    lines an upsert leaves unchanged, never returned.
+    """
+    statement = state.statement
+    if (
+        not (state.is_insert or state.is_update or state.is_delete)
+        or state.bind_mapper is not inspect(Theater)
+        or not statement.exported_columns.contains_column(
+            Theater.__table__.c.id
+        )
+        # the neighbours only depend on the locations
+        or (state.is_update and "geometry" not in statement.compile().params)
+    ):
+        return None
+    result = state.invoke_statement().freeze()
+    ids = [row.id for row in result()]
+    if state.is_delete:
+        refresh(state.session.connection(), deleted=ids)
+    else:
+        refresh(state.session.connection(), moved=ids)
+    return result()
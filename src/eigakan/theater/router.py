@@ -1,57 +1,387 @@
+from hashlib import blake2b
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Any, NoReturn
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from starlette.background import BackgroundTask
 
 from eigakan.auth.dependencies import CurrentUser
+from eigakan.auth.models import Owner
+from eigakan.core import conditional, revision
 from eigakan.core.cud import CUD
-from eigakan.core.statement import ReadAll, ReadAllLines, ReadOneBy
-from eigakan.database.core import Session
-from eigakan.dependencies import Pagination, ResourceInjecter
+from eigakan.core.exc import DuplicatedResource
+from eigakan.core.loader import Loader
+from eigakan.core.statement import ReadAll, ReadManyBy, ReadOneBy, ReadPage
+from eigakan.core.updaters import Keyset, Projection
+from eigakan.core.updaters.commons import ScalarUpdater
+from eigakan.core.updaters.sort import Sorter
+from eigakan.database.core import AsyncSessionFactory, Session
+from eigakan.dependencies import (
+    Conditions,
+    Count,
+    Pagination,
+    ResourceInjecter,
+)
+from eigakan.env import APP, RATE_LIMIT
 from eigakan.logger import logger
+from eigakan.slow import limiter
 
 from . import dependencies as dps
+from . import export, nearest, rows, tiles
 from . import schemas as sch
-from .models import Theater
+from .clusters import ReadClusters
+from .memory import index
+from .models import Neighbour, Theater
 
 router = APIRouter()
+# theaters created at once
+MAX_BATCH = 500
+# theaters synchronized at once
+MAX_SYNC = 5000
 Resource = Annotated[ReadOneBy[Theater], Depends(ResourceInjecter(Theater))]
 cud = CUD(Theater)
+loader = Loader(
+    Theater,
+    AsyncSessionFactory,
+    window=APP.COALESCE_WINDOW,
+    size=APP.COALESCE_SIZE,
+    columns=rows.VERSIONED,
+)
 
 
-@router.get("/{id}", response_model=sch.TheaterRead, status_code=HTTPStatus.OK)
-async def get_one_by(resource: Resource, session: Session) -> Theater:
-    return await resource(session)
+@router.get(
+    "/tiles/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={HTTPStatus.OK: {"content": {tiles.MEDIA_TYPE: {}}}},
+)
+async def read_tile(
+    tile: dps.Tile,
+    accessibility: dps.Accessibility,
+    screens_number: dps.ScreensNumber,
+    department: dps.DepartmentCode,
+    session: Session,
+) -> Response:
+    """Read the theaters of a tile as a Mapbox vector tile."""
+    # drops the tiles cached if another worker wrote theaters since
+    await revision.read(session, Theater)
+    content = await tiles.render(
+        session, tile, accessibility, screens_number, department
+    )
+    return Response(content, media_type=tiles.MEDIA_TYPE)
+
+
+@router.get(
+    "/clusters", response_model=sch.Clusters, status_code=HTTPStatus.OK
+)
+async def read_clusters(
+    bbox: dps.BoundingBox,
+    zoom: dps.Zoom,
+    accessibility: dps.Accessibility,
+    screens_number: dps.ScreensNumber,
+    department: dps.DepartmentCode,
+    session: Session,
+):
+    """Read the theaters of a viewport clustered for a zoom level."""
+    content = await ReadClusters(
+        zoom, accessibility, screens_number, department, bbox
+    )(session)
+    return {"content": content}
+
+
+@router.post(
+    "/nearest:batch",
+    response_class=StreamingResponse,
+    responses={
+        HTTPStatus.OK: {
+            "content": {nearest.MEDIA_TYPE: {}},
+            "description": (
+                "one `Nearest` JSON line per origin, in no particular order."
+            ),
+        }
+    },
+)
+async def read_nearest_batch(body: sch.NearestBatch) -> StreamingResponse:
+    """Read the nearest theaters of many origins."""
+    return StreamingResponse(
+        nearest.stream(body.origins), media_type=nearest.MEDIA_TYPE
+    )
 
 
-@router.get("", response_model=sch.Theaters, status_code=HTTPStatus.OK)
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        HTTPStatus.OK: {
+            "content": {format.media_type: {} for format in export.Format},
+            "description": "the theaters matching the filters, by id.",
+        },
+        HTTPStatus.NOT_MODIFIED: {"description": "export unchanged."},
+    },
+)
+async def export_resource(
+    accessibility: dps.Accessibility,
+    screens_number: dps.ScreensNumber,
+    department: dps.DepartmentCode,
+    conditions: Conditions,
+    format: Annotated[export.Format, Query()] = export.Format.NDJSON,
+) -> Response:
+    """Export the theaters, streamed in the format requested."""
+    statement = export.ReadExport(accessibility, screens_number, department)
+    # the request session is closed before the response is streamed
+    session = AsyncSessionFactory()
+    try:
+        # revision and lines read from the same snapshot
+        await session.connection(
+            execution_options={"isolation_level": "REPEATABLE READ"}
+        )
+        etag, last_modified = await statement.validators(session, format)
+    except BaseException:
+        await session.close()
+        raise
+    if conditions.fresh(etag, last_modified):
+        await session.close()
+        return conditional.not_modified(etag, last_modified)
+    return StreamingResponse(
+        export.stream(session, statement, format),
+        media_type=format.media_type,
+        headers=conditional.headers(etag, last_modified),
+        # closes the session of a response never streamed
+        background=BackgroundTask(session.close),
+    )
+
+
+@router.get(
+    "/{id}",
+    response_model=sch.TheaterRead,
+    status_code=HTTPStatus.OK,
+    responses={HTTPStatus.NOT_MODIFIED: {"description": "theater unchanged."}},
+)
+async def get_one_by(
+    id: UUID, session: Session, conditions: Conditions
+) -> Response:
+    """
+    Read a theater.
+
+    A conditional request reads the version of the theater first: an
+    unchanged one is answered `304 Not Modified` without being read.
+    """
+    if conditions.sent:
+        validators = (
+            await session.execute(
+                select(Theater.version, Theater.updated_at).where(
+                    Theater.id == id
+                )
+            )
+        ).one_or_none()
+        if validators is not None:
+            etag = _etag(validators.version)
+            if conditions.fresh(etag, validators.updated_at):
+                return conditional.not_modified(etag, validators.updated_at)
+    # concurrent reads are coalesced, the request session is left unused
+    row = (
+        await loader.load(id)
+        if loader.enabled
+        else await ReadOneBy("id", id, Theater, columns=rows.VERSIONED)(
+            session
+        )
+    )
+    response = rows.one(row)
+    response.headers.update(
+        conditional.headers(_etag(row["version"]), row["updated_at"])
+    )
+    return response
+
+
+def _etag(version: int) -> str:
+    """Return the ETag of a theater, from its version."""
+    return f'"{version}"'
+
+
+@router.get(
+    "/{id}/nearby", response_model=sch.Nearby, status_code=HTTPStatus.OK
+)
+async def read_nearby(id: UUID, resource: Resource, session: Session):
+    """Read the nearest theaters of a theater, precomputed."""
+    content = await ReadAll(
+        Neighbour,
+        ScalarUpdater(Neighbour, "theater_id", id),
+        Sorter(asc=("rank",))(Neighbour),
+    )(session)
+    if not content:
+        # unknown theater, or the only one
+        await resource(session)
+    return {"content": content}
+
+
+@router.get(
+    "",
+    response_model=sch.Theaters | sch.TheatersByIds,
+    status_code=HTTPStatus.OK,
+    responses={HTTPStatus.NOT_MODIFIED: {"description": "list unchanged."}},
+)
+@limiter.limit(RATE_LIMIT.THEATERS)
 async def read_resource(
+    request: Request,
+    response: Response,
+    ids: dps.Ids,
     position: dps.Position,
+    radius: dps.Radius,
     accessibility: dps.Accessibility,
     screens_number: dps.ScreensNumber,
     department: dps.DepartmentCode,
     pagination: Pagination,
+    count: Count,
+    fields: dps.Fields,
     session: Session,
+    conditions: Conditions,
 ):
-    """Read all nearest theaters."""
-    stmt = ReadAll(
-        Theater,
+    """
+    Read all nearest theaters, or the theaters of the ids requested.
+
+    The list is validated by the revision of the theaters, read first: an
+    unchanged one is answered `304 Not Modified` without being read.
+    """
+    if ids is None and position is None:
+        raise HTTPException(
+            HTTPStatus.UNPROCESSABLE_ENTITY,
+            "longitude and latitude are required without ids.",
+        )
+    stamp = await revision.read(session, Theater)
+    # a list per query, each one changed by any write of the theaters
+    etag = '"{}"'.format(
+        blake2b(
+            f"{stamp.value}?{request.url.query}".encode(), digest_size=16
+        ).hexdigest()
+    )
+    if conditions.fresh(etag, stamp.modified_at):
+        return conditional.not_modified(etag, stamp.modified_at)
+    theaters = await _read_theaters(
+        ids,
+        position,
+        radius,
         accessibility,
         screens_number,
         department,
+        pagination,
+        count,
+        fields,
+        session,
+    )
+    validators = conditional.headers(etag, stamp.modified_at)
+    if isinstance(theaters, Response):
+        theaters.headers.update(validators)
+    else:
+        response.headers.update(validators)
+    return theaters
+
+
+async def _read_theaters(
+    ids: dps.Ids,
+    position: dps.Position,
+    radius: dps.Radius,
+    accessibility: dps.Accessibility,
+    screens_number: dps.ScreensNumber,
+    department: dps.DepartmentCode,
+    pagination: Pagination,
+    count: Count,
+    fields: dps.Fields,
+    session: Session,
+) -> dict | Response:
+    """Read the theaters listed, serialized unless projected."""
+    if ids is not None:
+        if fields is not None:
+            content, missing = await ReadManyBy("id", ids, Theater, fields)(
+                session
+            )
+            return _project(
+                sch.TheatersByIds,
+                {"content": content, "missing": missing},
+                fields,
+            )
+        return rows.by_ids(
+            *await ReadManyBy("id", ids, Theater, columns=rows.COLUMNS)(
+                session
+            )
+        )
+    if isinstance(pagination, Keyset):
+        content = await ReadAll(
+            Theater,
+            accessibility,
+            screens_number,
+            department,
+            radius,
+            position,
+            pagination(position.distance, Theater.id),
+            fields,
+        )(session)
+        return _project(
+            sch.Theaters,
+            {"content": content, "pagination": {"next": pagination.next}},
+            fields,
+        )
+    updaters = (
+        accessibility,
+        screens_number,
+        department,
+        radius,
         position,
         pagination,
+        fields,
     )
-    liner = ReadAllLines(Theater, accessibility, screens_number, department)
-    return {
-        "content": await stmt(session),
-        "pagination": {
-            "current": pagination.page,
-            "total": pagination.get_total_number_of_pages(
-                await liner(session)
-            ),
+    if index.supports(*updaters):
+        page = await index.read_page(session, *updaters, count=count)
+    elif fields is None:
+        page = await ReadPage(
+            Theater, *updaters, count=count, columns=rows.COLUMNS
+        )(session)
+        return rows.page(
+            page.content,
+            {
+                "current": pagination.page,
+                "total": pagination.get_total_number_of_pages(page.total),
+            },
+        )
+    else:
+        page = await ReadPage(Theater, *updaters, count=count)(session)
+    return _project(
+        sch.Theaters,
+        {
+            "content": page.content,
+            "pagination": {
+                "current": pagination.page,
+                "total": pagination.get_total_number_of_pages(page.total),
+            },
         },
-    }
+        fields,
+    )
+
+
+def _project(
+    schema: type[sch.Theaters | sch.TheatersByIds],
+    payload: dict,
+    fields: Projection | None,
+) -> dict | Response:
+    """Serialize a theaters list trimmed to the fields requested, if any."""
+    if fields is None:
+        return payload
+    projected = sch.projected(schema, fields.fields)
+    return Response(
+        projected.model_validate(
+            payload, from_attributes=True
+        ).model_dump_json(),
+        media_type="application/json",
+    )
 
 
 @router.post("", response_model=None, status_code=HTTPStatus.CREATED)
@@ -67,32 +397,112 @@ async def create_resource(
     response.headers["Location"] = str(_.id)
 
 
+@router.post(
+    ":batch", response_model=sch.TheatersCreated, status_code=HTTPStatus.OK
+)
+async def create_resources(
+    body: Annotated[
+        list[sch.TheaterCreate], Body(min_length=1, max_length=MAX_BATCH)
+    ],
+    session: Session,
+    user: CurrentUser,
+):
+    """Create many theaters at once, reporting the ones not created."""
+    created, errors = await cud.create_many(_owned(body, user), session)
+    return {
+        "content": [theater.id for theater in created],
+        "errors": [
+            {
+                "index": index,
+                "status": HTTPStatus.CONFLICT
+                if isinstance(error, DuplicatedResource)
+                else HTTPStatus.NOT_FOUND,
+                "detail": error.args[0],
+            }
+            for index, error in errors.items()
+        ],
+    }
+
+
+@router.put(
+    ":sync", response_model=sch.TheatersSynced, status_code=HTTPStatus.OK
+)
+async def sync_resources(
+    body: Annotated[
+        list[sch.TheaterCreate], Body(min_length=1, max_length=MAX_SYNC)
+    ],
+    session: Session,
+    user: CurrentUser,
+):
+    """
+    Create the new theaters and update the changed ones, by OSM id.
+
+    Theaters owned by another owner are left unchanged.
+    """
+    return (
+        await cud.upsert_many(
+            _owned(body, user),
+            session,
+            key="osm_id",
+            where={"siret": user.siret},
+        )
+    )._asdict()
+
+
+def _owned(
+    body: list[sch.TheaterCreate], owner: Owner
+) -> list[dict[str, Any]]:
+    """Return the theaters to write, owned by the owner."""
+    return [
+        {
+            **theater.model_dump(exclude={"latitude", "longitude"}),
+            "siret": owner.siret,
+        }
+        for theater in body
+    ]
+
+
 @router.patch("/{id}", response_model=None, status_code=HTTPStatus.NO_CONTENT)
 async def update_resource(
+    id: UUID,
     body: sch.TheaterUpdate,
-    resource: Resource,
     session: Session,
     owner: CurrentUser,
 ):
-    persistent_resource = await resource(session)
-    if persistent_resource not in await owner.awaitable_attrs.theaters:
-        logger.exception("User tried to update a resource he does not own.")
-        raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
-    await cud.update(
-        body.model_dump(exclude_unset=True, exclude_none=True),
-        persistent_resource,
+    if not await cud.update_where(
+        body.model_dump(
+            exclude={"latitude", "longitude"},
+            exclude_unset=True,
+            exclude_none=True,
+        ),
+        {"id": id, "siret": owner.siret},
         session,
-    )
+    ):
+        await _not_owned(id, session)
 
 
 @router.delete("/{id}", response_model=None, status_code=HTTPStatus.NO_CONTENT)
 async def delete_resource_by_id(
-    resource: Resource,
+    id: UUID,
     session: Session,
     owner: CurrentUser,
 ) -> None:
-    persistent_resource = await resource(session)
-    if persistent_resource not in await owner.awaitable_attrs.theaters:
-        logger.exception("User tried to update a resource he does not own.")
-        raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
-    await cud.delete(persistent_resource, session)
+    if not await cud.delete_where({"id": id, "siret": owner.siret}, session):
+        await _not_owned(id, session)
+
+
+async def _not_owned(id: UUID, session: Session) -> NoReturn:
+    """
+    Raise the error of a theater written by an owner but not found.
+
+    Raises
+    ------
+    ResourceNotFound
+        if the theater does not exist.
+    HTTPException
+        403, if the theater is owned by another owner.
+
+    """
+    await ReadOneBy("id", id, Theater, columns=(Theater.id,))(session)
+    logger.warning("User tried to write a resource they do not own.")
+    raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
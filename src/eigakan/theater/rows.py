@@ -0,0 +1,128 @@
+"""
+Theaters read as plain rows, serialized without the ORM.
+
+`COLUMNS` selects the fields of `TheaterRead`, the accessibility being
+built as a JSON object by the same statement. The rows are then dumped by
+type adapters built once: no instance is hydrated nor validated on the
+way, the JSON matches the one of the `response_model` though.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import func, null, select
+
+from eigakan.core.registry import describe
+
+from . import schemas as sch
+from .models import Accessibility, Theater
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+
+def _columns() -> tuple:
+    """Return the columns of the fields of `TheaterRead`."""
+    columns = describe(Theater).columns
+    accessibility = (
+        select(
+            func.json_build_object(
+                "id",
+                Accessibility.id,
+                "strength",
+                Accessibility.strength,
+                "name",
+                Accessibility.name,
+            )
+        )
+        .where(Accessibility.id == Theater.accessibility_id)
+        .correlate(Theater)
+        .scalar_subquery()
+    )
+    return (
+        # keys the rows read by ids, not serialized
+        columns["id"].label("id"),
+        *(
+            columns[name].label(name)
+            for name in sch.TheaterRead.model_fields
+            if name in columns
+        ),
+        accessibility.label("accessibility"),
+        # populated by the spatial updaters, if any
+        null().label("distance"),
+    )
+
+
+COLUMNS = _columns()
+# along with the validators of the theaters, not serialized
+VERSIONED = (
+    *COLUMNS,
+    Theater.version.label("version"),
+    Theater.updated_at.label("updated_at"),
+)
+
+
+def _row(schema: type[BaseModel]) -> type:
+    """Return the `TypedDict` counterpart of a schema, nested ones included."""
+    return TypedDict(
+        f"{schema.__name__}Row",
+        {
+            name: _row(field.annotation)
+            if isinstance(field.annotation, type)
+            and issubclass(field.annotation, BaseModel)
+            else field.annotation
+            for name, field in schema.model_fields.items()
+        },
+    )
+
+
+TheaterRow = _row(sch.TheaterRead)
+
+_theater = TypeAdapter(TheaterRow)
+_theaters = TypeAdapter(
+    TypedDict(
+        "TheaterRows",
+        {"content": list[TheaterRow], "pagination": dict[str, Any]},
+    )
+)
+_theaters_by_ids = TypeAdapter(
+    TypedDict(
+        "TheaterRowsByIds",
+        {"content": list[TheaterRow], "missing": list[Any]},
+    )
+)
+
+
+def dump(row: Mapping[str, Any]) -> bytes:
+    """Return the JSON of a theater."""
+    return _theater.dump_json(row)
+
+
+def one(row: Mapping[str, Any]) -> Response:
+    """Return the JSON response of a theater."""
+    return _response(dump(row))
+
+
+def page(
+    content: Sequence[Mapping[str, Any]], pagination: Mapping[str, Any]
+) -> Response:
+    """Return the JSON response of a page of theaters."""
+    return _response(
+        _theaters.dump_json({"content": content, "pagination": pagination})
+    )
+
+
+def by_ids(
+    content: Sequence[Mapping[str, Any]], missing: Sequence[Any]
+) -> Response:
+    """Return the JSON response of theaters read by ids."""
+    return _response(
+        _theaters_by_ids.dump_json({"content": content, "missing": missing})
+    )
+
+
+def _response(content: bytes) -> Response:
+    return Response(content, media_type="application/json")
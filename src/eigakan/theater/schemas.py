@@ -1,9 +1,18 @@
 from enum import StrEnum, auto
+from functools import lru_cache
+from typing import Annotated, Literal
+from uuid import UUID
 
 from geoalchemy2.elements import WKTElement
-from pydantic import BaseModel, ConfigDict, Field, computed_field
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    computed_field,
+    create_model,
+)
 
-from eigakan.schemas import _Paginated
+from eigakan.schemas import ItemError, _Paginated
 
 
 class Wheelchair(StrEnum):
@@ -41,6 +50,9 @@ class TheaterRead(BaseModel):
     city_insee: str
     city_name: str | None
     accessibility: Accessibility
+    distance: float | None = Field(
+        None, description="distance (meters) to the requested position."
+    )
 
 
 class TheaterCreate(BaseModel):
@@ -102,5 +114,180 @@ class TheaterUpdate(TheaterCreate):
     longitude: int | None = Field(None, ge=0, le=90)
 
 
+class TheatersCreated(BaseModel):
+    """Serialization Schema."""
+
+    content: list[UUID] = Field(
+        ..., description="ids of the theaters created, in order."
+    )
+    errors: list[ItemError] = Field(
+        ..., description="theaters not created, the others are."
+    )
+
+
+class TheatersSynced(BaseModel):
+    """Serialization Schema."""
+
+    inserted: int
+    updated: int
+    unchanged: int = Field(
+        ..., description="theaters identical, or owned by another owner."
+    )
+
+
+class CreateOperation(BaseModel):
+    """Creation of a theater, in a batch."""
+
+    op: Literal["create"]
+    body: TheaterCreate
+
+
+class UpdateOperation(BaseModel):
+    """Update of a theater, in a batch."""
+
+    op: Literal["update"]
+    id: UUID
+    body: TheaterUpdate
+
+
+class DeleteOperation(BaseModel):
+    """Deletion of a theater, in a batch."""
+
+    op: Literal["delete"]
+    id: UUID
+
+
+type Operation = Annotated[
+    CreateOperation | UpdateOperation | DeleteOperation,
+    Field(discriminator="op"),
+]
+
+
+class Batch(BaseModel):
+    """Serialization Schema."""
+
+    operations: list[Operation] = Field(
+        ..., min_length=1, max_length=100, description="applied in order."
+    )
+    atomic: bool = Field(
+        False,
+        description=(
+            "whether a failing operation cancels all of them, rather than "
+            "only itself."
+        ),
+    )
+
+
+class OperationResult(BaseModel):
+    """Serialization Schema."""
+
+    status: int = Field(..., examples=[204], description="HTTP status.")
+    id: UUID | None = Field(None, description="id of the theater created.")
+    detail: str | None = None
+
+
+class BatchResult(BaseModel):
+    """Serialization Schema."""
+
+    content: list[OperationResult] = Field(
+        ..., description="results, in the order of the operations."
+    )
+
+
 class Theaters(_Paginated):
     content: list[TheaterRead]
+
+
+class TheatersByIds(BaseModel):
+    """Serialization Schema."""
+
+    content: list[TheaterRead] = Field(
+        ..., description="theaters found, in the order of the ids."
+    )
+    missing: list[UUID] = Field(..., description="ids of no theater.")
+
+
+# projections kept, clients choosing the fields
+PROJECTIONS = 256
+
+
+@lru_cache(maxsize=PROJECTIONS)
+def projected(
+    schema: type[Theaters | TheatersByIds], fields: tuple[str, ...]
+) -> type[Theaters | TheatersByIds]:
+    """
+    Return a theaters list schema whose theaters only hold `fields`.
+
+    The fields are expected in the order of the `Projection` holding them,
+    so that a set of fields is built once whatever the order requested.
+    """
+    theater = create_model(
+        "TheaterProjected",
+        **{
+            name: (field.annotation, field)
+            for name, field in TheaterRead.model_fields.items()
+            if name in fields
+        },
+    )
+    return create_model(
+        f"{schema.__name__}Projected",
+        __base__=schema,
+        content=(list[theater], ...),
+    )
+
+
+class Cluster(BaseModel):
+    """Serialization Schema."""
+
+    count: int = Field(..., description="number of theaters clustered.")
+    longitude: float = Field(..., description="centroid longitude *WGS84*")
+    latitude: float = Field(..., description="centroid latitude *WGS84*")
+    accessibility: dict[str, int] = Field(
+        ...,
+        description="number of theaters per wheelchair accessibility.",
+        examples=[{"yes": 12, "limited": 3}],
+    )
+
+
+class Clusters(BaseModel):
+    content: list[Cluster]
+
+
+class Origin(BaseModel):
+    """Deserialization Schema."""
+
+    longitude: float = Field(..., description="*WGS84*", ge=0, le=90)
+    latitude: float = Field(..., description="*WGS84*", ge=0, le=90)
+    k: int = Field(10, description="number of theaters.", ge=1, le=50)
+    wheelchair_friendly: Wheelchair | None = Field(
+        None, alias="wheelchairFriendly"
+    )
+    number_of_rooms: int | None = Field(None, alias="numberOfRooms", gt=0)
+    department_code: str | None = Field(
+        None, alias="departmentCode", min_length=2, max_length=2
+    )
+
+
+class NearestBatch(BaseModel):
+    """Deserialization Schema."""
+
+    origins: list[Origin] = Field(..., min_length=1, max_length=1000)
+
+
+class Nearest(BaseModel):
+    """Serialization Schema, one line of the batch response."""
+
+    origin: int = Field(..., description="index of the origin requested.")
+    content: list[TheaterRead]
+
+
+class NeighbourRead(BaseModel):
+    """Serialization Schema."""
+
+    rank: int = Field(..., description="1 for the nearest theater.")
+    distance: float = Field(..., description="distance (meters).")
+    neighbour: TheaterRead
+
+
+class Nearby(BaseModel):
+    content: list[NeighbourRead]
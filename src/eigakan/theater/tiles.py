@@ -0,0 +1,194 @@
+"""
+Mapbox vector tiles of the theaters.
+
+Tiles are rendered by PostGIS (`ST_AsMVTGeom`, `ST_AsMVT`) and cached by
+tile and filters. Along with its content, each cached tile keeps the ids of
+the theaters located within it, whether its filters match them or not: a
+write, which may make a theater match a filter, invalidates every tile
+covering the stored location of the theater written, whatever its filters,
+along with the tiles covering its new location.
+
+The writes of the other workers are only known through the revision of the
+theaters, read before a tile is served: every tile is then dropped.
+"""
+
+from __future__ import annotations
+
+from math import asinh, atan, degrees, pi, radians, sinh, tan
+from typing import TYPE_CHECKING, NamedTuple
+
+from geoalchemy2.elements import WKTElement
+from sqlalchemy import func, select
+
+from eigakan.core.cache import TTLCache
+from eigakan.core.events import on_write
+from eigakan.core.revision import on_change
+from eigakan.core.statement import Statement
+from eigakan.env import CACHE
+
+from .models import Accessibility, Theater
+from .updaters import BoundingBoxUpdater, point_coordinates
+
+if TYPE_CHECKING:
+    from uuid import UUID
+
+    from sqlalchemy import Select
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from eigakan.core.events import Write
+    from eigakan.core.updaters import Updater
+
+MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+LAYER = "theaters"
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 22
+# tile ratio rendered around a tile, so that markers are not cut at edges
+MARGIN = BUFFER / EXTENT
+
+
+class Tile(NamedTuple):
+    """Web mercator (XYZ) tile."""
+
+    z: int
+    x: int
+    y: int
+
+    @property
+    def exists(self) -> bool:
+        """Whether the tile is part of the zoom level grid."""
+        return 0 <= self.z <= MAX_ZOOM and all(
+            0 <= coordinate < 2**self.z for coordinate in (self.x, self.y)
+        )
+
+    def bounds(self, margin: float = 0.0) -> tuple[float, float, float, float]:
+        """
+        Return the WGS84 west, south, east and north bounds of the tile.
+
+        Parameters
+        ----------
+        margin : float, optional
+            ratio of the tile size the bounds are widened by.
+
+        """
+        n = 2**self.z
+        west = (self.x - margin) / n * 360.0 - 180.0
+        east = (self.x + 1 + margin) / n * 360.0 - 180.0
+        north = _latitude(self.y - margin, n)
+        south = _latitude(self.y + 1 + margin, n)
+        return west, south, east, north
+
+    def covers(
+        self, longitude: float, latitude: float, margin: float = 0.0
+    ) -> bool:
+        """Whether a location lies within the (widened) tile."""
+        n = 2**self.z
+        x = (longitude + 180.0) / 360.0 * n
+        y = (1 - asinh(tan(radians(latitude))) / pi) / 2 * n
+        return (
+            self.x - margin <= x <= self.x + 1 + margin
+            and self.y - margin <= y <= self.y + 1 + margin
+        )
+
+
+def _latitude(y: float, n: int) -> float:
+    """Return the latitude of a tile row, clamped to the mercator bounds."""
+    return degrees(atan(sinh(pi * (1 - 2 * min(max(y, 0), n) / n))))
+
+
+class Rendered(NamedTuple):
+    """Vector tile along with the ids of the theaters located within it."""
+
+    content: bytes
+    ids: frozenset[UUID]
+
+
+class ReadTile(Statement):
+    """Render the theaters of a tile as a Mapbox vector tile."""
+
+    def __init__(self, tile: Tile, *updaters: Updater | None) -> None:
+        super().__init__(Theater, *updaters)
+        self._tile = tile
+
+    def _base_statement(self) -> Select:
+        """Return the features of the tile, one per theater."""
+        wheelchair = (
+            select(Accessibility.name)
+            .where(Accessibility.id == Theater.accessibility_id)
+            .correlate(Theater)
+            .scalar_subquery()
+        )
+        statement = select(
+            func.ST_AsMVTGeom(
+                func.ST_Transform(Theater.geometry, 3857),
+                func.ST_TileEnvelope(*self._tile),
+                EXTENT,
+                BUFFER,
+            ).label("geom"),
+            Theater.id,
+            Theater.name,
+            Theater.nb_screens,
+            wheelchair.label("wheelchair"),
+        )
+        return BoundingBoxUpdater(Theater, *self._tile.bounds(MARGIN)).update(
+            statement
+        )
+
+    async def __call__(self, session: AsyncSession) -> Rendered:
+        self._log_statement()
+        features = self.statement.subquery("features")
+        # filtered or not: a write may make them match the filters
+        located = BoundingBoxUpdater(
+            Theater, *self._tile.bounds(MARGIN)
+        ).update(select(func.array_agg(Theater.id)))
+        result = await session.execute(
+            select(
+                func.ST_AsMVT(features.table_valued(), LAYER, EXTENT, "geom"),
+                located.scalar_subquery(),
+            )
+        )
+        content, ids = result.one()
+        return Rendered(bytes(content or b""), frozenset(ids or ()))
+
+
+tiles: TTLCache[tuple, Rendered] = TTLCache(
+    maxsize=CACHE.TILE_SIZE, ttl=CACHE.TILE_TTL
+)
+
+
+async def render(
+    session: AsyncSession, tile: Tile, *updaters: Updater | None
+) -> bytes:
+    """Return the vector tile of the filtered theaters, cached."""
+    key = (tile, *map(repr, updaters))
+    if (rendered := tiles.get(key)) is None:
+        rendered = await ReadTile(tile, *updaters)(session)
+        tiles.set(key, rendered)
+    return rendered.content
+
+
+@on_write(Theater)
+def _invalidate_tiles(write: Write) -> None:
+    """Drop the tiles covering the theater written or its new location."""
+    (id_,) = write.identity
+    location = (write.values or {}).get("geometry")
+    coordinates = None
+    if location is not None:
+        if not isinstance(location, WKTElement) or not (
+            coordinates := point_coordinates(location)
+        ):
+            tiles.invalidate()
+            return
+
+    def _stale(key: tuple, rendered: Rendered) -> bool:
+        return id_ in rendered.ids or (
+            coordinates is not None and key[0].covers(*coordinates, MARGIN)
+        )
+
+    tiles.invalidate(_stale)
+
+
+@on_change(Theater)
+def _drop_tiles() -> None:
+    """Drop every tile after a write of another worker."""
+    tiles.invalidate()
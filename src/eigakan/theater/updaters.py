@@ -1,28 +1,346 @@
 from __future__ import annotations
 
+import re
+from math import cos, radians
 from typing import TYPE_CHECKING, Type
 
-from sqlalchemy import func
+from geoalchemy2.elements import WKTElement
+from sqlalchemy import Float, Text, bindparam, func
+from sqlalchemy.orm import with_expression
 
 from eigakan.core.updaters import Updater
 
-from .models import Theater
+from .models import Theater, as_geography
 
 type T = Theater
 
+_BOUNDS = ("west", "south", "east", "north")
+_POINT = re.compile(r"POINT\s*\(\s*(?P<x>\S+)\s+(?P<y>\S+)\s*\)", re.I)
+
 if TYPE_CHECKING:
+    from collections.abc import Hashable, Mapping
+    from typing import Any
+
+    from sqlalchemy.sql.elements import ColumnElement
     from sqlalchemy.sql.expression import Select
 
 
 class ClosestUpdater[Model: T](Updater):
-    def __init__(self, model: Type[Model], location) -> None:
-        self._location = location
+    """Sort theaters from the nearest to the farthest of a location."""
+
+    def __init__(
+        self,
+        model: Type[Model],
+        location,
+        *,
+        knn: bool = False,
+        geodesic: bool = False,
+    ) -> None:
+        """
+        Initialize the updater.
+
+        Parameters
+        ----------
+        model : Type[Model]
+            the mapped class sorted.
+        location : WKTElement | ColumnElement
+            the WGS84 point distances are computed from.
+        knn : bool, optional
+            sort with the `<->` operator, walking the GiST index from the
+            nearest theater instead of sorting the whole table. PostGIS
+            rechecks the exact distance of the candidates yielded by the
+            index (bounding boxes), so the order is exact.
+        geodesic : bool, optional
+            sort by distance on the spheroid rather than in degrees, and
+            populate `Model.distance` (meters).
+
+        """
+        self._coordinates = (
+            point_coordinates(location)
+            if isinstance(location, WKTElement)
+            else None
+        )
+        self._wkt = location if isinstance(location, WKTElement) else None
+        self._location = (
+            func.ST_GeomFromText(
+                bindparam("closest_location", location.data, type_=Text),
+                location.srid,
+            )
+            if self._wkt is not None
+            else location
+        )
+        self._model = model
+        self._knn = knn
+        self._geodesic = geodesic
+
+    @property
+    def shape(self) -> Hashable | None:
+        """Return the sort options, None if the location is an expression."""
+        if self._wkt is None:
+            return None
+        return (
+            self.__class__,
+            self._model,
+            self._wkt.srid,
+            self._knn,
+            self._geodesic,
+        )
+
+    @property
+    def params(self) -> Mapping[str, Any]:
+        """Return the location bound to the clauses."""
+        return (
+            {} if self._wkt is None else {"closest_location": self._wkt.data}
+        )
+
+    @property
+    def coordinates(self) -> tuple[float, float] | None:
+        """Return the location longitude and latitude, if known."""
+        return self._coordinates
+
+    @property
+    def geodesic(self) -> bool:
+        """Return whether distances are computed on the spheroid."""
+        return self._geodesic
+
+    @property
+    def distance(self) -> ColumnElement[float]:
+        """Return the distance expression the statement is sorted by."""
+        geometry, location = self._operands()
+        if self._knn:
+            return geometry.op("<->", return_type=Float)(location)
+        return func.ST_Distance(geometry, location, type_=Float)
+
+    def update(self, statement: Select) -> Select:
+        # ties are broken by id so that pages are deterministic
+        statement = statement.order_by(
+            self.distance.asc(), self._model.id.asc()
+        )
+        if self._geodesic:
+            statement = _with_distance(statement, self._model, self.meters)
+        return statement
+
+    @property
+    def meters(self) -> ColumnElement[float]:
+        """Return the distance (meters) on the spheroid to the location."""
+        return func.ST_Distance(
+            as_geography(self._model.geometry),
+            as_geography(self._location),
+            type_=Float,
+        )
+
+    def _operands(self) -> tuple[ColumnElement, ColumnElement]:
+        """Return the geometry and location compared."""
+        if self._geodesic:
+            return (
+                as_geography(self._model.geometry),
+                as_geography(self._location),
+            )
+        return self._model.geometry, self._location
+
+
+def point_coordinates(location: WKTElement) -> tuple[float, float] | None:
+    """Parse the longitude and latitude of a WKT point."""
+    if match := _POINT.fullmatch(location.data.strip()):
+        return float(match["x"]), float(match["y"])
+    return None
+
+
+class WithinUpdater[Model: T](Updater):
+    """Keep the theaters within a radius of a location."""
+
+    # meters per degree, lower bounds so the bounding box is conservative
+    _METERS_PER_DEGREE_LATITUDE = 110_000
+    _METERS_PER_DEGREE_LONGITUDE = 111_000
+
+    def __init__(
+        self,
+        model: Type[Model],
+        longitude: float,
+        latitude: float,
+        meters: float,
+    ) -> None:
+        """
+        Initialize the updater.
+
+        Parameters
+        ----------
+        model : Type[Model]
+            the mapped class filtered.
+        longitude : float
+            WGS84 longitude of the location.
+        latitude : float
+            WGS84 latitude of the location.
+        meters : float
+            radius of the search.
+
+        """
         self._model = model
+        self._longitude = longitude
+        self._latitude = latitude
+        self._meters = meters
+        self._location = func.ST_SetSRID(
+            func.ST_MakePoint(
+                bindparam("within_longitude", longitude, type_=Float),
+                bindparam("within_latitude", latitude, type_=Float),
+            ),
+            4326,
+        )
+
+    @property
+    def shape(self) -> Hashable:
+        """Return the class, the clauses only depend on bound values."""
+        return self.__class__, self._model
+
+    @property
+    def params(self) -> Mapping[str, Any]:
+        """Return the location, radius and bounding box bound."""
+        return {
+            "within_longitude": self._longitude,
+            "within_latitude": self._latitude,
+            "within_meters": self._meters,
+            **dict(zip(_BOUNDS, self._bounds(), strict=True)),
+        }
+
+    @property
+    def distance(self) -> ColumnElement[float]:
+        """Return the distance (meters) to the location."""
+        return func.ST_Distance(
+            as_geography(self._model.geometry),
+            as_geography(self._location),
+            type_=Float,
+        )
 
     def update(self, statement: Select) -> Select:
-        return statement.order_by(
-            func.ST_Distance(self._model.geometry, self._location).asc()
+        """
+        Filter with `ST_DWithin` on geography.
+
+        The exact (spheroid) test is preceded by a bounding box test on the
+        geometry, so both GiST indexes can cut the candidates.
+        """
+        statement = statement.where(
+            self._model.geometry.intersects(self._bounding_box()),
+            func.ST_DWithin(
+                as_geography(self._model.geometry),
+                as_geography(self._location),
+                bindparam("within_meters", self._meters, type_=Float),
+            ),
         )
+        return _with_distance(statement, self._model, self.distance)
+
+    def _bounding_box(self) -> ColumnElement:
+        """Return a WGS84 envelope enclosing the search circle."""
+        return _envelope("within", self._bounds())
+
+    def _bounds(self) -> tuple[float, float, float, float]:
+        """Return the west, south, east and north bounds of the circle."""
+        d_lat = self._meters / self._METERS_PER_DEGREE_LATITUDE
+        pole_side = min(abs(self._latitude) + d_lat, 89.0)
+        d_long = min(
+            self._meters
+            / (self._METERS_PER_DEGREE_LONGITUDE * cos(radians(pole_side))),
+            180.0,
+        )
+        return (
+            self._longitude - d_long,
+            self._latitude - d_lat,
+            self._longitude + d_long,
+            self._latitude + d_lat,
+        )
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return (
+            f"{self.__class__.__name__}({self._longitude!r}, "
+            f"{self._latitude!r}, {self._meters!r})"
+        )
+
+
+class BoundingBoxUpdater[Model: T](Updater):
+    """Keep the theaters within a WGS84 bounding box."""
+
+    def __init__(
+        self,
+        model: Type[Model],
+        west: float,
+        south: float,
+        east: float,
+        north: float,
+    ) -> None:
+        """
+        Initialize the updater.
+
+        Parameters
+        ----------
+        model : Type[Model]
+            the mapped class filtered.
+        west, south, east, north : float
+            WGS84 bounds of the box.
+
+        """
+        self._model = model
+        self._bounds = (west, south, east, north)
+
+    @property
+    def shape(self) -> Hashable:
+        """Return the class, the clauses only depend on bound values."""
+        return self.__class__, self._model
+
+    @property
+    def params(self) -> Mapping[str, Any]:
+        """Return the bounds bound to the clauses."""
+        return {
+            f"bbox_{bound}": value
+            for bound, value in zip(_BOUNDS, self._bounds, strict=True)
+        }
+
+    def update(self, statement: Select) -> Select:
+        """Filter with a bounding box test, answered by the GiST index."""
+        return statement.where(
+            self._model.geometry.intersects(_envelope("bbox", self._bounds))
+        )
+
+    def __repr__(self) -> str:
+        """Return a string representation of the object."""
+        return f"{self.__class__.__name__}{self._bounds!r}"
+
+
+def _with_distance(
+    statement: Select, model: type, meters: ColumnElement[float]
+) -> Select:
+    """
+    Return the distance to a location along the lines read.
+
+    It populates the `distance` query expression of the instances read, or
+    replaces the `distance` column of plain rows.
+    """
+    if any(
+        description["expr"] is model
+        for description in statement.column_descriptions
+    ):
+        return statement.options(with_expression(model.distance, meters))
+    return statement.with_only_columns(
+        *(
+            column
+            for column in statement.selected_columns
+            if column.key != "distance"
+        ),
+        meters.label("distance"),
+        maintain_column_froms=True,
+    )
+
+
+def _envelope(
+    prefix: str, bounds: tuple[float, float, float, float]
+) -> ColumnElement:
+    """Return a WGS84 envelope whose bounds are bound parameters."""
+    return func.ST_MakeEnvelope(
+        *(
+            bindparam(f"{prefix}_{bound}", value, type_=Float)
+            for bound, value in zip(_BOUNDS, bounds, strict=True)
+        ),
+        4326,
+    )
 
 
 # class UserOwnership(Updater[T]):
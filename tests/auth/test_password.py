@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import pytest
+
+
+async def test_hash_pool_admission():
+    from eigakan.auth.exc import HashingOverloaded
+    from eigakan.auth.password import HashPool
+
+    pool = HashPool(workers=1, queue=1)
+    running = [
+        asyncio.create_task(pool.run(time.sleep, 0.05)) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    assert pool.depth == 2
+    with pytest.raises(HashingOverloaded):
+        await pool.run(time.sleep, 0)
+    await asyncio.gather(*running)
+    assert pool.depth == 0
+    assert pool.rejected == 1
+    assert pool.hashes == 2
+    assert pool.mean_hash_time >= 0.05
+
+
+async def test_verify_off_the_loop():
+    from eigakan.auth.exc import InvalidPassword
+    from eigakan.auth.models import Owner
+    from eigakan.auth.password import needs_rehash, ph, rehash, verify
+
+    owner = Owner(password=ph.hash("secret").encode())
+    await verify(owner, "secret")
+    with pytest.raises(InvalidPassword):
+        await verify(owner, "wrong")
+    assert not needs_rehash(owner)
+    assert ph.verify(await rehash("secret"), "secret")
@@ -0,0 +1,39 @@
+import pytest
+
+
+def test_token_claims():
+    from eigakan.auth.token import create_jwt_token, decode_jwt_token
+
+    assert "siret" not in decode_jwt_token(create_jwt_token(sub="1"))
+    claims = decode_jwt_token(create_jwt_token(sub="1", siret=10, version=2))
+    assert (claims["sub"], claims["siret"], claims["ver"]) == ("1", 10, 2)
+
+
+def test_revocations():
+    from eigakan.auth.revocation import Revocations
+
+    revocations = Revocations()
+    revocations.update([(1, 2, False), (2, 0, True)])
+    assert revocations.accepts(1, 2)
+    assert revocations.accepts(1, 1) is False
+    assert revocations.accepts(2, 0) is False
+    assert revocations.accepts(3, 0) is None
+
+
+async def test_principal_without_query(monkeypatch):
+    from eigakan.auth import dependencies
+    from eigakan.auth.exc import TokenValidationException
+    from eigakan.auth.revocation import Revocations
+
+    revocations = Revocations()
+    revocations.update([(1, 2, False)])
+    monkeypatch.setattr(dependencies, "revocations", revocations)
+    # no session: the owner is not read
+    owner = await dependencies._authenticate(
+        {"sub": "1", "siret": 10, "ver": 2}, None
+    )
+    assert (owner.id, owner.siret) == (1, 10)
+    with pytest.raises(TokenValidationException):
+        await dependencies._authenticate(
+            {"sub": "1", "siret": 10, "ver": 1}, None
+        )
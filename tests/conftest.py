@@ -5,6 +5,9 @@ from starlette.config import environ
 from starlette.testclient import TestClient
 
 environ["DB_PORT"] = "5433"
+# the tests log in far more often than a client may
+environ["RATE_LIMIT_ENABLED"] = "false"
+environ["RATE_LIMIT_STORAGE_URI"] = "memory://"
 
 from eigakan.database.core import Base
 from eigakan.database.enums import CORE_SCHEMA
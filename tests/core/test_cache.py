@@ -0,0 +1,178 @@
+def test_cache_hit_and_miss():
+    from eigakan.core.cache import TTLCache
+
+    cache = TTLCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_eviction():
+    from eigakan.core.cache import TTLCache
+
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+
+def test_cache_expiration(monkeypatch):
+    from eigakan.core import cache as module
+
+    cache = module.TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    monkeypatch.setattr(module, "monotonic", lambda: float("inf"))
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_disabled():
+    from eigakan.core.cache import TTLCache
+
+    cache = TTLCache(maxsize=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+
+
+def test_cache_invalidated_on_write():
+    from eigakan.core.count import counts
+    from eigakan.core.events import Write, dispatch
+    from eigakan.theater.models import Theater
+
+    counts.set("key", 1)
+    dispatch(Write(Theater, "delete", (1,)))
+    assert counts.get("key") is None
+
+
+def test_write_deferred_until_committed():
+    from sqlalchemy.orm import Session
+
+    from eigakan.core.count import counts
+    from eigakan.core.events import Write, defer
+    from eigakan.theater.models import Theater
+
+    session = Session()
+    with session.begin():
+        counts.set("key", 1)
+        with session.begin_nested():
+            defer(session, Write(Theater, "delete", (1,)))
+        assert counts.get("key") == 1
+    assert counts.get("key") is None
+    with session.begin():
+        counts.set("key", 1)
+        with session.begin_nested() as savepoint:
+            defer(session, Write(Theater, "delete", (1,)))
+            savepoint.rollback()
+    assert counts.get("key") == 1
+    with session.begin():
+        defer(session, Write(Theater, "delete", (1,)))
+        session.rollback()
+    assert counts.get("key") == 1
+
+
+def test_statement_built_once_per_shape():
+    from eigakan.core.statement import ReadPage, statements
+    from eigakan.core.updaters import Pagination
+    from eigakan.core.updaters.commons import ScalarUpdater
+    from eigakan.theater.models import Theater
+
+    first = ReadPage(Theater, ScalarUpdater(Theater, "nb_screens", 1))
+    second = ReadPage(
+        Theater, ScalarUpdater(Theater, "nb_screens", 5), Pagination(2, 10)
+    )
+    assert first.shape != second.shape
+    hits = statements.hits
+    third = ReadPage(
+        Theater, ScalarUpdater(Theater, "nb_screens", 8), Pagination(3, 20)
+    )
+    assert third.shape == second.shape
+    assert third.statement is second.statement
+    assert statements.hits == hits + 1
+    assert "core.theater.nb_screens = 8" in str(third)
+    assert "LIMIT 20 OFFSET 40" in str(third)
+    assert "nb_screens = 5" in str(second)
+
+
+def test_statement_not_cached_with_unbound_updaters():
+    from eigakan.core.statement import ReadPage
+    from eigakan.core.updaters import Keyset
+    from eigakan.theater.models import Theater
+
+    statement = ReadPage(Theater, Keyset(10)(Theater.id))
+    assert statement.shape is None
+    assert statement.statement is not statement.statement
+
+
+def test_count_key_ignores_slicing():
+    from eigakan.core.statement import ReadAllLines, ReadPage
+    from eigakan.core.updaters import Pagination
+    from eigakan.core.updaters.commons import ScalarUpdater
+    from eigakan.core.updaters.sort import Sorter
+    from eigakan.theater.models import Theater
+
+    def key(*updaters):
+        return ReadPage(Theater, *updaters)._count_key()
+
+    screens = ScalarUpdater(Theater, "nb_screens", 1)
+    assert key(screens, Pagination(1, 10)) == key(
+        screens, Sorter(asc=("name",))(Theater), Pagination(2, 20)
+    )
+    assert key(screens) != key(ScalarUpdater(Theater, "nb_screens", 2))
+    assert key(screens) == ReadAllLines(Theater, screens)._count_key()
+
+
+def test_owners_invalidated_on_write():
+    from uuid import uuid4
+
+    from eigakan.auth.cache import owned, owners
+    from eigakan.auth.models import Owner
+    from eigakan.core.events import Write, dispatch
+    from eigakan.theater.models import Theater
+
+    theater, other = uuid4(), uuid4()
+    owners.set(1, Owner(id=1, siret=10))
+    owners.set(2, Owner(id=2, siret=20))
+    owned.set(10, frozenset({theater}))
+    owned.set(20, frozenset({other}))
+    dispatch(Write(Owner, "update", (1,)))
+    assert owners.get(1) is None
+    assert owners.get(2) is not None
+    dispatch(Write(Theater, "delete", (theater,)))
+    assert owned.get(10) is None
+    assert owned.get(20) == {other}
+    dispatch(Write(Theater, "create", (uuid4(),), {"siret": 20}))
+    assert owned.get(20) is None
+
+
+def test_owned_invalidated_on_change():
+    from uuid import uuid4
+
+    from eigakan.auth.cache import owned
+    from eigakan.core.revision import _HOOKS
+    from eigakan.theater.models import Theater
+
+    owned.set(10, frozenset({uuid4()}))
+    # as if another worker wrote a theater
+    for hook in _HOOKS[Theater.__table__.name]:
+        hook()
+    assert owned.get(10) is None
+
+
+def test_health(client):
+    from eigakan.core.statement import statements
+
+    statements.get(("health",))
+    response = client.get("/api/health")
+    assert response.status_code == 200
+    health = response.json()
+    assert health["caches"]["statements"]["misses"] >= 1
+    assert set(health["hash_pool"]) == {
+        "depth",
+        "rejected",
+        "hashes",
+        "mean_hash_time",
+    }
@@ -0,0 +1,35 @@
+from datetime import UTC, datetime
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    ("if_none_match", "if_modified_since", "expected"),
+    [
+        (None, None, False),
+        ('"1"', None, True),
+        ('"2"', None, False),
+        # the ETag wins over the date
+        ('"2"', "Sat, 17 Oct 2026 12:00:00 GMT", False),
+        (None, "Sat, 17 Oct 2026 12:00:00 GMT", True),
+        (None, "Sat, 17 Oct 2026 11:59:59 GMT", False),
+        (None, "yesterday", False),
+    ],
+)
+def test_conditions_fresh(if_none_match, if_modified_since, expected):
+    from eigakan.core.conditional import Conditions
+
+    conditions = Conditions(if_none_match, if_modified_since)
+    modified = datetime(2026, 10, 17, 12, 0, 0, 500)
+    assert conditions.fresh('"1"', modified) is expected
+
+
+def test_conditional_headers():
+    from eigakan.core.conditional import CACHE_CONTROL, headers
+
+    modified = datetime(2026, 10, 17, 12, tzinfo=UTC)
+    assert headers('"1"', modified) == {
+        "ETag": '"1"',
+        "Cache-Control": CACHE_CONTROL,
+        "Last-Modified": "Sat, 17 Oct 2026 12:00:00 GMT",
+    }
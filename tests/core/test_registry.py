@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import select
+
+
+def test_theater_metadata():
+    from eigakan.core.registry import describe
+    from eigakan.theater.models import Accessibility, Theater
+
+    metadata = describe(Theater)
+    assert metadata.primary_key == (Theater.id,)
+    assert {"id", "osm_id"} <= metadata.unique
+    assert "name" not in metadata.unique
+    assert metadata.target("accessibility.name") == (Accessibility, "name")
+    assert metadata.target("name") == (Theater, "name")
+    assert "cnc_id" in metadata.sortable
+    # neither geometries nor query expressions are ordered
+    assert "geometry" not in metadata.sortable
+    assert "distance" not in metadata.sortable
+    assert describe(Theater) is metadata
+
+
+def test_composite_primary_key():
+    from eigakan.core.exc import ColumnCannotbeUsedToReadOne
+    from eigakan.core.registry import describe
+    from eigakan.core.statement import ReadAllLines, ReadOneBy
+    from eigakan.theater.models import Neighbour
+
+    metadata = describe(Neighbour)
+    assert metadata.primary_key == (Neighbour.theater_id, Neighbour.rank)
+    assert metadata.unique == frozenset()
+    assert metadata.identity(Neighbour(theater_id=1, rank=2)) == (1, 2)
+    with pytest.raises(ColumnCannotbeUsedToReadOne):
+        ReadOneBy("theater_id", 1, Neighbour)
+    assert "count(core.neighbour.theater_id)" in str(ReadAllLines(Neighbour))
+
+
+def test_sorter_unknown_column():
+    from eigakan.core.updaters.exc import ColumnCannotBeSorted
+    from eigakan.core.updaters.sort import Sorter
+    from eigakan.theater.models import Theater
+
+    with pytest.raises(ColumnCannotBeSorted):
+        Sorter(asc=("geometry",))(Theater).update(select(Theater))
@@ -0,0 +1,69 @@
+import multiprocessing
+
+import pytest
+from limits import parse, strategies
+
+
+@pytest.fixture()
+def storage(tmp_path):
+    from eigakan.core.shm import SharedMemoryStorage
+
+    return SharedMemoryStorage(f"shm://{tmp_path}/limits", slots=64)
+
+
+def test_shm_fixed_window(storage):
+    assert storage.incr("a", 60) == 1
+    assert storage.incr("a", 60, amount=2) == 3
+    assert storage.get("a") == 3
+    assert storage.get("b") == 0
+    storage.clear("a")
+    assert storage.get("a") == 0
+
+
+def test_shm_sliding_window(storage):
+    limiter = strategies.SlidingWindowCounterRateLimiter(storage)
+    item = parse("3/minute")
+    assert [limiter.hit(item, "a") for _ in range(4)] == [True] * 3 + [False]
+    assert limiter.hit(item, "b")
+
+
+def test_shm_window_rotation(storage, monkeypatch):
+    from eigakan.core import shm
+
+    monkeypatch.setattr(shm, "time", lambda: 600.0)
+    for _ in range(4):
+        storage.acquire_sliding_window_entry("a", 4, 60)
+    # half of the previous window still counts
+    monkeypatch.setattr(shm, "time", lambda: 690.0)
+    assert storage.get_sliding_window("a", 60) == (4, 30.0, 0, 90.0)
+    assert storage.acquire_sliding_window_entry("a", 4, 60, amount=2)
+    assert not storage.acquire_sliding_window_entry("a", 4, 60)
+    # both windows elapsed
+    monkeypatch.setattr(shm, "time", lambda: 780.0)
+    assert storage.get_sliding_window("a", 60)[::2] == (0, 0)
+
+
+def test_shm_reset(storage):
+    for key in "abc":
+        storage.incr(key, 60)
+    assert storage.reset() == 3
+    assert storage.get("a") == 0
+
+
+def _hits(uri: str) -> None:
+    from eigakan.core.shm import SharedMemoryStorage
+
+    storage = SharedMemoryStorage(uri, slots=64)
+    for _ in range(500):
+        storage.incr("shared", 60)
+
+
+def test_shm_shared_by_processes(storage, tmp_path):
+    uri = f"shm://{tmp_path}/limits"
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=_hits, args=(uri,)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert storage.get("shared") == 2000
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import select
+
+
+def test_keyset_first_page():
+    from eigakan.core.updaters import Keyset
+    from eigakan.theater.models import Theater
+
+    keyset = Keyset(limit=2)(Theater.nb_screens, Theater.id)
+    statement = keyset.update(Theater.__table__.select())
+    assert statement._limit == 3
+    assert statement.whereclause is None
+
+
+def test_keyset_consume():
+    from eigakan.core.updaters import Keyset
+    from eigakan.theater.models import Theater
+
+    keyset = Keyset(limit=2)(Theater.nb_screens, Theater.id)
+    rows = [("a", 1, "x"), ("b", 2, "y"), ("c", 3, "z")]
+    assert keyset.consume(rows) == rows[:2]
+    assert Keyset(limit=2, cursor=keyset.next)._after == [2, "y"]
+
+
+def test_keyset_last_page():
+    from eigakan.core.updaters import Keyset
+    from eigakan.theater.models import Theater
+
+    keyset = Keyset(limit=2)(Theater.nb_screens, Theater.id)
+    rows = [("a", 1, "x")]
+    assert keyset.consume(rows) == rows
+    assert keyset.next is None
+
+
+def test_keyset_resumes_after_cursor():
+    from uuid import uuid4
+
+    from eigakan.core.updaters import Keyset
+    from eigakan.theater.models import Theater
+
+    id = uuid4()
+    cursor = Keyset._encode([3, id])
+    keyset = Keyset(limit=2, cursor=cursor)(Theater.nb_screens, Theater.id)
+    statement = keyset.update(Theater.__table__.select())
+    params = statement.compile().params
+    assert id in params.values()
+    assert 3 in params.values()
+
+
+@pytest.mark.parametrize("cursor", ["%%%", "bm90IGpzb24", "e30"])
+def test_keyset_invalid_cursor(cursor):
+    from eigakan.core.updaters import Keyset
+    from eigakan.core.updaters.exc import InvalidCursor
+
+    with pytest.raises(InvalidCursor):
+        Keyset(limit=2, cursor=cursor)
+
+
+def test_keyset_cursor_keys_mismatch():
+    from eigakan.core.updaters import Keyset
+    from eigakan.core.updaters.exc import InvalidCursor
+    from eigakan.theater.models import Theater
+
+    keyset = Keyset(limit=2, cursor=Keyset._encode([1, 2]))
+    with pytest.raises(InvalidCursor):
+        keyset(Theater.id)
+
+
+def test_sorter_requires_a_model():
+    from eigakan.core.updaters.exc import UpdaterNotLoaded
+    from eigakan.core.updaters.sort import Sorter
+
+    with pytest.raises(UpdaterNotLoaded):
+        Sorter(asc=("name",)).update(select())
+
+
+def test_sorter():
+    from eigakan.core.updaters.sort import Sorter
+    from eigakan.theater.models import Accessibility
+
+    statement = Sorter(asc=("strength",), desc=("name",))(
+        Accessibility
+    ).update(select(Accessibility))
+    assert str(statement).endswith(
+        "ORDER BY core.accessibility.strength ASC, "
+        "core.accessibility.name DESC"
+    )
@@ -1,7 +1,8 @@
 import factory
 from async_factory_boy.factory.sqlalchemy import AsyncSQLAlchemyFactory
+from geoalchemy2.elements import WKTElement
 
-from eigakan.theater.models import Accessibility
+from eigakan.theater.models import Accessibility, Theater
 
 from .database import AsyncScopedSession
 
@@ -24,3 +25,24 @@ class AccessibilityFactory(BaseFactory):
     id = factory.Sequence(lambda n: n)
     strength = factory.Sequence(lambda n: n)
     name = factory.Sequence(lambda n: "Accessibility %d" % n)
+
+
+class TheaterFactory(BaseFactory):
+    class Meta:
+        model = Theater
+
+    osm_id = factory.Sequence(lambda n: "node/%d" % n)
+    name = factory.Sequence(lambda n: "Theater %d" % n)
+    accessibility = factory.SubFactory(AccessibilityFactory)
+    nb_screens = factory.Faker("random_int", min=1, max=4)
+    city_insee = factory.Faker("random_element", elements=("75056", "94028"))
+    geometry = factory.LazyFunction(
+        lambda: WKTElement(
+            "POINT(%.6f %.6f)"
+            % (
+                factory.random.randgen.uniform(2.2, 2.5),
+                factory.random.randgen.uniform(48.7, 48.9),
+            ),
+            srid=4326,
+        )
+    )
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+
+def _batch(operations, atomic=False):
+    from eigakan.theater.schemas import Batch
+
+    return Batch.model_validate({"operations": operations, "atomic": atomic})
+
+
+@pytest.mark.parametrize("atomic", [False, True])
+async def test_apply_batch(session, atomic):
+    from eigakan.auth.models import Owner
+    from eigakan.core.statement import ReadAll
+    from eigakan.theater.batch import apply
+    from eigakan.theater.models import Theater
+
+    from ..factories import TheaterFactory
+
+    owned, other = (
+        await TheaterFactory.create(siret=1),
+        await TheaterFactory.create(siret=2),
+    )
+    results = await apply(
+        _batch(
+            [
+                {"op": "update", "id": str(owned.id), "body": {"name": "a"}},
+                {"op": "delete", "id": str(other.id)},
+                {"op": "delete", "id": str(owned.id)},
+                {"op": "update", "id": str(owned.id), "body": {"name": "b"}},
+            ],
+            atomic,
+        ),
+        Owner(siret=1),
+        session,
+    )
+    statuses = [result["status"] for result in results]
+    ids = {theater.id for theater in await ReadAll(Theater)(session)}
+    if atomic:
+        assert statuses == [
+            HTTPStatus.FAILED_DEPENDENCY,
+            HTTPStatus.FORBIDDEN,
+            HTTPStatus.FAILED_DEPENDENCY,
+            HTTPStatus.FAILED_DEPENDENCY,
+        ]
+        assert ids == {owned.id, other.id}
+    else:
+        assert statuses == [
+            HTTPStatus.NO_CONTENT,
+            HTTPStatus.FORBIDDEN,
+            HTTPStatus.NO_CONTENT,
+            HTTPStatus.NOT_FOUND,
+        ]
+        assert ids == {other.id}
@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+
+def test_cluster_merges_groups():
+    from eigakan.theater.clusters import Cluster
+
+    cluster = Cluster()
+    cluster.add("yes", 1, 2.0, 48.0)
+    cluster.add("no", 3, 3.0, 49.0)
+    assert cluster.count == 4
+    assert (cluster.longitude, cluster.latitude) == pytest.approx(
+        (2.75, 48.75)
+    )
+    assert cluster.accessibility == {"yes": 1, "no": 3}
+
+
+def test_clusters_single_grouped_statement():
+    from eigakan.theater.clusters import ReadClusters
+    from eigakan.theater.dependencies import _parse_accessibility, _parse_bbox
+    from eigakan.theater.schemas import Wheelchair
+
+    statement = ReadClusters(
+        6,
+        _parse_accessibility(Wheelchair.YES),
+        _parse_bbox("2.2,48.8,2.5,48.9"),
+    ).statement
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "GROUP BY floor(" in sql
+    assert "core.theater.geometry && ST_MakeEnvelope(" in sql
+    assert "core.accessibility.name = " in sql
+
+
+@pytest.mark.parametrize(
+    "bbox", ["2.5,48.8,2.2,48.9", "2.2,48.8,2.5,a", "-181,0,0,1"]
+)
+def test_invalid_bbox(bbox):
+    from fastapi import HTTPException
+
+    from eigakan.theater.dependencies import _parse_bbox
+
+    with pytest.raises(HTTPException):
+        _parse_bbox(bbox)
+
+
+async def test_read_clusters(session):
+    from eigakan.theater.clusters import ReadClusters
+
+    from ..factories import TheaterFactory
+
+    theaters = [await TheaterFactory.create() for _ in range(10)]
+    clusters = await ReadClusters(0)(session)
+    # the factory locates theaters around Paris, a single cell at zoom 0
+    assert len(clusters) == 1
+    assert clusters[0].count == len(theaters)
+    assert sum(clusters[0].accessibility.values()) == len(theaters)
+    assert 2.2 <= clusters[0].longitude <= 2.5
+    assert 48.7 <= clusters[0].latitude <= 48.9
@@ -27,3 +27,343 @@ async def test_get_all_filtered(session, accessibilities):
     )(session)
     assert len(resources) == 1
     assert resources[0].id == accessibilities[-1].id
+
+
+async def test_read_page(session, accessibilities):
+    from eigakan.core.statement import ReadPage
+    from eigakan.core.updaters import Pagination
+    from eigakan.core.updaters.sort import Sorter
+
+    model = accessibilities[0].__class__
+    page = await ReadPage(
+        model, Sorter(asc=("id",))(model), Pagination(page=1, limit=1)
+    )(session)
+    assert page.total == 2
+    assert [acc.id for acc in page.content] == [accessibilities[0].id]
+
+
+def test_read_page_windowed():
+    from eigakan.core.count import Count
+    from eigakan.core.statement import ReadPage
+    from eigakan.core.updaters import Pagination
+    from eigakan.theater.models import Theater
+
+    def sql(count):
+        return str(
+            ReadPage(
+                Theater, Pagination(page=1, limit=10), count=count
+            ).statement.compile()
+        )
+
+    assert "OVER ()" in sql(Count.EXACT)
+    # counted apart, the page stops at its limit
+    assert "OVER ()" not in sql(Count.CACHED)
+    assert "OVER ()" not in sql(Count.ESTIMATE)
+
+
+async def test_read_page_out_of_range(session, accessibilities):
+    from eigakan.core.statement import ReadPage
+    from eigakan.core.updaters import Pagination
+
+    model = accessibilities[0].__class__
+    page = await ReadPage(model, Pagination(page=3, limit=1))(session)
+    assert page.total == 2
+    assert page.content == []
+
+
+async def test_get_all_keyset(session, accessibilities):
+    from eigakan.core.statement import ReadAll
+    from eigakan.core.updaters import Keyset
+
+    model = accessibilities[0].__class__
+    keyset = Keyset(limit=1)
+    first = await ReadAll(model, keyset(model.id))(session)
+    keyset = Keyset(limit=1, cursor=keyset.next)
+    second = await ReadAll(model, keyset(model.id))(session)
+    assert [acc.id for acc in (*first, *second)] == [
+        acc.id for acc in accessibilities
+    ]
+    assert keyset.next is None
+
+
+async def test_read_many_by(session, accessibilities):
+    from eigakan.core.statement import ReadManyBy
+
+    model = accessibilities[0].__class__
+    first, second = accessibilities
+    many = await ReadManyBy("id", [second.id, -1, first.id, second.id], model)(
+        session
+    )
+    assert [acc.id for acc in many.content] == [second.id, first.id]
+    assert many.missing == [-1]
+
+
+async def test_loader_coalesces_reads(session, accessibilities):
+    import asyncio
+    from contextlib import nullcontext
+
+    import pytest
+
+    from eigakan.core.exc import ResourceNotFound
+    from eigakan.core.loader import Loader
+
+    model = accessibilities[0].__class__
+    loader = Loader(model, lambda: nullcontext(session), window=0.01, size=100)
+    first, second, missing = await asyncio.gather(
+        *(loader.load(acc.id) for acc in accessibilities),
+        loader.load(-1),
+        return_exceptions=True,
+    )
+    assert (first.id, second.id) == tuple(acc.id for acc in accessibilities)
+    assert isinstance(missing, ResourceNotFound)
+    assert loader.batches == 1
+    with pytest.raises(ResourceNotFound):
+        await loader.load(-1)
+    assert loader.batches == 2
+
+
+async def test_loader_cancelled():
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    import pytest
+
+    from eigakan.core.loader import Loader
+    from eigakan.theater.models import Accessibility
+
+    @asynccontextmanager
+    async def cancelled():
+        raise asyncio.CancelledError
+        yield
+
+    loader = Loader(Accessibility, cancelled, window=0.01, size=100)
+    # the request is answered rather than left waiting for the batch
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(loader.load(1), timeout=1)
+
+
+async def test_create_many(session, accessibility):
+    from geoalchemy2.elements import WKTElement
+
+    from eigakan.core.cud import CUD
+    from eigakan.core.exc import DuplicatedResource, ResourceNotFound
+    from eigakan.core.statement import ReadAll
+    from eigakan.theater.models import Theater
+
+    def theater(osm_id, accessibility_id=accessibility.id):
+        return {
+            "osm_id": osm_id,
+            "accessibility_id": accessibility_id,
+            "city_insee": "75056",
+            "geometry": WKTElement("POINT(2.35 48.85)", srid=4326),
+        }
+
+    created, errors = await CUD(Theater).create_many(
+        [theater("node/1"), theater("node/2")], session
+    )
+    assert [t.osm_id for t in created] == ["node/1", "node/2"]
+    assert errors == {}
+    created, errors = await CUD(Theater).create_many(
+        [theater("node/1"), theater("node/3"), theater("node/4", 0)], session
+    )
+    assert [t.osm_id for t in created] == ["node/3"]
+    assert isinstance(errors[0], DuplicatedResource)
+    assert isinstance(errors[2], ResourceNotFound)
+    assert len(await ReadAll(Theater)(session)) == 3
+
+
+async def test_create_many_statements(session, accessibility):
+    from geoalchemy2.elements import WKTElement
+    from sqlalchemy import event
+
+    from eigakan.core.cud import CUD
+    from eigakan.database.core import engine
+    from eigakan.theater.models import Theater
+
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    async def issued(size, offset):
+        statements.clear()
+        await CUD(Theater).create_many(
+            [
+                {
+                    "osm_id": f"node/{offset + index}",
+                    "accessibility_id": accessibility.id,
+                    "city_insee": "75056",
+                    "geometry": WKTElement(
+                        f"POINT(2.{offset + index} 48.85)", srid=4326
+                    ),
+                }
+                for index in range(size)
+            ],
+            session,
+        )
+        return len(statements)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        # the theaters and their neighbours are written in bulk
+        assert await issued(2, 100) == await issued(500, 1000)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+
+
+async def test_write_where(session):
+    from eigakan.core.cud import CUD
+    from eigakan.core.statement import ReadOneBy
+    from eigakan.theater.models import Theater
+
+    from ..factories import TheaterFactory
+
+    theater = await TheaterFactory.create(siret=1)
+    # a write matching nothing rolls the transaction back
+    await session.commit()
+    cud = CUD(Theater)
+    assert not await cud.update_where(
+        {"name": "Cinecool"}, {"id": theater.id, "siret": 2}, session
+    )
+    assert await cud.update_where({}, {"id": theater.id, "siret": 1}, session)
+    assert await cud.update_where(
+        {"name": "Cinecool"}, {"id": theater.id, "siret": 1}, session
+    )
+    read = await ReadOneBy("id", theater.id, Theater, columns=(Theater.name,))(
+        session
+    )
+    assert read["name"] == "Cinecool"
+    assert not await cud.delete_where({"id": theater.id, "siret": 2}, session)
+    assert await cud.delete_where({"id": theater.id, "siret": 1}, session)
+
+
+async def test_upsert_many(session, accessibility):
+    from geoalchemy2.elements import WKTElement
+
+    from eigakan.core.cud import CUD, Upserted
+    from eigakan.core.statement import ReadAll
+    from eigakan.theater.models import Theater
+
+    from ..factories import TheaterFactory
+
+    await TheaterFactory.create(osm_id="node/3", siret=2)
+
+    def theater(osm_id, name, siret=1):
+        return {
+            "osm_id": osm_id,
+            "name": name,
+            "accessibility_id": accessibility.id,
+            "city_insee": "75056",
+            "siret": siret,
+            "geometry": WKTElement("POINT(2.35 48.85)", srid=4326),
+        }
+
+    cud = CUD(Theater)
+    upserted = await cud.upsert_many(
+        [theater("node/1", "a"), theater("node/2", "b")],
+        session,
+        key="osm_id",
+        where={"siret": 1},
+    )
+    assert upserted == Upserted(inserted=2, updated=0, unchanged=0)
+    upserted = await cud.upsert_many(
+        [
+            theater("node/1", "a"),
+            theater("node/2", "c"),
+            theater("node/3", "d"),
+        ],
+        session,
+        key="osm_id",
+        where={"siret": 1},
+    )
+    assert upserted == Upserted(inserted=0, updated=1, unchanged=2)
+    names = {
+        t["osm_id"]: t["name"]
+        for t in await ReadAll(
+            Theater, columns=(Theater.osm_id, Theater.name)
+        )(session)
+    }
+    assert names["node/2"] == "c"
+    assert names["node/3"] != "d"
+
+
+async def test_upsert_unchanged(session, accessibility):
+    from geoalchemy2.elements import WKTElement
+    from sqlalchemy import event
+
+    from eigakan.core import revision
+    from eigakan.core.cud import CUD, Upserted
+    from eigakan.database.core import engine
+    from eigakan.theater.models import Theater
+
+    theaters = [
+        {
+            "osm_id": f"node/{index}",
+            "accessibility_id": accessibility.id,
+            "city_insee": "75056",
+            "geometry": WKTElement(f"POINT(2.{index} 48.85)", srid=4326),
+        }
+        for index in range(1, 50)
+    ]
+    cud = CUD(Theater)
+    await cud.upsert_many(theaters, session, key="osm_id")
+    before = await revision.read(session, Theater)
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", count)
+    try:
+        upserted = await cud.upsert_many(theaters, session, key="osm_id")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", count)
+    assert upserted == Upserted(inserted=0, updated=0, unchanged=49)
+    # nothing written: neither the neighbours nor the revision
+    assert not any("neighbour" in statement for statement in statements)
+    assert await revision.read(session, Theater) == before
+
+
+async def test_versions(session):
+    from eigakan.core import revision
+    from eigakan.core.cud import CUD
+    from eigakan.core.statement import ReadOneBy
+    from eigakan.theater.models import Theater
+
+    from ..factories import TheaterFactory
+
+    theater = await TheaterFactory.create(siret=1)
+    await session.commit()
+    before = await revision.read(session, Theater)
+    cud = CUD(Theater)
+    # matching no row, the statements leave the revision alone
+    assert not await cud.update_where(
+        {"name": "Cinecool"}, {"id": theater.id, "siret": 2}, session
+    )
+    assert not await cud.delete_where({"id": theater.id, "siret": 2}, session)
+    assert await revision.read(session, Theater) == before
+    await cud.update_where({"name": "Cinecool"}, {"id": theater.id}, session)
+    read = await ReadOneBy(
+        "id", theater.id, Theater, columns=(Theater.version,)
+    )(session)
+    assert read["version"] == 2
+    assert (await revision.read(session, Theater)).value > before.value
+
+
+async def test_read_ids_without_coordinates(session, client):
+    from ..factories import TheaterFactory
+
+    first, second = (
+        await TheaterFactory.create(),
+        await TheaterFactory.create(),
+    )
+    await session.commit()
+    response = client.get(
+        "/api/theaters", params={"ids": f"{second.id},{first.id}"}
+    )
+    assert response.status_code == 200
+    assert [theater["osm_id"] for theater in response.json()["content"]] == [
+        second.osm_id,
+        first.osm_id,
+    ]
+    assert client.get("/api/theaters").status_code == 422
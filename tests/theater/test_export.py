@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from .test_rows import THEATER
+
+ROW = {**THEATER, "longitude": 2.3431, "latitude": 48.8505}
+
+
+async def _export(format, chunks):
+    from eigakan.theater import export
+
+    class Session:
+        async def close(self):
+            self.closed = True
+
+    class Statement:
+        async def partitions(self, session, size):
+            for chunk in chunks:
+                yield chunk
+
+    session = Session()
+    content = b"".join(
+        [part async for part in export.stream(session, Statement(), format)]
+    )
+    assert session.closed
+    return content
+
+
+@pytest.mark.parametrize("chunks", [[], [[ROW]], [[ROW, ROW], [ROW]]])
+async def test_export_formats(chunks):
+    from eigakan.theater.export import Format
+
+    count = sum(len(chunk) for chunk in chunks)
+    ndjson = await _export(Format.NDJSON, chunks)
+    assert [json.loads(line) for line in ndjson.splitlines()] == [
+        {key: value for key, value in THEATER.items() if key != "id"}
+    ] * count
+    geojson = json.loads(await _export(Format.GEOJSON, chunks))
+    assert geojson["type"] == "FeatureCollection"
+    assert len(geojson["features"]) == count
+    for feature in geojson["features"]:
+        assert feature["geometry"]["coordinates"] == [2.3431, 48.8505]
+        assert feature["properties"]["name"] == "Le Champo"
+    lines = list(
+        csv.DictReader(
+            io.StringIO((await _export(Format.CSV, chunks)).decode())
+        )
+    )
+    assert len(lines) == count
+    for line in lines:
+        assert line["accessibility"] == "yes"
+        assert line["latitude"] == "48.8505"
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"def", "abc"', True),
+        ("*", True),
+        ('"def"', False),
+    ],
+)
+def test_export_if_none_match(header, expected):
+    from eigakan.core.conditional import matches
+
+    assert matches(header, '"abc"') is expected
+
+
+def test_export_statement():
+    from eigakan.theater.dependencies import filters
+    from eigakan.theater.export import ReadExport
+
+    statement = ReadExport(*filters(None, None, "75")).statement
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "ST_X(" in sql
+    assert "ORDER BY" in sql
+    assert "distance" not in sql
+
+
+async def test_read_export(session):
+    from eigakan.theater.dependencies import filters
+    from eigakan.theater.export import Format, ReadExport
+
+    from ..factories import TheaterFactory
+
+    for _ in range(5):
+        await TheaterFactory.create()
+    statement = ReadExport()
+    chunks = [chunk async for chunk in statement.partitions(session, 2)]
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    ids = [row["id"] for chunk in chunks for row in chunk]
+    assert ids == sorted(ids)
+    etag, _ = await statement.validators(session, Format.NDJSON)
+    assert etag == (await statement.validators(session, Format.NDJSON))[0]
+    assert etag != (await statement.validators(session, Format.CSV))[0]
+    filtered = ReadExport(*filters(None, None, "75"))
+    assert etag != (await filtered.validators(session, Format.NDJSON))[0]
+    await TheaterFactory.create()
+    await session.flush()
+    assert etag != (await statement.validators(session, Format.NDJSON))[0]
@@ -0,0 +1,194 @@
+import math
+import random
+import uuid
+
+import pytest
+from geoalchemy2.elements import WKTElement
+
+pytest.importorskip("numpy")
+
+POINT = WKTElement("POINT(2.3522 48.8566)", srid=4326)
+NAMES = ("no", "limited", "yes")
+
+
+def _index(theaters, coordinates):
+    from eigakan.theater.memory import TheaterIndex
+
+    index = TheaterIndex(enabled=True, ttl=60)
+    index._build(theaters, *zip(*coordinates, strict=True))
+    return index
+
+
+def _theaters(n, seed=0):
+    from eigakan.theater.models import Accessibility, Theater
+
+    generator = random.Random(seed)  # noqa: S311
+    accessibilities = [
+        Accessibility(id=i, strength=i, name=name)
+        for i, name in enumerate(NAMES)
+    ]
+    theaters, coordinates = [], []
+    for _ in range(n):
+        theaters.append(
+            Theater(
+                id=uuid.UUID(int=generator.getrandbits(128)),
+                accessibility=generator.choice(accessibilities),
+                nb_screens=generator.choice((None, 1, 2, 3)),
+                city_insee=generator.choice(("75056", "94028", "2A004")),
+            )
+        )
+        # a coarse grid, so that ties on the distance are common
+        coordinates.append(
+            (
+                2.3 + generator.randrange(10) / 100,
+                48.8 + generator.randrange(10) / 100,
+            )
+        )
+    return theaters, coordinates
+
+
+def _reference(theaters, coordinates, accessibility, screens, prefix):
+    """Brute force ordering, as the SQL statement sorts."""
+    matching = [
+        (math.hypot(x - 2.3522, y - 48.8566), theater.id, theater)
+        for theater, (x, y) in zip(theaters, coordinates, strict=True)
+        if (
+            accessibility is None
+            or theater.accessibility.name == accessibility
+        )
+        and (screens is None or theater.nb_screens == screens)
+        and (prefix is None or theater.city_insee.startswith(prefix))
+    ]
+    return [theater for *_, theater in sorted(matching)]
+
+
+def _updaters(accessibility, screens, prefix):
+    from eigakan.core.updaters.commons import (
+        ScalarUpdater,
+        StartsWithUpdater,
+    )
+    from eigakan.theater.models import Theater
+
+    return (
+        accessibility
+        and ScalarUpdater(Theater, "accessibility.name", accessibility),
+        screens and ScalarUpdater(Theater, "nb_screens", screens),
+        prefix and StartsWithUpdater(Theater, "city_insee", prefix),
+    )
+
+
+@pytest.mark.parametrize("accessibility", [None, "limited"])
+@pytest.mark.parametrize("screens", [None, 2])
+@pytest.mark.parametrize("prefix", [None, "94", "2A"])
+@pytest.mark.parametrize("page", [1, 3, 50])
+async def test_read_page_matches_reference(
+    accessibility, screens, prefix, page
+):
+    from eigakan.core.updaters import Pagination
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater
+
+    theaters, coordinates = _theaters(500)
+    index = _index(theaters, coordinates)
+    index._loaded_at = float("inf")
+    expected = _reference(
+        theaters, coordinates, accessibility, screens, prefix
+    )
+    result = await index.read_page(
+        None,
+        *_updaters(accessibility, screens, prefix),
+        ClosestUpdater(Theater, POINT, knn=True),
+        Pagination(page=page, limit=10),
+    )
+    assert result.total == len(expected)
+    assert result.content == expected[(page - 1) * 10 : page * 10]
+
+
+def test_supports():
+    from eigakan.core.updaters import Keyset, Pagination
+    from eigakan.core.updaters.commons import StartsWithUpdater
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater, WithinUpdater
+
+    index = _index(*_theaters(1))
+    position = ClosestUpdater(Theater, POINT, knn=True)
+    assert index.supports(None, position, Pagination(page=1, limit=10))
+    assert not index.supports(Pagination(page=1, limit=10))
+    assert not index.supports(
+        ClosestUpdater(Theater, POINT, knn=True, geodesic=True)
+    )
+    assert not index.supports(position, WithinUpdater(Theater, 2, 48, 10))
+    assert not index.supports(position, Keyset(limit=10))
+    assert not index.supports(
+        position, StartsWithUpdater(Theater, "city_insee", "9_")
+    )
+
+
+def test_invalidated_by_writes():
+    from eigakan.core.events import Write, dispatch
+    from eigakan.theater.memory import index
+    from eigakan.theater.models import Theater
+
+    index._loaded_at = float("inf")
+    assert index.fresh
+    dispatch(Write(Theater, "delete", (uuid.uuid4(),)))
+    assert not index.fresh
+
+
+async def test_read_page_matches_statement(session):
+    from eigakan.core.count import Count
+    from eigakan.core.statement import ReadPage
+    from eigakan.core.updaters import Pagination
+    from eigakan.theater.memory import TheaterIndex
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater
+
+    from ..factories import TheaterFactory
+
+    theaters = [await TheaterFactory.create() for _ in range(50)]
+    index = TheaterIndex(enabled=True, ttl=60)
+    for accessibility in (None, theaters[0].accessibility.name):
+        for page in (1, 2, 6):
+            updaters = (
+                *_updaters(accessibility, None, "94"),
+                ClosestUpdater(Theater, POINT, knn=True),
+                Pagination(page=page, limit=10),
+            )
+            expected = await ReadPage(Theater, *updaters, count=Count.EXACT)(
+                session
+            )
+            result = await index.read_page(session, *updaters)
+            assert result.total == expected.total
+            assert [t.id for t in result.content] == [
+                t.id for t in expected.content
+            ]
+
+
+async def test_responses_match_statement(session, client, monkeypatch):
+    from eigakan.theater.memory import index
+
+    from ..factories import AccessibilityFactory, TheaterFactory
+
+    limited = await AccessibilityFactory.create(name="limited")
+    for i in range(50):
+        await TheaterFactory.create(
+            **({"accessibility": limited} if i % 3 else {})
+        )
+    await session.commit()
+    for params in (
+        {"page": 1},
+        {"page": 2, "departmentCode": "94"},
+        {"page": 1, "wheelchairFriendly": "limited"},
+        {"page": 6, "limit": 10},
+    ):
+        query = {"longitude": 2.3522, "latitude": 48.8566, **params}
+        bodies = []
+        for enabled in (False, True):
+            monkeypatch.setattr(index, "_enabled", enabled)
+            index.invalidate()
+            response = client.get("/api/theaters", params=query)
+            assert response.status_code == 200
+            bodies.append(response.json())
+        # same theaters, in the same order, serialized alike
+        sql, memory = bodies
+        assert memory == sql
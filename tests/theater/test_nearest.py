@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+ORIGINS = [(0, 2.3522, 48.8566, 3), (1, 4.2838956, 45.4240741, 2)]
+
+
+def test_nearest_lateral_knn():
+    from sqlalchemy import select, true
+    from sqlalchemy.orm import aliased
+
+    from eigakan.theater.models import Theater
+    from eigakan.theater.nearest import ReadNearest
+
+    statement = ReadNearest(ORIGINS).statement
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert "LIMIT origins.k" in sql
+    assert "<-> CAST(ST_SetSRID(ST_MakePoint(origins.longitude" in sql
+    lateral = statement.subquery().lateral("nearest")
+    sql = str(
+        select(aliased(Theater, lateral))
+        .select_from(ReadNearest(ORIGINS)._origins)
+        .join(lateral, true())
+        .compile(dialect=postgresql.dialect())
+    )
+    assert "JOIN LATERAL" in sql
+
+
+@pytest.mark.parametrize("department", [None, "94"])
+async def test_read_nearest(session, department):
+    from geoalchemy2.elements import WKTElement
+
+    from eigakan.core.statement import ReadAll
+    from eigakan.theater.dependencies import filters
+    from eigakan.theater.models import Theater
+    from eigakan.theater.nearest import ReadNearest
+    from eigakan.theater.updaters import ClosestUpdater
+
+    from ..factories import TheaterFactory
+
+    for _ in range(20):
+        await TheaterFactory.create()
+    updaters = filters(None, None, department)
+    found = await ReadNearest(ORIGINS, *updaters)(session)
+    for i, longitude, latitude, k in ORIGINS:
+        point = WKTElement(f"POINT({longitude} {latitude})", srid=4326)
+        expected = await ReadAll(
+            Theater,
+            *updaters,
+            ClosestUpdater(Theater, point, knn=True, geodesic=True),
+        )(session)
+        assert [t.osm_id for t in found[i]] == [t.osm_id for t in expected[:k]]
+        assert all(t.distance is not None for t in found[i])
@@ -0,0 +1,80 @@
+from geoalchemy2.elements import WKTElement
+from sqlalchemy.dialects import postgresql
+
+
+def test_nearest_walks_the_geography_index():
+    from eigakan.theater.neighbours import nearest
+
+    sql = str(nearest().compile(dialect=postgresql.dialect()))
+    assert "JOIN LATERAL" in sql
+    assert (
+        "ORDER BY CAST(core.theater.geometry AS geography(GEOMETRY,4326))"
+        " <-> CAST(origin.geometry AS geography(GEOMETRY,4326))" in sql
+    )
+
+
+def test_nearest_binds_the_ids_once():
+    from uuid import uuid4
+
+    from eigakan.theater.neighbours import nearest
+
+    ids = [uuid4() for _ in range(500)]
+    compiled = nearest(ids).compile(dialect=postgresql.dialect())
+    assert "= ANY (" in str(compiled)
+    assert ids in compiled.params.values()
+
+
+async def _stored(session):
+    from sqlalchemy import select
+
+    from eigakan.theater.models import Neighbour
+
+    result = await session.execute(
+        select(
+            Neighbour.theater_id, Neighbour.rank, Neighbour.neighbour_id
+        ).order_by(Neighbour.theater_id, Neighbour.rank)
+    )
+    return result.all()
+
+
+async def _expected(session):
+    from eigakan.theater.neighbours import nearest
+
+    result = await session.execute(nearest())
+    return sorted((row[0], row[1], row[2]) for row in result.all())
+
+
+async def test_neighbours_maintained_on_writes(session):
+    from ..factories import TheaterFactory
+
+    theaters = [await TheaterFactory.create() for _ in range(15)]
+    await session.flush()
+    assert await _stored(session) == await _expected(session)
+
+    theaters[0].geometry = WKTElement("POINT(2.3522 48.8566)", srid=4326)
+    await session.flush()
+    assert await _stored(session) == await _expected(session)
+
+    await session.delete(theaters[1])
+    await session.flush()
+    assert await _stored(session) == await _expected(session)
+
+
+async def test_neighbours_maintained_on_statements(session):
+    from eigakan.core.cud import CUD
+    from eigakan.theater.models import Theater
+
+    from ..factories import TheaterFactory
+
+    theaters = [await TheaterFactory.create() for _ in range(15)]
+    await session.flush()
+    cud = CUD(Theater)
+    assert await cud.update_where(
+        {"geometry": WKTElement("POINT(2.3522 48.8566)", srid=4326)},
+        {"id": theaters[0].id},
+        session,
+    )
+    assert await _stored(session) == await _expected(session)
+
+    assert await cud.delete_where({"id": theaters[1].id}, session)
+    assert await _stored(session) == await _expected(session)
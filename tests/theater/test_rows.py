@@ -0,0 +1,82 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+THEATER = {
+    "id": "3f1c6b0e-7d3a-4c1e-9a55-0c1d2e3f4a5b",
+    "osm_id": "node/1",
+    "cnc_id": 1,
+    "name": "Le Champo",
+    "org": None,
+    "opening_hours": None,
+    "open_air": False,
+    "drive_in": False,
+    "cinema_3d": None,
+    "nb_screens": 2,
+    "capacity": 250,
+    "voice_desc": None,
+    "website": None,
+    "phone": None,
+    "facebook": None,
+    "wikidata": None,
+    "siret": None,
+    "city_insee": "75056",
+    "city_name": "Paris",
+    "accessibility": {"id": 1, "strength": 4, "name": "yes"},
+    "distance": None,
+}
+
+
+def test_rows_serialized_as_response_model():
+    from eigakan.theater import rows
+    from eigakan.theater.schemas import TheaterRead
+
+    assert (
+        rows.one(THEATER).body
+        == TheaterRead.model_validate(THEATER).model_dump_json().encode()
+    )
+
+
+@pytest.mark.parametrize("geodesic", [True, False])
+def test_rows_distance(geodesic):
+    from geoalchemy2.elements import WKTElement
+
+    from eigakan.core.statement import ReadPage
+    from eigakan.theater import rows
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater
+
+    position = ClosestUpdater(
+        Theater,
+        WKTElement("POINT(2.3522 48.8566)", srid=4326),
+        knn=True,
+        geodesic=geodesic,
+    )
+    statement = ReadPage(Theater, position, columns=rows.COLUMNS).statement
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    assert [column.key for column in statement.selected_columns].count(
+        "distance"
+    ) == 1
+    assert ("ST_Distance(" in sql) is geodesic
+    assert "json_build_object(" in sql
+    assert "ST_AsEWKB" not in sql
+
+
+async def test_read_rows(session):
+    from eigakan.core.statement import ReadPage
+    from eigakan.core.updaters.sort import Sorter
+    from eigakan.theater import rows
+    from eigakan.theater.models import Theater
+    from eigakan.theater.schemas import TheaterRead
+
+    from ..factories import TheaterFactory
+
+    for _ in range(3):
+        await TheaterFactory.create()
+    by_id = Sorter(asc=("id",))(Theater)
+    orm = await ReadPage(Theater, by_id)(session)
+    page = await ReadPage(Theater, by_id, columns=rows.COLUMNS)(session)
+    assert page.total == orm.total == 3
+    assert [TheaterRead.model_validate(row) for row in page.content] == [
+        TheaterRead.model_validate(theater, from_attributes=True)
+        for theater in orm.content
+    ]
@@ -0,0 +1,112 @@
+import uuid
+
+import pytest
+from geoalchemy2.elements import WKTElement
+
+PARIS = (2.3522, 48.8566)
+
+
+def test_tile_bounds():
+    from eigakan.theater.tiles import Tile
+
+    assert Tile(0, 0, 0).bounds() == pytest.approx(
+        (-180, -85.0511287, 180, 85.0511287)
+    )
+    west, south, east, _ = Tile(1, 1, 0).bounds()
+    assert (west, south, east) == pytest.approx((0, 0, 180))
+
+
+def test_tile_covers():
+    from eigakan.theater.tiles import MARGIN, Tile
+
+    tile = Tile(12, 2074, 1409)
+    assert tile.covers(*PARIS)
+    assert not Tile(12, 2075, 1409).covers(*PARIS)
+    west, south, *_ = tile.bounds()
+    # just outside the tile, within the buffer rendered around it
+    assert not tile.covers(west - 1e-5, south)
+    assert tile.covers(west - 1e-5, south, MARGIN)
+
+
+@pytest.mark.parametrize(
+    ("z", "x", "y", "exists"),
+    [(0, 0, 0, True), (1, 2, 0, False), (3, 7, 7, True), (23, 0, 0, False)],
+)
+def test_tile_exists(z, x, y, exists):
+    from eigakan.theater.tiles import Tile
+
+    assert Tile(z, x, y).exists is exists
+
+
+def test_tiles_invalidated_by_writes():
+    from eigakan.core.events import Write, dispatch
+    from eigakan.theater.models import Theater
+    from eigakan.theater.tiles import Rendered, Tile, tiles
+
+    held, other = uuid.uuid4(), uuid.uuid4()
+    paris, elsewhere = Tile(12, 2074, 1409), Tile(12, 0, 0)
+    tiles.set((paris,), Rendered(b"", frozenset()))
+    tiles.set((elsewhere,), Rendered(b"", frozenset({held})))
+
+    dispatch(Write(Theater, "update", (other,), {"name": "Le Champo"}))
+    assert len(tiles) == 2
+    dispatch(Write(Theater, "delete", (held,)))
+    assert tiles.get((elsewhere,)) is None
+    point = WKTElement("POINT(%f %f)" % PARIS, srid=4326)
+    dispatch(Write(Theater, "create", (other,), {"geometry": point}))
+    assert tiles.get((paris,)) is None
+    tiles.invalidate()
+
+
+def test_tiles_invalidated_on_change():
+    from eigakan.core.revision import _HOOKS
+    from eigakan.theater.models import Theater
+    from eigakan.theater.tiles import Rendered, Tile, tiles
+
+    tiles.set((Tile(0, 0, 0),), Rendered(b"", frozenset()))
+    # as if another worker wrote a theater
+    for hook in _HOOKS[Theater.__table__.name]:
+        hook()
+    assert len(tiles) == 0
+
+
+async def test_filtered_tiles_invalidated_by_writes(session):
+    from eigakan.core.cud import CUD
+    from eigakan.core.updaters.commons import ScalarUpdater
+    from eigakan.theater.models import Theater
+    from eigakan.theater.tiles import Tile, render, tiles
+
+    from ..factories import AccessibilityFactory, TheaterFactory
+
+    theater = await TheaterFactory.create()
+    other = await AccessibilityFactory.create()
+    await session.commit()
+    wheelchair = ScalarUpdater(Theater, "accessibility.name", other.name)
+    tile = Tile(0, 0, 0)
+    await render(session, tile, wheelchair)
+    assert len(tiles) == 1
+    # the theater starts matching the filter of the tile
+    assert await CUD(Theater).update_where(
+        {"accessibility_id": other.id}, {"id": theater.id}, session
+    )
+    assert len(tiles) == 0
+
+
+async def test_read_tile(session):
+    from eigakan.core.updaters.commons import ScalarUpdater
+    from eigakan.theater.models import Theater
+    from eigakan.theater.tiles import ReadTile, Tile
+
+    from ..factories import TheaterFactory
+
+    theaters = [await TheaterFactory.create() for _ in range(5)]
+    rendered = await ReadTile(Tile(0, 0, 0))(session)
+    assert rendered.ids == {theater.id for theater in theaters}
+    # the theaters filtered out are located within the tile all the same
+    filtered = await ReadTile(
+        Tile(0, 0, 0), ScalarUpdater(Theater, "nb_screens", 100)
+    )(session)
+    assert filtered.ids == rendered.ids
+    assert rendered.content
+    empty = await ReadTile(Tile(12, 0, 0))(session)
+    assert empty.ids == frozenset()
@@ -0,0 +1,150 @@
+import pytest
+from geoalchemy2.elements import WKTElement
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+POINT = WKTElement("POINT(2.2646354 48.8589384)", srid=4326)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_closest_default():
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater
+
+    sql = _sql(ClosestUpdater(Theater, POINT).update(select(Theater)))
+    assert "ORDER BY ST_Distance(core.theater.geometry" in sql
+
+
+def test_closest_knn():
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater
+
+    updater = ClosestUpdater(Theater, POINT, knn=True)
+    sql = _sql(updater.update(select(Theater)))
+    assert "ORDER BY (core.theater.geometry <-> ST_GeomFromText(" in sql
+    assert "AS geography" not in sql
+
+
+def test_closest_knn_geodesic():
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import ClosestUpdater
+
+    updater = ClosestUpdater(Theater, POINT, knn=True, geodesic=True)
+    sql = _sql(updater.update(select(Theater)))
+    # must match the expression indexed by idx_theater_geography
+    assert (
+        "ORDER BY (CAST(core.theater.geometry AS geography(GEOMETRY,4326))"
+        " <-> CAST(" in sql
+    )
+    assert "ST_Distance(CAST(core.theater.geometry AS geography" in sql
+
+
+def test_within_prefilters_with_bounding_box():
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import WithinUpdater
+
+    updater = WithinUpdater(Theater, 2.2646354, 48.8589384, 10_000)
+    sql = _sql(updater.update(select(Theater)))
+    assert "core.theater.geometry && ST_MakeEnvelope(" in sql
+    assert "ST_DWithin(CAST(core.theater.geometry AS geography" in sql
+
+
+def test_within_bounding_box_encloses_radius():
+    from eigakan.theater.models import Theater
+    from eigakan.theater.updaters import WithinUpdater
+
+    updater = WithinUpdater(Theater, 2.2646354, 48.8589384, 10_000)
+    min_x, min_y, max_x, max_y, _ = (
+        clause.value for clause in updater._bounding_box().clauses
+    )
+    # ~ 9 km per 0.1 degree of longitude at this latitude
+    assert max_x - 2.2646354 > 10_000 / 73_000
+    assert max_y - 48.8589384 > 10_000 / 111_320
+    assert 2.2646354 - min_x == pytest.approx(max_x - 2.2646354)
+    assert 48.8589384 - min_y == pytest.approx(max_y - 48.8589384)
+
+
+@pytest.mark.parametrize("ids", ["a,b", ",".join(["%s"] * 101)])
+def test_invalid_ids(ids):
+    import uuid
+
+    from fastapi import HTTPException
+
+    from eigakan.theater.dependencies import _parse_ids
+
+    with pytest.raises(HTTPException):
+        _parse_ids(ids.replace("%s", str(uuid.uuid4())))
+
+
+def test_projection_loads_requested_columns():
+    from eigakan.core.statement import ReadAll
+    from eigakan.theater.dependencies import _parse_fields
+    from eigakan.theater.models import Theater
+
+    sql = str(
+        ReadAll(Theater, _parse_fields("name,distance")).statement.compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert sql.startswith("SELECT core.theater.id, core.theater.name \n")
+    # the geometry is deferred whatever the projection
+    assert "geometry" not in str(
+        ReadAll(Theater).statement.compile(dialect=postgresql.dialect())
+    )
+
+
+def test_projection_of_expressions_only():
+    from eigakan.core.statement import ReadAll
+    from eigakan.core.updaters import Projection
+    from eigakan.core.updaters.exc import AttributeCannotBeLoaded
+    from eigakan.theater.models import Theater
+
+    sql = str(
+        ReadAll(Theater, Projection(Theater, ["distance"])).statement.compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert sql.startswith("SELECT core.theater.id \n")
+    with pytest.raises(AttributeCannotBeLoaded):
+        Projection(Theater, ["unknown"])
+
+
+def test_projection_order():
+    from eigakan.core.updaters import Projection
+    from eigakan.theater.dependencies import _parse_fields
+    from eigakan.theater.models import Theater
+
+    first, second = (
+        _parse_fields("name,distance"),
+        _parse_fields("distance,name"),
+    )
+    assert first.fields == second.fields
+    assert first.shape == second.shape
+    assert (
+        Projection(Theater, ["distance", "name", "name"]).shape == first.shape
+    )
+
+
+def test_projected_schema():
+    from eigakan.theater import schemas as sch
+
+    schema = sch.projected(sch.Theaters, ("name", "distance"))
+    page = schema.model_validate(
+        {"content": [{"name": "Le Champo"}], "pagination": {"next": None}}
+    )
+    assert page.model_dump()["content"] == [
+        {"name": "Le Champo", "distance": None}
+    ]
+    assert sch.projected(sch.Theaters, ("name", "distance")) is schema
+
+
+def test_invalid_fields():
+    from fastapi import HTTPException
+
+    from eigakan.theater.dependencies import _parse_fields
+
+    with pytest.raises(HTTPException):
+        _parse_fields("name,geometry")